@@ -2,28 +2,66 @@
 Docker-based bot runner.
 Builds the bigas-runner image once at startup, then spins up a container
 per submission to execute engine/runner.py with the bot script.
+
+The API talks to runners through the RunnerBackend interface so that
+Docker can be swapped for a pre-forked rlimit sandbox (api/sandbox_runner.py),
+a local subprocess (SubprocessBackend), a synthetic stand-in (FakeBackend) or
+standalone worker processes fed through a durable queue (QueueBackend).
+Select one with get_backend(name) / the BIGAS_RUNNER environment variable.
 """
+import abc
 import asyncio
-import base64
+import io
 import json
 import os
+import random
+import sys
 import logging
+import tarfile
+import threading
+import time
 
 import docker
 from docker.errors import BuildError, ContainerError, ImageNotFound
 
+from api.bytecode import compile_bot
+from bigas.constants import AP_PER_CYCLE, CYCLES_PER_RUN
+from engine.budget import INIT_CPU, TICK_CPU
+
 logger = logging.getLogger(__name__)
 
 IMAGE_NAME = "bigas-runner"
-CONTAINER_TIMEOUT = 60       # seconds max per full game run (5 cycles × 100 ticks)
+CONTAINER_TIMEOUT = 60       # seconds max per full game run (5 cycles × 100 ticks), wall budget
 MEMORY_LIMIT = "256m"
 CPU_QUOTA = 50000            # 50% of one CPU (100000 = 1 full CPU)
+CPU_PERIOD = 100000
 DOCKERFILE_PATH = os.path.join(os.path.dirname(__file__), "..")  # project root
+# Runner settings passed from the API's environment into each container
+RUNNER_ENV = ("BIGAS_TICK_BUDGET", "BIGAS_SHARED_GRID")
 
 
 _client: docker.DockerClient = None
 
 
+def run_timeout(games: int = 1, cpu_share: float = 1.0) -> float:
+    """
+    Seconds a run of `games` games may take before it is killed. In CPU
+    budget mode (BIGAS_TICK_BUDGET=cpu, engine/budget.py) a bot may
+    legitimately use INIT_CPU plus TICK_CPU per tick of CPU time each game;
+    with only cpu_share of a CPU that takes 1 / cpu_share times as long, so
+    it is added to CONTAINER_TIMEOUT.
+    """
+    per_game = CONTAINER_TIMEOUT
+    if os.environ.get("BIGAS_TICK_BUDGET", "wall") == "cpu":
+        per_game += (INIT_CPU + CYCLES_PER_RUN * AP_PER_CYCLE * TICK_CPU) / cpu_share
+    return per_game * games
+
+
+def container_timeout(games: int = 1) -> float:
+    """run_timeout for a container, which gets CPU_QUOTA of a CPU."""
+    return run_timeout(games, CPU_QUOTA / CPU_PERIOD)
+
+
 def get_client() -> docker.DockerClient:
     global _client
     if _client is None:
@@ -59,70 +97,465 @@ def build_image():
         raise
 
 
-async def run_bot(bot_code: str) -> dict:
+async def run_bot(bot_code: str, on_cycle=None) -> dict:
     """
-    Base64-encode bot_code, pass it to the container via env var BIGAS_BOT_CODE,
-    run the game, and return the parsed replay dict.
+    Copy bot_code and its cached bytecode into a fresh container as
+    /bot/bot.py and /bot/bot.pyc, run the game, and return the parsed replay dict.
+    The container's stdout is consumed as it is written; on_cycle(cycle, score)
+    is called (on the event loop) as each cycle record arrives.
     Raises RuntimeError on failure.
     """
     client = get_client()
-    bot_code_b64 = base64.b64encode(bot_code.encode("utf-8")).decode("ascii")
+    try:
+        archive = _bot_archive(bot_code, compile_bot(bot_code))
+    except (SyntaxError, ValueError) as e:
+        raise RuntimeError(f"Bot code does not compile: {e}") from e
 
     loop = asyncio.get_event_loop()
+    reader = RecordReader(_on_loop(loop, on_cycle))
     try:
-        output = await loop.run_in_executor(
+        await loop.run_in_executor(
             None,
-            lambda: _run_container(client, bot_code_b64),
+            lambda: _run_container(client, archive, reader.feed, timeout=container_timeout()),
         )
     except Exception as e:
         raise RuntimeError(f"Container execution failed: {e}") from e
 
-    output = output.strip()
-    if not output:
-        raise RuntimeError("Bot produced no output")
+    return reader.result()
+
 
+async def run_bot_series(bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+    """
+    Like run_bot, but one container plays every seed in series mode and the
+    list of action logs is returned. on_game(log) is called (on the event
+    loop) as each game finishes. params becomes bigas.params in the bot.
+    """
+    client = get_client()
     try:
-        replay = json.loads(output)
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Invalid replay JSON from bot: {e}") from e
+        archive = _bot_archive(bot_code, compile_bot(bot_code))
+    except (SyntaxError, ValueError) as e:
+        raise RuntimeError(f"Bot code does not compile: {e}") from e
+
+    loop = asyncio.get_event_loop()
+    reader = RecordReader(on_game=_on_loop(loop, on_game))
+    command = ["/bot/bot.py", *_series_args(seeds, params)]
+    try:
+        await loop.run_in_executor(
+            None,
+            lambda: _run_container(client, archive, reader.feed, command, container_timeout(len(seeds))),
+        )
+    except Exception as e:
+        raise RuntimeError(f"Container execution failed: {e}") from e
+
+    return reader.results()
+
+
+class RecordReader:
+    """
+    Rebuilds action logs from the runner's streamed records (see
+    engine/replay.py), one stdout line at a time. A series run streams one
+    header ... trailer block per game; on_game(log) is called as each ends.
+    feed() never raises; result() / results() report whatever went wrong.
+    """
 
-    if "error" in replay and "final_score" not in replay:
-        raise RuntimeError(replay["error"])
+    def __init__(self, on_cycle=None, on_game=None):
+        self._on_cycle = on_cycle
+        self._on_game = on_game
+        self._log = None
+        self._done = False
+        self.games = []
+        self.error = None
 
-    return replay
+    def feed(self, line: str):
+        line = line.strip()
+        if not line or self.error:
+            return
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            self.error = f"Invalid replay JSON from bot: {e}"
+            return
 
+        kind = record.pop("record", None)
+        if kind == "header":
+            self._log = {**record, "cycle_scores": [], "actions": []}
+            self._done = False
+        elif kind == "cycle" and self._log is not None:
+            self._log["actions"].append(record["actions"])
+            self._log["cycle_scores"].append(record["score"])
+            if self._on_cycle:
+                self._on_cycle(record["cycle"], record["score"])
+        elif kind == "trailer" and self._log is not None:
+            self._log.update(record)
+            self._done = True
+            self.games.append(self._log)
+            if self._on_game:
+                self._on_game(self._log)
+        elif "error" in record:
+            self.error = record["error"]
+        else:
+            self.error = f"Unexpected runner record: {kind}"
 
-def _run_container(client: docker.DockerClient, bot_code_b64: str) -> str:
-    """Synchronous container run — called via executor to avoid blocking."""
+    def result(self) -> dict:
+        if self.error:
+            raise RuntimeError(self.error)
+        if self._log is None:
+            raise RuntimeError("Bot produced no output")
+        if not self._done:
+            raise RuntimeError("Runner output ended before the final scores")
+        return self._log
+
+    def results(self) -> list:
+        """Every game of a series run, in seed order."""
+        self.result()
+        return self.games
+
+
+def parse_runner_output(output: str, on_cycle=None) -> dict:
+    """Parse the complete stdout of engine/runner.py. Raises RuntimeError on failure."""
+    reader = RecordReader(on_cycle)
+    for line in output.splitlines():
+        reader.feed(line)
+    return reader.result()
+
+
+def _series_args(seeds: list, params: dict = None) -> list:
+    """engine/runner.py arguments for a series run."""
+    args = ["--seeds", ",".join(str(s) for s in seeds)]
+    if params is not None:
+        args += ["--params", json.dumps(params)]
+    return args
+
+
+def _on_loop(loop, callback):
+    """Wrap callback so calls from executor threads run on the event loop."""
+    if callback is None:
+        return None
+    return lambda *args: loop.call_soon_threadsafe(callback, *args)
+
+
+def _bot_archive(bot_code: str, pyc: bytes) -> bytes:
+    """Tar holding bot/bot.py and bot/bot.pyc, to be extracted at the container root."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        bot_dir = tarfile.TarInfo("bot")
+        bot_dir.type = tarfile.DIRTYPE
+        bot_dir.mode = 0o755
+        tar.addfile(bot_dir)
+        for name, data in (("bot/bot.py", bot_code.encode("utf-8")), ("bot/bot.pyc", pyc)):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _iter_lines(chunks):
+    """Split a stream of byte chunks into decoded lines."""
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace")
+    if buf:
+        yield buf.decode("utf-8", errors="replace")
+
+
+def _run_container(client: docker.DockerClient, archive: bytes, on_line, command=None,
+                   timeout: float = None) -> None:
+    """
+    Synchronous container run — called via executor to avoid blocking.
+    The bot archive is copied in before start; the image's default command
+    runs /bot/bot.py (command overrides the runner's arguments). Each stdout
+    line is handed to on_line as soon as the runner writes it.
+    """
+    timeout = timeout or container_timeout()
     container = None
+    timer = None
     try:
-        container = client.containers.run(
+        container = client.containers.create(
             IMAGE_NAME,
-            environment={"BIGAS_BOT_CODE": bot_code_b64},
+            command=command,
+            environment={k: os.environ[k] for k in RUNNER_ENV if k in os.environ},
             network_disabled=True,
             mem_limit=MEMORY_LIMIT,
             cpu_quota=CPU_QUOTA,
-            detach=True,
-            stdout=True,
-            stderr=False,
+            cpu_period=CPU_PERIOD,
         )
-        result = container.wait(timeout=CONTAINER_TIMEOUT)
+        container.put_archive("/", archive)
+        container.start()
+        # The attached stream only ends when the container does
+        timer = threading.Timer(timeout, container.kill)
+        timer.start()
+        # logs=True replays anything written before the attach
+        for line in _iter_lines(container.attach(stdout=True, stderr=False, stream=True, logs=True)):
+            on_line(line)
+        result = container.wait(timeout=timeout)
         exit_code = result.get("StatusCode", 0)
 
-        output = container.logs(stdout=True, stderr=False)
-        output = output.decode("utf-8") if isinstance(output, bytes) else output
-
         if exit_code != 0:
             stderr = container.logs(stdout=False, stderr=True)
             stderr = stderr.decode("utf-8") if isinstance(stderr, bytes) else stderr
             raise RuntimeError(f"Container exited {exit_code}: {stderr.strip()}")
-
-        return output
     except docker.errors.ImageNotFound:
         raise RuntimeError(f"Docker image '{IMAGE_NAME}' not found. Was it built?")
     finally:
+        if timer:
+            timer.cancel()
         if container:
             try:
                 container.remove(force=True)
             except Exception:
                 pass
+
+
+# ----------------------------------------------------------------------
+# Runner backends
+# ----------------------------------------------------------------------
+
+class RunnerBackend(abc.ABC):
+    """Executes games for a bot's source code and returns their replay records."""
+
+    name = "base"
+
+    def prepare(self):
+        """One-time setup at API startup."""
+
+    def stats(self):
+        """Backend-specific numbers for /metrics, or None."""
+        return None
+
+    @abc.abstractmethod
+    async def run(self, bot_code: str, on_cycle=None) -> dict:
+        """on_cycle(cycle, score) is called on the event loop as each cycle finishes."""
+
+    @abc.abstractmethod
+    async def run_series(self, bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+        """
+        Play every seed with one bot process and return their action logs.
+        on_game(log) is called on the event loop as each game finishes;
+        params is exposed to the bot as bigas.params.
+        """
+
+
+class DockerBackend(RunnerBackend):
+    """One sandboxed bigas-runner container per game (production)."""
+
+    name = "docker"
+
+    def prepare(self):
+        build_image()
+
+    async def run(self, bot_code: str, on_cycle=None) -> dict:
+        return await run_bot(bot_code, on_cycle)
+
+    async def run_series(self, bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+        return await run_bot_series(bot_code, seeds, on_game, params)
+
+
+class SubprocessBackend(RunnerBackend):
+    """
+    Runs engine/runner.py as a plain local subprocess — no sandbox.
+    Only for load tests and trusted code.
+    """
+
+    name = "subprocess"
+
+    async def run(self, bot_code: str, on_cycle=None) -> dict:
+        reader = RecordReader(on_cycle)
+        await self._run_runner(bot_code, [], reader, run_timeout())
+        return reader.result()
+
+    async def run_series(self, bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+        reader = RecordReader(on_game=on_game)
+        await self._run_runner(bot_code, _series_args(seeds, params), reader, run_timeout(len(seeds)))
+        return reader.results()
+
+    async def _run_runner(self, bot_code: str, args: list, reader: RecordReader, timeout: float):
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(os.path.abspath(DOCKERFILE_PATH), "engine", "runner.py"), "-", *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Bot source goes in on stdin; the runner reads it to EOF before playing
+        proc.stdin.write(bot_code.encode("utf-8"))
+        proc.stdin.close()
+
+        async def consume():
+            async for line in proc.stdout:
+                reader.feed(line.decode("utf-8", errors="replace"))
+            return await proc.stderr.read()
+
+        try:
+            stderr = await asyncio.wait_for(consume(), timeout)
+            await proc.wait()
+        except asyncio.TimeoutError:
+            proc.kill()
+            raise RuntimeError(f"Runner timed out after {timeout}s")
+        if proc.returncode != 0 and not reader.error:
+            raise RuntimeError(f"Runner exited {proc.returncode}: {stderr.decode('utf-8', 'replace').strip()}")
+
+
+class FakeBackend(RunnerBackend):
+    """
+    Returns a synthetic action-log replay after a simulated run time, so the
+    API's queueing and job store can be load-tested without running games.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 2.0, jitter: float = 0.5):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def run(self, bot_code: str, on_cycle=None) -> dict:
+        return await self._fake_game(random.randrange(2 ** 31), self._run_time(), on_cycle)
+
+    async def run_series(self, bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+        logs = []
+        for seed in seeds:
+            logs.append(await self._fake_game(seed, self._run_time()))
+            if on_game:
+                on_game(logs[-1])
+        return logs
+
+    def _run_time(self) -> float:
+        return max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+
+    async def _fake_game(self, seed: int, run_time: float, on_cycle=None) -> dict:
+        from bigas.config import GameConfig
+        from bigas.constants import CYCLES_PER_RUN
+        from engine.game import ENGINE_VERSION
+        from engine.replay import LOG_FORMAT
+
+        config = GameConfig()
+        cycle_scores = [random.randrange(0, 20000, 250) for _ in range(CYCLES_PER_RUN)]
+        for cycle, score in enumerate(cycle_scores, start=1):
+            await asyncio.sleep(run_time / CYCLES_PER_RUN)
+            if on_cycle:
+                on_cycle(cycle, score)
+        return {
+            "format": LOG_FORMAT,
+            "engine_version": ENGINE_VERSION,
+            "seed": seed,
+            "config": config.to_dict(),
+            "bot_name": "FakeBot",
+            "final_score": sum(cycle_scores) / len(cycle_scores),
+            "cycle_scores": cycle_scores,
+            "actions": [[{"action": "wait"}] * config.ap_per_cycle for _ in range(CYCLES_PER_RUN)],
+        }
+
+
+class QueueBackend(RunnerBackend):
+    """
+    Hands every run to standalone workers (python -m api.worker) through the
+    durable SQLite queue in api/task_queue.py, relaying their progress events.
+    The API process itself runs no games.
+    """
+
+    name = "queue"
+    POLL_INTERVAL = 0.25  # seconds between task status checks
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.queue = None
+
+    def prepare(self):
+        from api.task_queue import TaskQueue
+        self.queue = TaskQueue(self.path) if self.path else TaskQueue.from_env()
+        # Job ids do not survive an API restart, so neither do their tasks
+        self.queue.clear()
+
+    def stats(self) -> dict:
+        return self.queue.stats()
+
+    async def run(self, bot_code: str, on_cycle=None) -> dict:
+        attempt, last = [0], [0]
+
+        def on_event(data):
+            # A retried task plays a new game from cycle 1 (on_cycle starts
+            # over); late events of the attempt it replaced are dropped
+            if data.get("attempt", 0) < attempt[0]:
+                return
+            if data.get("attempt", 0) > attempt[0]:
+                attempt[0], last[0] = data.get("attempt", 0), 0
+            if on_cycle and data["cycle"] > last[0]:
+                last[0] = data["cycle"]
+                on_cycle(data["cycle"], data["score"])
+
+        return await self._call("run", {"bot_code": bot_code}, on_event, container_timeout())
+
+    async def run_series(self, bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+        seen = set()
+
+        def on_event(data):
+            if on_game and data["game"]["seed"] not in seen:
+                seen.add(data["game"]["seed"])
+                on_game(data["game"])
+
+        return await self._call("series", {"bot_code": bot_code, "seeds": seeds, "params": params}, on_event,
+                                container_timeout(len(seeds)))
+
+    async def _db(self, fn, *args):
+        """SQLite calls may wait on the write lock, so they run off the event loop."""
+        return await asyncio.get_event_loop().run_in_executor(None, fn, *args)
+
+    async def _call(self, kind: str, payload: dict, on_event, attempt_timeout: float):
+        """
+        Queue one runner call and relay its events until it ends. Every
+        attempt may take attempt_timeout, so after MAX_ATTEMPTS of them (or with no
+        worker alive to claim it) the task is dropped and the call fails.
+        """
+        from api.task_queue import MAX_ATTEMPTS
+        task_id = await self._db(self.queue.put, kind, payload)
+        timeout = attempt_timeout * MAX_ATTEMPTS
+        deadline = time.monotonic() + timeout
+        seq = 0
+        try:
+            while True:
+                task = await self._db(self.queue.status, task_id)
+                # Events written before the status was read are all visible now
+                for seq, data in await self._db(self.queue.events, task_id, seq):
+                    on_event(data)
+                if task is None:
+                    raise RuntimeError("Queued task disappeared")
+                if task["status"] == "done":
+                    return task["result"]
+                if task["status"] == "failed":
+                    raise RuntimeError(task["error"])
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Queued task not finished after {timeout:.0f}s")
+                await asyncio.sleep(self.POLL_INTERVAL)
+        finally:
+            await self._db(self.queue.delete, task_id)
+
+
+def get_backend(name: str = None) -> RunnerBackend:
+    """
+    Backend by name: "docker" (default), "sandbox", "subprocess", "fake" or
+    "queue" (standalone workers, see api/worker.py; queue file from BIGAS_QUEUE_PATH).
+    The sandbox pool size is read from BIGAS_SANDBOX_POOL; BIGAS_SANDBOX_ZYGOTE=0
+    makes it start every bot cold instead of forking from a zygote.
+    FakeBackend latency is read from BIGAS_FAKE_LATENCY / BIGAS_FAKE_JITTER (seconds).
+    """
+    name = name or os.environ.get("BIGAS_RUNNER", "docker")
+    if name == "docker":
+        return DockerBackend()
+    if name == "sandbox":
+        from api.sandbox_runner import SandboxBackend
+        return SandboxBackend(
+            pool_size=int(os.environ.get("BIGAS_SANDBOX_POOL", "4")),
+            use_zygote=os.environ.get("BIGAS_SANDBOX_ZYGOTE", "1") != "0",
+        )
+    if name == "subprocess":
+        return SubprocessBackend()
+    if name == "fake":
+        return FakeBackend(
+            latency=float(os.environ.get("BIGAS_FAKE_LATENCY", "2.0")),
+            jitter=float(os.environ.get("BIGAS_FAKE_JITTER", "0.5")),
+        )
+    if name == "queue":
+        return QueueBackend()
+    raise ValueError(f"Unknown runner backend: {name}")
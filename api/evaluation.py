@@ -0,0 +1,137 @@
+"""
+Adaptive multi-seed evaluation of submissions.
+
+With BIGAS_EVAL_MAX_SEEDS > 0 every submission is scored on a fixed seed
+sequence shared by all bots, EVAL_ROUND_SEEDS games per round (one series-
+mode runner call). After each round the job's mean and 95% confidence
+interval are updated, and the job goes back on the queue for another round
+unless it is settled:
+  - it has played at least EVAL_MIN_SEEDS seeds and its interval no longer
+    overlaps those of the evaluated bots ranked directly above and below it, or
+  - it has played BIGAS_EVAL_MAX_SEEDS seeds.
+Bots far from their neighbours therefore stop after a round or two; only
+close races use the full seed budget. A settled job is reopened (queued for
+more rounds, up to the cap) when a bot evaluated later lands next to it with
+an overlapping interval.
+"""
+import math
+import os
+import random
+import statistics
+from typing import List
+
+EVAL_ROUND_SEEDS = 5
+EVAL_MIN_SEEDS = 5
+EVAL_SEED_BASE = 1999  # fixes the shared seed sequence
+
+# Two-sided 95% Student t critical values by degrees of freedom
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+        9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042,
+        40: 2.021, 60: 2.000, 120: 1.980}
+
+
+def max_seeds() -> int:
+    """BIGAS_EVAL_MAX_SEEDS; 0 (the default) plays one game per submission."""
+    return int(os.environ.get("BIGAS_EVAL_MAX_SEEDS", "0"))
+
+
+def eval_seeds(n: int) -> List[int]:
+    """The first n seeds of the shared evaluation sequence."""
+    rng = random.Random(EVAL_SEED_BASE)
+    return [rng.randrange(2 ** 31) for _ in range(n)]
+
+
+def _t95(df: int) -> float:
+    if df >= 120:
+        return 1.960
+    return _T95[max(k for k in _T95 if k <= df)]
+
+
+def summarize(scores: List[float]) -> dict:
+    """Mean and 95% confidence interval of a bot's per-seed scores."""
+    mean = statistics.fmean(scores)
+    if len(scores) < 2:
+        return {"seeds": len(scores), "mean": round(mean, 2), "ci_low": None, "ci_high": None}
+    half = _t95(len(scores) - 1) * statistics.stdev(scores) / math.sqrt(len(scores))
+    return {"seeds": len(scores), "mean": round(mean, 2),
+            "ci_low": round(mean - half, 2), "ci_high": round(mean + half, 2)}
+
+
+def _separated(a: dict, b: dict) -> bool:
+    if a["ci_low"] is None or b["ci_low"] is None:
+        return False
+    return a["ci_high"] < b["ci_low"] or b["ci_high"] < a["ci_low"]
+
+
+def is_settled(job, ranked, cap: int) -> bool:
+    """
+    ranked: evaluated jobs (including this one) ordered by mean, best first.
+    Settled once the job's interval is clear of both neighbours' or it hit the cap.
+    """
+    ev = job.evaluation
+    if ev["seeds"] >= cap:
+        return True
+    if ev["seeds"] < EVAL_MIN_SEEDS:
+        return False
+    return all(_separated(ev, other.evaluation) for other in _neighbours(job, ranked))
+
+
+def _neighbours(job, ranked) -> list:
+    """The jobs ranked directly above and below job (none if it is not ranked)."""
+    if job not in ranked:
+        return []
+    i = ranked.index(job)
+    return ranked[max(0, i - 1):i] + ranked[i + 1:i + 2]
+
+
+def _reopen_unsettled(jobs, ranked, cap: int, store) -> None:
+    """Queue more rounds for settled jobs whose interval now overlaps a neighbour's."""
+    for job in jobs:
+        ev = job.evaluation
+        if job.status == "complete" and ev["settled"] and "error" not in ev and not is_settled(job, ranked, cap):
+            ev["settled"] = False
+            job.status = "pending"
+            store.enqueue(job)
+
+
+async def run_round(job, runner, store) -> None:
+    """
+    Play the job's next round and update job.evaluation. The first game is
+    kept as the job's replay. Re-enqueues the job until it is settled.
+    """
+    cap = max_seeds()
+    if job.evaluation is None:
+        job.evaluation = {"scores": [], "seeds": 0, "mean": None, "ci_low": None, "ci_high": None,
+                          "settled": False}
+    ev = job.evaluation
+    # The jobs it was ranked between: they become neighbours if it moves away
+    before = _neighbours(job, store.evaluated())
+    played = ev["seeds"]
+    seeds = eval_seeds(cap)[played:played + EVAL_ROUND_SEEDS]
+
+    def on_game(log):
+        if not ev["scores"]:
+            store.save_replay(job, log)
+        ev["scores"].append(log["final_score"])
+        ev.update(summarize(ev["scores"]))
+
+    try:
+        await runner.run_series(job.bot_code, seeds, on_game=on_game)
+    except Exception as e:
+        if not ev["scores"]:
+            raise
+        # Keep the seeds already played rather than discarding the evaluation
+        ev["error"] = str(e)
+        ev["settled"] = False
+        job.status = "complete"
+        return
+
+    ranked = store.evaluated()
+    ev["settled"] = is_settled(job, ranked, cap)
+    if ev["settled"]:
+        job.status = "complete"
+    else:
+        job.status = "pending"
+        store.enqueue(job)
+    # A settled neighbour was only checked against the ranking of its day
+    _reopen_unsettled(before + _neighbours(job, ranked), ranked, cap, store)
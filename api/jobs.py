@@ -7,6 +7,8 @@ import uuid
 from datetime import datetime, timezone
 from typing import Dict, Optional
 
+from api.replay_store import ReplayStore
+
 
 class Job:
     def __init__(self, bot_name: str, bot_code: str):
@@ -15,8 +17,22 @@ class Job:
         self.bot_code = bot_code
         self.status = "pending"
         self.submitted_at = datetime.now(timezone.utc)
+        # Scores, usage and other metadata; the action log itself is in
+        # JobStore.replays so completed jobs stay small.
         self.result: Optional[dict] = None
         self.error: Optional[str] = None
+        # Cycles finished so far while running: {"cycles_done": n, "cycle_scores": [...]}
+        self.progress: Optional[dict] = None
+        # Multi-seed evaluation state when enabled (api/evaluation.py):
+        # {"scores", "seeds", "mean", "ci_low", "ci_high", "settled"}
+        self.evaluation: Optional[dict] = None
+
+    @property
+    def score(self) -> float:
+        """Leaderboard score: the evaluation mean, or the single game's final score."""
+        if self.evaluation and self.evaluation["seeds"]:
+            return self.evaluation["mean"]
+        return self.result.get("final_score", 0) if self.result else 0
 
     def to_dict(self):
         return {
@@ -24,8 +40,10 @@ class Job:
             "status": self.status,
             "bot_name": self.bot_name,
             "submitted_at": self.submitted_at.isoformat(),
+            "progress": self.progress,
             "result": self.result,
             "error": self.error,
+            "evaluation": self.evaluation,
         }
 
 
@@ -33,10 +51,12 @@ class JobStore:
     def __init__(self):
         self._jobs: Dict[str, Job] = {}
         self._queue: asyncio.Queue = None
+        self.replays: ReplayStore = None
 
     def init(self):
         """Must be called inside an async context (on app startup)."""
         self._queue = asyncio.Queue()
+        self.replays = ReplayStore.from_env()
 
     def create(self, bot_name: str, bot_code: str) -> Job:
         job = Job(bot_name, bot_code)
@@ -49,15 +69,52 @@ class JobStore:
     def get(self, job_id: str) -> Optional[Job]:
         return self._jobs.get(job_id)
 
+    def save_replay(self, job: Job, record: dict):
+        """The action log goes to the replay store, the rest stays on the job."""
+        self.replays.put(job.job_id, record)
+        job.result = {k: v for k, v in record.items() if k != "actions"}
+
+    def complete(self, job: Job, record: dict):
+        self.save_replay(job, record)
+        job.status = "complete"
+
     def leaderboard(self):
-        """Return completed jobs sorted by final_score descending."""
+        """Return completed jobs sorted by score descending."""
         completed = [
             j for j in self._jobs.values()
             if j.status == "complete" and j.result
         ]
-        completed.sort(key=lambda j: j.result.get("final_score", 0), reverse=True)
+        completed.sort(key=lambda j: j.score, reverse=True)
         return completed
 
+    def evaluated(self):
+        """Jobs with at least one evaluation seed played, best mean first."""
+        jobs = [
+            j for j in self._jobs.values()
+            if j.evaluation and j.evaluation["seeds"] and j.status != "error"
+        ]
+        jobs.sort(key=lambda j: j.evaluation["mean"], reverse=True)
+        return jobs
+
+    def usage_summary(self):
+        """Aggregate bot CPU time and peak RSS over completed jobs that report usage."""
+        bots = [
+            j.result["usage"]["bot"] for j in self._jobs.values()
+            if j.status == "complete" and j.result
+            and (j.result.get("usage") or {}).get("bot")
+        ]
+        if not bots:
+            return {"jobs": 0}
+        cpu = [b["cpu_user"] + b["cpu_sys"] for b in bots]
+        rss = [b["peak_rss_kb"] for b in bots]
+        return {
+            "jobs": len(bots),
+            "cpu_seconds_mean": round(sum(cpu) / len(cpu), 3),
+            "cpu_seconds_max": round(max(cpu), 3),
+            "peak_rss_kb_mean": round(sum(rss) / len(rss)),
+            "peak_rss_kb_max": max(rss),
+        }
+
     async def worker(self, run_fn):
         """
         Async worker that pulls jobs from the queue and runs them.
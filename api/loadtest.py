@@ -0,0 +1,131 @@
+"""
+Load generator for the Bigas API.
+
+Drives concurrent submitters (each submits a bot, then polls /jobs/{id}
+until it finishes) plus background /leaderboard pollers, and reports
+latency percentiles per endpoint and completed jobs per second.
+
+Start the API against a stand-in runner, then point the generator at it:
+
+    BIGAS_RUNNER=fake BIGAS_FAKE_LATENCY=1.0 uvicorn api.main:app --port 8000
+    python -m api.loadtest --url http://localhost:8000 --jobs 500 --concurrency 50
+
+Stdlib only, so it runs anywhere the API does.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BOT = os.path.join(os.path.dirname(__file__), "..", "bots", "reference_bot.py")
+
+
+class Stats:
+    """Thread-safe latency samples per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, ok=True):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def _request(stats, endpoint, url, data=None):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=30) as resp:
+            body = json.loads(resp.read())
+        stats.record(endpoint, time.perf_counter() - start)
+        return body
+    except Exception:
+        stats.record(endpoint, time.perf_counter() - start, ok=False)
+        return None
+
+
+def run_job(base_url, bot_code, poll_interval, stats, n):
+    """Submit one bot and poll until it completes. Returns (status, seconds)."""
+    start = time.perf_counter()
+    form = urllib.parse.urlencode({"bot_name": f"LoadBot{n}", "code": bot_code}).encode()
+    submitted = _request(stats, "POST /submit", f"{base_url}/submit", data=form)
+    if not submitted:
+        return "submit_failed", time.perf_counter() - start
+    while True:
+        job = _request(stats, "GET /jobs/{id}", f"{base_url}/jobs/{submitted['job_id']}")
+        if job and job["status"] in ("complete", "error"):
+            return job["status"], time.perf_counter() - start
+        time.sleep(poll_interval)
+
+
+def poll_leaderboard(base_url, interval, stats, stop):
+    while not stop.is_set():
+        _request(stats, "GET /leaderboard", f"{base_url}/leaderboard")
+        stop.wait(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Bigas API.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--jobs", type=int, default=100, help="Total submissions")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent submitters")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between job polls")
+    parser.add_argument("--leaderboard-pollers", type=int, default=2)
+    parser.add_argument("--leaderboard-interval", type=float, default=1.0)
+    parser.add_argument("--bot", default=DEFAULT_BOT, help="Bot file to submit")
+    args = parser.parse_args()
+
+    with open(args.bot) as f:
+        bot_code = f.read()
+    base_url = args.url.rstrip("/")
+    stats = Stats()
+    stop = threading.Event()
+    pollers = [
+        threading.Thread(target=poll_leaderboard, args=(base_url, args.leaderboard_interval, stats, stop), daemon=True)
+        for _ in range(args.leaderboard_pollers)
+    ]
+    for t in pollers:
+        t.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda n: run_job(base_url, bot_code, args.poll_interval, stats, n),
+            range(args.jobs),
+        ))
+    wall = time.perf_counter() - start
+    stop.set()
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    turnaround = sorted(seconds for _, seconds in results)
+
+    print(f"{args.jobs} jobs, concurrency {args.concurrency}, {wall:.1f}s wall")
+    print(f"throughput: {statuses.get('complete', 0) / wall:.2f} jobs/s  statuses: {statuses}")
+    print(f"{'endpoint':<20}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    rows = [("job turnaround", turnaround, 0)] + [
+        (endpoint, sorted(values), stats.errors.get(endpoint, 0))
+        for endpoint, values in sorted(stats.samples.items())
+    ]
+    for name, values, errors in rows:
+        print(f"{name:<20}{len(values):>7}{errors:>8}"
+              + "".join(f"{percentile(values, p) * 1000:>9.1f}" for p in (50, 90, 99, 100)))
+
+
+if __name__ == "__main__":
+    main()
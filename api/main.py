@@ -1,42 +1,79 @@
 import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api import evaluation
 from api.jobs import job_store
-from api.docker_runner import build_image, run_bot
+from api.tournaments import tournament_store, TournamentBatch
+from api.docker_runner import get_backend
 from api.routes.submissions import router as submissions_router
 from api.routes.leaderboard import router as leaderboard_router
+from api.routes.tournaments import router as tournaments_router
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-NUM_WORKERS = 4  # concurrent bot runs
+NUM_WORKERS = int(os.environ.get("BIGAS_WORKERS", "4"))  # concurrent bot runs
+
+runner = get_backend()  # BIGAS_RUNNER=docker|sandbox|subprocess|fake|queue
 
 
 async def process_job(job):
+    if evaluation.max_seeds():
+        job.status = "running"
+        try:
+            await evaluation.run_round(job, runner, job_store)
+        except Exception as e:
+            job.status = "error"
+            job.error = str(e)
+            logger.error("Job %s failed: %s", job.job_id, e)
+        return
+
     job.status = "running"
+    job.progress = {"cycles_done": 0, "cycle_scores": []}
+
+    def on_cycle(cycle, score):
+        # Cycles start over when the backend retries the run with a new game
+        scores = job.progress["cycle_scores"] if cycle > job.progress["cycles_done"] else []
+        job.progress = {"cycles_done": cycle, "cycle_scores": scores + [score]}
+
     try:
-        replay = await run_bot(job.bot_code)
-        job.result = replay
-        job.status = "complete"
-        logger.info("Job %s complete — score: %.1f", job.job_id, replay.get("final_score", 0))
+        replay = await runner.run(job.bot_code, on_cycle=on_cycle)
+        job_store.complete(job, replay)
+        usage = (replay.get("usage") or {}).get("bot") or {}
+        logger.info(
+            "Job %s complete — score: %.1f, bot cpu: %.2fs, peak rss: %d KB",
+            job.job_id, replay.get("final_score", 0),
+            usage.get("cpu_user", 0) + usage.get("cpu_sys", 0), usage.get("peak_rss_kb", 0),
+        )
     except Exception as e:
         job.status = "error"
         job.error = str(e)
         logger.error("Job %s failed: %s", job.job_id, e)
 
 
+async def process(item):
+    """Queue items are submissions (Job) or tournament batches."""
+    if isinstance(item, TournamentBatch):
+        await tournament_store.run_batch(item, runner)
+    else:
+        await process_job(item)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     job_store.init()
-    build_image()  # no-op if image already exists (Docker Compose case)
+    tournament_store.init()
+    runner.prepare()  # docker: builds the image unless it already exists
+    logger.info("Using %s runner backend", runner.name)
 
     workers = [
-        asyncio.create_task(job_store.worker(process_job))
+        asyncio.create_task(job_store.worker(process))
         for _ in range(NUM_WORKERS)
     ]
     logger.info("Started %d job workers", NUM_WORKERS)
@@ -46,6 +83,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     for w in workers:
         w.cancel()
+    tournament_store.close()
 
 
 app = FastAPI(title="Bigas API", lifespan=lifespan)
@@ -59,8 +97,23 @@ app.add_middleware(
 
 app.include_router(submissions_router)
 app.include_router(leaderboard_router)
+app.include_router(tournaments_router)
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runner resource usage across completed jobs, for capacity planning."""
+    metrics = {
+        "runner": runner.name,
+        "usage": job_store.usage_summary(),
+        "replays": job_store.replays.stats(),
+    }
+    runner_stats = runner.stats()
+    if runner_stats is not None:
+        metrics[runner.name] = runner_stats
+    return metrics
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from datetime import datetime
 
 
@@ -12,14 +12,74 @@ class JobStatus(BaseModel):
     status: str  # pending | running | complete | error
     bot_name: str
     submitted_at: datetime
+    progress: Optional[dict] = None
     result: Optional[dict] = None
     error: Optional[str] = None
+    evaluation: Optional[dict] = None
 
 
 class LeaderboardEntry(BaseModel):
     rank: int
     job_id: str
     bot_name: str
-    final_score: float
+    final_score: float  # mean over the evaluated seeds when evaluation is on
     cycle_scores: List[float]
     submitted_at: datetime
+    seeds: int = 1
+    ci_low: Optional[float] = None   # 95% confidence interval of final_score
+    ci_high: Optional[float] = None
+
+
+class TournamentRequest(BaseModel):
+    job_ids: List[str]
+    seeds: Optional[List[int]] = None   # or num_seeds random ones
+    num_seeds: Optional[int] = None
+
+
+class TournamentBots(BaseModel):
+    job_ids: List[str]
+
+
+class TournamentStanding(BaseModel):
+    rank: int
+    id: str                         # job id, or the point id in a sweep
+    job_id: Optional[str] = None
+    bot_name: str
+    params: Optional[dict] = None   # sweep point
+    games: int
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    oracle_pct: Optional[float] = None  # total as a percentage of the oracle's (engine/oracle.py)
+    error: Optional[str] = None
+
+
+class SeedStats(BaseModel):
+    seed: int
+    games: int
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    oracle: Optional[float] = None       # best schedule found by engine/oracle.py
+    upper_bound: Optional[float] = None  # no bot can score more
+
+
+class TournamentStatus(BaseModel):
+    tournament_id: str
+    kind: str    # tournament | sweep
+    status: str  # running | complete
+    created_at: datetime
+    seeds: List[int]
+    games_total: int
+    games_done: int
+    standings: List[TournamentStanding]
+    seed_stats: List[SeedStats]
+    scores: Dict[str, Dict[str, float]]  # id -> seed -> final score
+
+
+class SweepRequest(BaseModel):
+    bot_name: str
+    code: str
+    space: Dict[str, Any]   # name -> list of values, or {"min", "max"} (random mode)
+    mode: str = "grid"      # grid | random
+    samples: Optional[int] = None  # points drawn in random mode
+    seeds: Optional[List[int]] = None
+    num_seeds: Optional[int] = None
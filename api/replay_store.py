@@ -0,0 +1,122 @@
+"""
+Memory-budgeted store for completed replays (action logs).
+
+Replays are kept as gzip-compressed JSON, never as dicts. The most recently
+used ones stay in memory up to a byte budget; older ones spill to one
+.json.gz file each in a local directory and are read back on demand.
+Entries in memory and on disk expire `ttl` seconds after they were stored.
+
+Job metadata and scores are not stored here — they stay resident on the
+Job so the leaderboard never touches the store.
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 60  # seconds between TTL sweeps
+
+
+class ReplayStore:
+    def __init__(self, budget_bytes: int, spill_dir: str, ttl: float):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.ttl = ttl
+        self._memory = OrderedDict()  # job_id -> (stored_at, gzip bytes), LRU order
+        self._memory_bytes = 0
+        self._spilled = {}  # job_id -> stored_at
+        self._last_sweep = time.monotonic()
+        os.makedirs(spill_dir, exist_ok=True)
+        # Job ids do not survive a restart, so neither do their spill files
+        for name in os.listdir(spill_dir):
+            if name.endswith(".json.gz"):
+                os.unlink(os.path.join(spill_dir, name))
+
+    @classmethod
+    def from_env(cls) -> "ReplayStore":
+        """BIGAS_REPLAY_BUDGET_MB (default 256), BIGAS_REPLAY_DIR, BIGAS_REPLAY_TTL_HOURS (default 72)."""
+        return cls(
+            budget_bytes=int(float(os.environ.get("BIGAS_REPLAY_BUDGET_MB", "256")) * 1024 * 1024),
+            spill_dir=os.environ.get("BIGAS_REPLAY_DIR", os.path.join(tempfile.gettempdir(), "bigas-replays")),
+            ttl=float(os.environ.get("BIGAS_REPLAY_TTL_HOURS", "72")) * 3600,
+        )
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{job_id}.json.gz")
+
+    def put(self, job_id: str, record: dict):
+        data = gzip.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+        self._insert(job_id, time.time(), data)
+        self._maybe_sweep()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """The stored record, or None if it never existed or has expired."""
+        entry = self._memory.get(job_id)
+        if entry is not None:
+            self._memory.move_to_end(job_id)
+            stored_at, data = entry
+        elif job_id in self._spilled:
+            stored_at = self._spilled.pop(job_id)
+            try:
+                with open(self._path(job_id), "rb") as f:
+                    data = f.read()
+                os.unlink(self._path(job_id))
+            except OSError as e:
+                logger.warning("Lost spilled replay %s: %s", job_id, e)
+                return None
+            self._insert(job_id, stored_at, data)
+        else:
+            return None
+        if time.time() - stored_at > self.ttl:
+            self._drop(job_id)
+            return None
+        return json.loads(gzip.decompress(data))
+
+    def _insert(self, job_id: str, stored_at: float, data: bytes):
+        self._drop(job_id)
+        self._memory[job_id] = (stored_at, data)
+        self._memory_bytes += len(data)
+        # Spill least recently used entries, but always keep the newest one
+        while self._memory_bytes > self.budget_bytes and len(self._memory) > 1:
+            old_id, (old_at, old_data) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_data)
+            try:
+                with open(self._path(old_id), "wb") as f:
+                    f.write(old_data)
+                self._spilled[old_id] = old_at
+            except OSError as e:
+                logger.error("Could not spill replay %s: %s", old_id, e)
+
+    def _drop(self, job_id: str):
+        entry = self._memory.pop(job_id, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+        if self._spilled.pop(job_id, None) is not None:
+            try:
+                os.unlink(self._path(job_id))
+            except OSError:
+                pass
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = time.monotonic()
+        cutoff = time.time() - self.ttl
+        expired = [j for j, (at, _) in self._memory.items() if at < cutoff]
+        expired += [j for j, at in self._spilled.items() if at < cutoff]
+        for job_id in expired:
+            self._drop(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "in_memory": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "budget_bytes": self.budget_bytes,
+            "spilled": len(self._spilled),
+        }
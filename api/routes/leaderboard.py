@@ -15,8 +15,13 @@ async def get_leaderboard():
             rank=rank,
             job_id=job.job_id,
             bot_name=job.bot_name,
-            final_score=job.result["final_score"],
+            final_score=job.score,
             cycle_scores=job.result["cycle_scores"],
             submitted_at=job.submitted_at,
+            **({
+                "seeds": job.evaluation["seeds"],
+                "ci_low": job.evaluation["ci_low"],
+                "ci_high": job.evaluation["ci_high"],
+            } if job.evaluation else {}),
         ))
     return result
@@ -1,11 +1,18 @@
+import asyncio
+from collections import OrderedDict
 from fastapi import APIRouter, Form, File, UploadFile, HTTPException
 from typing import Optional
+from api.bytecode import compile_bot, syntax_error_message
 from api.jobs import job_store
 from api.models import SubmitResponse, JobStatus
+from engine.replay import expand, is_action_log, state_at
 
 router = APIRouter()
 
 MAX_CODE_SIZE = 64 * 1024  # 64 KB
+EXPANDED_CACHE_SIZE = 8    # expanded replays kept for scrubbing via /state
+
+_expanded = OrderedDict()  # job_id -> expanded replay
 
 
 @router.post("/submit", response_model=SubmitResponse, status_code=202)
@@ -29,6 +36,13 @@ async def submit_bot(
             raise HTTPException(status_code=422, detail="Bot script exceeds 64 KB limit.")
         bot_code = code
 
+    # Compile once here: broken code never reaches a runner, and the
+    # bytecode is cached for every run of this exact source.
+    try:
+        compile_bot(bot_code)
+    except (SyntaxError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=syntax_error_message(e))
+
     bot_name = bot_name.strip()[:64] or "UnnamedBot"
 
     job = job_store.create(bot_name, bot_code)
@@ -43,3 +57,46 @@ async def get_job(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
     return JobStatus(**job.to_dict())
+
+
+async def _expanded_replay(job_id: str) -> dict:
+    """The job's full replay, re-simulated once and kept in a small LRU."""
+    job = job_store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job.status != "complete" or not job.result:
+        raise HTTPException(status_code=409, detail="Job has no replay yet.")
+    replay = _expanded.get(job_id)
+    if replay is not None:
+        _expanded.move_to_end(job_id)
+        return replay
+    record = job_store.replays.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=410, detail="Replay has expired.")
+    if not is_action_log(record):
+        return record
+    loop = asyncio.get_event_loop()
+    try:
+        replay = await loop.run_in_executor(None, expand, record)
+    except ValueError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    _expanded[job_id] = replay
+    if len(_expanded) > EXPANDED_CACHE_SIZE:
+        _expanded.popitem(last=False)
+    return replay
+
+
+@router.get("/jobs/{job_id}/replay")
+async def get_replay(job_id: str):
+    """Full tick-by-tick replay, re-simulated from the job's action log."""
+    return await _expanded_replay(job_id)
+
+
+@router.get("/jobs/{job_id}/state")
+async def get_state(job_id: str, cycle: int, tick: int):
+    """Grid, crops, farmer and score after tick `tick` (0-based) of cycle `cycle`."""
+    replay = await _expanded_replay(job_id)
+    try:
+        return state_at(replay, cycle, tick)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
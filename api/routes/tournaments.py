@@ -0,0 +1,113 @@
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from api.bytecode import compile_bot, syntax_error_message
+from api.jobs import job_store
+from api.models import TournamentRequest, TournamentBots, TournamentStatus, SweepRequest
+from api.routes.submissions import MAX_CODE_SIZE
+from api.sweeps import sweep_points, MAX_SWEEP_GAMES
+from api.tournaments import tournament_store, resolve_seeds, MAX_TOURNAMENT_BOTS
+
+router = APIRouter()
+
+
+def _jobs(job_ids):
+    jobs = []
+    for job_id in job_ids:
+        job = job_store.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        jobs.append(job)
+    return jobs
+
+
+def _tournament(tournament_id: str, kind: str = "tournament"):
+    tournament = tournament_store.get(tournament_id)
+    if not tournament or tournament.kind != kind:
+        raise HTTPException(status_code=404, detail=f"{kind.capitalize()} not found.")
+    return tournament
+
+
+def _stream(tournament):
+    """Newline-delimited JSON: the current status, then again after every finished game until complete."""
+
+    async def snapshots():
+        while True:
+            version = tournament.version
+            status = tournament.to_dict()
+            yield json.dumps(status) + "\n"
+            if status["status"] == "complete":
+                return
+            await tournament.wait(version)
+
+    return StreamingResponse(snapshots(), media_type="application/x-ndjson")
+
+
+@router.post("/tournaments", response_model=TournamentStatus, status_code=202)
+async def create_tournament(request: TournamentRequest):
+    try:
+        seeds = resolve_seeds(request.seeds, request.num_seeds)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not request.job_ids or len(request.job_ids) > MAX_TOURNAMENT_BOTS:
+        raise HTTPException(status_code=422, detail=f"Provide 1 to {MAX_TOURNAMENT_BOTS} job ids.")
+    jobs = _jobs(request.job_ids)
+
+    tournament = tournament_store.create(seeds)
+    for job in jobs:
+        tournament_store.add_bot(tournament, job, job_store.enqueue)
+    return TournamentStatus(**tournament.to_dict())
+
+
+@router.post("/tournaments/{tournament_id}/bots", response_model=TournamentStatus, status_code=202)
+async def add_tournament_bots(tournament_id: str, request: TournamentBots):
+    tournament = _tournament(tournament_id)
+    jobs = _jobs(request.job_ids)
+    if len(tournament.bots) + len(jobs) > MAX_TOURNAMENT_BOTS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_TOURNAMENT_BOTS} bots per tournament.")
+    for job in jobs:
+        tournament_store.add_bot(tournament, job, job_store.enqueue)
+    return TournamentStatus(**tournament.to_dict())
+
+
+@router.get("/tournaments/{tournament_id}", response_model=TournamentStatus)
+async def get_tournament(tournament_id: str):
+    return TournamentStatus(**_tournament(tournament_id).to_dict())
+
+
+@router.get("/tournaments/{tournament_id}/stream")
+async def stream_tournament(tournament_id: str):
+    return _stream(_tournament(tournament_id))
+
+
+@router.post("/sweeps", response_model=TournamentStatus, status_code=202)
+async def create_sweep(request: SweepRequest):
+    if len(request.code) > MAX_CODE_SIZE:
+        raise HTTPException(status_code=422, detail="Bot script exceeds 64 KB limit.")
+    try:
+        compile_bot(request.code)
+    except (SyntaxError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=syntax_error_message(e))
+    try:
+        seeds = resolve_seeds(request.seeds, request.num_seeds)
+        points = sweep_points(request.space, request.mode, request.samples)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if len(points) * len(seeds) > MAX_SWEEP_GAMES:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_SWEEP_GAMES} games (points × seeds) per sweep.")
+
+    bot_name = request.bot_name.strip()[:64] or "UnnamedBot"
+    sweep = tournament_store.create(seeds, kind="sweep")
+    for i, params in enumerate(points, start=1):
+        tournament_store.add_entry(sweep, f"p{i}", bot_name, request.code, job_store.enqueue, params=params)
+    return TournamentStatus(**sweep.to_dict())
+
+
+@router.get("/sweeps/{sweep_id}", response_model=TournamentStatus)
+async def get_sweep(sweep_id: str):
+    return TournamentStatus(**_tournament(sweep_id, "sweep").to_dict())
+
+
+@router.get("/sweeps/{sweep_id}/stream")
+async def stream_sweep(sweep_id: str):
+    return _stream(_tournament(sweep_id, "sweep"))
@@ -0,0 +1,214 @@
+"""
+Docker-free sandbox runner for trusted internal evaluation.
+
+Games run in a pool of pre-forked worker processes that already have the
+engine imported. Each worker also keeps a zygote (engine/zygote.py) with the
+SDK preloaded, so bots are forked in milliseconds rather than started cold.
+Each game's bot is started by engine/runner.play() with:
+  - resource limits (CPU seconds, address space, open files, file size)
+  - a scrubbed environment and a private temporary working directory
+  - its own empty network namespace, where the kernel allows it
+
+This is weaker isolation than a container — use it only for code you trust.
+Linux only (relies on fork and the resource module).
+"""
+import asyncio
+import ctypes
+import functools
+import json
+import math
+import multiprocessing
+import os
+import queue
+import resource
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from api.bytecode import compile_bot
+from api.docker_runner import CONTAINER_TIMEOUT, RecordReader, RunnerBackend, run_timeout
+
+SANDBOX_CPU_SECONDS = CONTAINER_TIMEOUT     # per game; see _play_in_worker
+SANDBOX_MEMORY_LIMIT = 256 * 1024 * 1024   # bytes of address space, as MEMORY_LIMIT
+SANDBOX_MAX_FILES = 64
+SANDBOX_MAX_FILE_SIZE = 1024 * 1024
+CLONE_NEWNET = 0x40000000
+
+_zygote = None  # per pool worker, see _warm_up
+_cancel = None  # per pool worker: the running game's cancel event, see _abandon
+
+
+class GameAbandoned(Exception):
+    """Raised in a pool worker whose game the API gave up on."""
+
+
+def _abandon(signum, frame):
+    """
+    SIGUSR1 handler in pool workers. The API sets the game's cancel event
+    before signalling, so a signal that lands after the worker has moved on
+    to another game is ignored. The exception ends the game through
+    engine/runner.play's error path, which reaps the bot.
+    """
+    if _cancel is not None and _cancel.is_set():
+        raise GameAbandoned("Game abandoned after the sandbox timeout")
+
+
+def _limit_bot(cpu_seconds=SANDBOX_CPU_SECONDS):
+    """preexec_fn for the bot process: runs in the child between fork and exec."""
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    resource.setrlimit(resource.RLIMIT_AS, (SANDBOX_MEMORY_LIMIT, SANDBOX_MEMORY_LIMIT))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (SANDBOX_MAX_FILES, SANDBOX_MAX_FILES))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (SANDBOX_MAX_FILE_SIZE, SANDBOX_MAX_FILE_SIZE))
+    # Best effort: an empty network namespace needs CAP_SYS_ADMIN or user namespaces
+    try:
+        ctypes.CDLL(None, use_errno=True).unshare(CLONE_NEWNET)
+    except Exception:
+        pass
+
+
+def _bot_env(home):
+    from engine.runner import APP_ROOT
+    return {
+        "PATH": "/usr/bin:/bin",
+        "HOME": home,
+        "PYTHONPATH": APP_ROOT,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+
+
+def _warm_up(use_zygote):
+    """Pool initializer: the engine (and zygote) are ready before the first game."""
+    global _zygote
+    import engine.runner  # noqa: F401
+    from engine.grid import load_env_corpus
+    load_env_corpus()
+    signal.signal(signal.SIGUSR1, _abandon)
+    if use_zygote:
+        from engine.zygote import Zygote
+        _zygote = Zygote(
+            env=_bot_env(tempfile.gettempdir()),
+            rlimits={
+                "RLIMIT_CPU": SANDBOX_CPU_SECONDS,
+                "RLIMIT_AS": SANDBOX_MEMORY_LIMIT,
+                "RLIMIT_NOFILE": SANDBOX_MAX_FILES,
+                "RLIMIT_FSIZE": SANDBOX_MAX_FILE_SIZE,
+            },
+            isolate_network=True,
+        )
+
+
+def _play_in_worker(bot_code: str, pyc: bytes, records, cancel, cpu_seconds: int,
+                    seeds=None, params=None) -> None:
+    """
+    Worker-side: play one game from bot.py and its compiled bot.pyc (or,
+    given seeds, a series of games with one bot process), putting the
+    worker's pid on the `records` queue, then each runner record as a JSON
+    line as it is produced, then None. Setting `cancel` and sending the
+    worker SIGUSR1 stops the game (see _abandon). The bot process gets
+    cpu_seconds of CPU time for the whole run.
+    """
+    global _cancel
+    from engine.runner import play, play_series
+
+    if cancel.is_set():
+        records.put(None)  # timed out while still queued for a worker
+        return
+    _cancel = cancel
+    records.put(os.getpid())
+    workdir = tempfile.mkdtemp(prefix="bigas-")
+    try:
+        bot_script = os.path.join(workdir, "bot.py")
+        with open(bot_script, "w") as f:
+            f.write(bot_code)
+        with open(os.path.join(workdir, "bot.pyc"), "wb") as f:
+            f.write(pyc)
+        zygote = _zygote.with_rlimits(RLIMIT_CPU=cpu_seconds) if _zygote is not None else None
+        options = dict(bot_env=_bot_env(workdir), preexec_fn=functools.partial(_limit_bot, cpu_seconds),
+                       cwd=workdir, on_record=lambda record: records.put(json.dumps(record)), zygote=zygote)
+        try:
+            if seeds is None:
+                play(bot_script, **options)
+            else:
+                play_series(bot_script, seeds, params=params, **options)
+        except (RuntimeError, GameAbandoned) as e:
+            records.put(json.dumps({"record": "error", "error": str(e)}))
+    finally:
+        _cancel = None
+        records.put(None)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class SandboxBackend(RunnerBackend):
+    """Runs games in a pre-forked process pool with rlimited bot processes."""
+
+    name = "sandbox"
+
+    def __init__(self, pool_size: int = 4, use_zygote: bool = True):
+        self.pool_size = pool_size
+        self.use_zygote = use_zygote
+        self._pool = None
+        self._manager = None
+
+    def prepare(self):
+        context = multiprocessing.get_context("fork")
+        # Record queues must be picklable to reach the pool, hence a manager
+        self._manager = context.Manager()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.pool_size, mp_context=context,
+            initializer=_warm_up, initargs=(self.use_zygote,),
+        )
+        # Fork every worker now rather than on the first submissions
+        for f in [self._pool.submit(os.getpid) for _ in range(self.pool_size)]:
+            f.result()
+
+    async def run(self, bot_code: str, on_cycle=None) -> dict:
+        reader = RecordReader(on_cycle)
+        await self._play(bot_code, None, reader, run_timeout())
+        return reader.result()
+
+    async def run_series(self, bot_code: str, seeds: list, on_game=None, params: dict = None) -> list:
+        reader = RecordReader(on_game=on_game)
+        await self._play(bot_code, list(seeds), reader, run_timeout(len(seeds)), params)
+        return reader.results()
+
+    async def _play(self, bot_code: str, seeds, reader: RecordReader, timeout: float, params=None):
+        if self._pool is None:
+            self.prepare()
+        loop = asyncio.get_event_loop()
+        try:
+            pyc = compile_bot(bot_code)
+        except (SyntaxError, ValueError) as e:
+            raise RuntimeError(f"Bot code does not compile: {e}") from e
+        records = self._manager.Queue()
+        cancel = self._manager.Event()
+        worker_pid = None
+        deadline = time.monotonic() + timeout
+        try:
+            # A series runs in one bot process, so its CPU rlimit covers every game
+            game = loop.run_in_executor(self._pool, _play_in_worker, bot_code, pyc, records, cancel,
+                                        math.ceil(timeout), seeds, params)
+            while True:
+                remaining = max(0.0, deadline - time.monotonic())
+                line = await loop.run_in_executor(None, lambda: records.get(timeout=remaining))
+                if line is None:
+                    break
+                if isinstance(line, int):
+                    worker_pid = line
+                    continue
+                reader.feed(line)
+            await game
+        except queue.Empty:
+            # Free the pool worker: without this the abandoned game keeps
+            # playing and holds one of the pool's slots until it ends
+            # (a game still queued for a worker is then skipped outright)
+            cancel.set()
+            if worker_pid is not None:
+                try:
+                    os.kill(worker_pid, signal.SIGUSR1)
+                except ProcessLookupError:
+                    pass
+            raise RuntimeError(f"Sandbox timed out after {timeout}s")
+        except Exception as e:
+            raise RuntimeError(f"Sandbox execution failed: {e}") from e
@@ -0,0 +1,78 @@
+"""
+Parameter sweeps: one bot source evaluated at many bigas.params points.
+
+The search space maps each parameter name to a list of values (grid mode:
+every combination) or, in random mode, to a list to choose from or a
+{"min", "max"} range sampled uniformly (integers when both bounds are).
+Each point becomes an entry of a sweep-kind tournament (api/tournaments.py),
+so points are played in parallel over the worker pool and the standings are
+the ranked table.
+"""
+import itertools
+import math
+import random
+from typing import Dict, List
+
+MAX_SWEEP_POINTS = 256
+MAX_SWEEP_GAMES = 5000   # points × seeds
+
+
+def grid_points(space: Dict[str, list]) -> List[dict]:
+    """
+    Every combination of the listed values. Raises ValueError on a bad space
+    or one with more than MAX_SWEEP_POINTS combinations, checked before any
+    point is built.
+    """
+    for name, values in space.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Grid parameter '{name}' needs a non-empty list of values")
+    size = math.prod(len(values) for values in space.values())
+    if size > MAX_SWEEP_POINTS:
+        raise ValueError(f"{size} points; at most {MAX_SWEEP_POINTS} per sweep")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def _sample(name, spec, rng):
+    if isinstance(spec, list) and spec:
+        return rng.choice(spec)
+    if isinstance(spec, dict) and "min" in spec and "max" in spec:
+        low, high = spec["min"], spec["max"]
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (low, high)):
+            raise ValueError(f"Parameter '{name}' needs numeric 'min' and 'max'")
+        if low > high:
+            raise ValueError(f"Parameter '{name}' has 'min' above 'max'")
+        if isinstance(low, int) and isinstance(high, int):
+            return rng.randint(low, high)
+        return rng.uniform(low, high)
+    raise ValueError(f"Parameter '{name}' needs a list of values or a {{\"min\", \"max\"}} range")
+
+
+def random_points(space: Dict[str, object], samples: int, seed: int = None) -> List[dict]:
+    """`samples` distinct points drawn from the space. Raises ValueError on a bad space."""
+    rng = random.Random(seed)
+    points = []
+    for _ in range(samples * 10):
+        point = {name: _sample(name, spec, rng) for name, spec in space.items()}
+        if point not in points:
+            points.append(point)
+        if len(points) == samples:
+            break
+    return points
+
+
+def sweep_points(space: Dict[str, object], mode: str, samples: int = None) -> List[dict]:
+    """Points of a sweep request; raises ValueError for invalid or oversized sweeps."""
+    if not space:
+        raise ValueError("The search space is empty")
+    if mode == "grid":
+        points = grid_points(space)
+    elif mode == "random":
+        if not samples or samples < 1:
+            raise ValueError("Random mode needs 'samples'")
+        points = random_points(space, min(samples, MAX_SWEEP_POINTS))
+    else:
+        raise ValueError(f"Unknown sweep mode: {mode}")
+    if len(points) > MAX_SWEEP_POINTS:
+        raise ValueError(f"{len(points)} points; at most {MAX_SWEEP_POINTS} per sweep")
+    return points
@@ -0,0 +1,181 @@
+"""
+Durable task queue in SQLite, shared by the API and standalone workers.
+
+The API's QueueBackend (api/docker_runner.py) puts one task per runner call
+and polls it; worker processes (python -m api.worker) claim tasks, run them
+with a local runner backend and write back progress events and the result.
+
+A claim is a lease: the worker must heartbeat before lease_expires or the
+task becomes claimable again (its worker is presumed dead). A task whose
+lease has expired MAX_ATTEMPTS times is failed as abandoned. Errors raised
+by the runner itself (bad bot, container failure) are final, not retried.
+
+Connections use WAL mode and a busy timeout, so any number of API and worker
+processes can share the file: on one host, or on hosts whose shared
+filesystem honours POSIX locks.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+MAX_ATTEMPTS = 3
+BUSY_TIMEOUT = 30.0  # seconds to wait for the write lock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,              -- run | series
+    payload TEXT NOT NULL,           -- JSON arguments of the runner call
+    status TEXT NOT NULL,            -- queued | leased | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    result TEXT,                     -- JSON return value of the runner call
+    error TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (status, created);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    data TEXT NOT NULL               -- JSON progress: {"cycle", "score"} or {"game": log}
+);
+CREATE INDEX IF NOT EXISTS events_task ON events (task_id, seq);
+"""
+
+
+class TaskQueue:
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "TaskQueue":
+        """BIGAS_QUEUE_PATH: the SQLite file (default: in the temp dir)."""
+        return cls(os.environ.get("BIGAS_QUEUE_PATH", os.path.join(tempfile.gettempdir(), "bigas-queue.db")))
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit mode: writes that must be atomic use BEGIN IMMEDIATE
+        db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def clear(self):
+        """Drop every task and event (the API does this at startup)."""
+        with self._connect() as db:
+            db.execute("DELETE FROM tasks")
+            db.execute("DELETE FROM events")
+
+    def put(self, kind: str, payload: dict) -> str:
+        task_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO tasks (id, kind, payload, status, created) VALUES (?, ?, ?, 'queued', ?)",
+                (task_id, kind, json.dumps(payload), time.time()),
+            )
+        return task_id
+
+    @staticmethod
+    def _fail_abandoned(db, now: float, task_id: Optional[str] = None):
+        """Fail leased tasks whose last allowed lease has expired (only task_id's, if given)."""
+        db.execute(
+            "UPDATE tasks SET status = 'failed', error = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?" + (" AND id = ?" if task_id else ""),
+            (f"Abandoned by its worker {MAX_ATTEMPTS} times", now, MAX_ATTEMPTS) + ((task_id,) if task_id else ()),
+        )
+
+    def claim(self, worker: str, lease: float) -> Optional[dict]:
+        """Lease the oldest queued (or abandoned) task: {"id", "kind", "payload", "attempts"} or None."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            self._fail_abandoned(db, now)
+            row = db.execute(
+                "SELECT id, kind, payload, attempts FROM tasks "
+                "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY created LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker, now + lease, row[0]),
+                )
+            db.execute("COMMIT")
+        if row is None:
+            return None
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "attempts": row[3] + 1}
+
+    def heartbeat(self, task_id: str, worker: str, lease: float) -> bool:
+        """Extend the lease; False if the task is no longer this worker's."""
+        with self._connect() as db:
+            cur = db.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease, task_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def add_event(self, task_id: str, data: dict):
+        with self._connect() as db:
+            db.execute("INSERT INTO events (task_id, data) VALUES (?, ?)", (task_id, json.dumps(data)))
+
+    def finish(self, task_id: str, worker: str, result=None, error: Optional[str] = None) -> bool:
+        """Record the outcome; False (and ignored) if the lease was lost meanwhile."""
+        with self._connect() as db:
+            cur = db.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                ("failed" if error is not None else "done",
+                 None if error is not None else json.dumps(result), error, task_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def events(self, task_id: str, after: int = 0) -> list:
+        """[(seq, data), ...] of the task's progress events after seq `after`."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT seq, data FROM events WHERE task_id = ? AND seq > ? ORDER BY seq",
+                (task_id, after),
+            ).fetchall()
+        return [(seq, json.loads(data)) for seq, data in rows]
+
+    def status(self, task_id: str) -> Optional[dict]:
+        """
+        {"status", "attempts", "result", "error"}, or None for an unknown task.
+        A task abandoned for the last time is failed here too, so it does not
+        wait for a live worker's claim() to notice.
+        """
+        with self._connect() as db:
+            self._fail_abandoned(db, time.time(), task_id)
+            row = db.execute(
+                "SELECT status, attempts, result, error FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "attempts": row[1],
+                "result": json.loads(row[2]) if row[2] else None, "error": row[3]}
+
+    def delete(self, task_id: str):
+        with self._connect() as db:
+            db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            db.execute("DELETE FROM events WHERE task_id = ?", (task_id,))
+
+    def stats(self) -> dict:
+        with self._connect() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            workers = db.execute(
+                "SELECT COUNT(DISTINCT worker) FROM tasks WHERE status = 'leased' AND lease_expires >= ?",
+                (time.time(),),
+            ).fetchone()[0]
+        return {s: counts.get(s, 0) for s in ("queued", "leased", "done", "failed")} | {"busy_workers": workers}
@@ -0,0 +1,336 @@
+"""
+Tournaments: every bot in a set plays every seed in a fixed list.
+
+Games are scheduled in batches of TOURNAMENT_BATCH_SIZE seeds per bot; a
+batch is one runner call in series mode (one container or sandbox bot
+process for all its seeds) and goes through the same worker queue as
+single submissions. Standings are recomputed as each game finishes.
+
+Scores are cached by (engine version, code hash, seed) in a JSON-lines file
+that survives restarts, so re-running a tournament after adding one bot
+only plays the new bot's games.
+
+A parameter sweep (api/sweeps.py) is a tournament whose entries are one bot
+source with different bigas.params; the params are part of the cache key.
+
+Standings report each bot's total as a percentage of the oracle's
+(engine/oracle.py) on the same seeds. Oracle results come from its cache
+(BIGAS_ORACLE_CACHE); seeds missing there are solved in the background on
+BIGAS_ORACLE_WORKERS processes and fill in as they finish.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from api.bytecode import code_hash
+from engine.game import ENGINE_VERSION
+from engine.oracle import OracleCache, solve as solve_oracle
+
+logger = logging.getLogger(__name__)
+
+TOURNAMENT_BATCH_SIZE = 5   # seeds per runner call
+MAX_TOURNAMENT_SEEDS = 200
+MAX_TOURNAMENT_BOTS = 64
+ORACLE_TIME_LIMIT = 1.0     # search seconds per seed solved in the background
+
+
+class ScoreCache:
+    """Final scores by (code hash, seed) for the current engine version, persisted as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._scores = {}  # (code hash, seed) -> final score
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("engine_version") == ENGINE_VERSION:
+                        self._scores[(entry["code_hash"], entry["seed"])] = entry["final_score"]
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def from_env(cls) -> "ScoreCache":
+        """BIGAS_SCORE_CACHE: path of the cache file (default: in the temp dir)."""
+        return cls(os.environ.get("BIGAS_SCORE_CACHE", os.path.join(tempfile.gettempdir(), "bigas-scores.jsonl")))
+
+    def get(self, digest: str, seed: int) -> Optional[float]:
+        return self._scores.get((digest, seed))
+
+    def put(self, digest: str, seed: int, final_score: float):
+        self._scores[(digest, seed)] = final_score
+        entry = {"engine_version": ENGINE_VERSION, "code_hash": digest, "seed": seed, "final_score": final_score}
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning("Could not persist score for %s seed %d: %s", digest[:12], seed, e)
+
+    def __len__(self):
+        return len(self._scores)
+
+
+def resolve_seeds(seeds: Optional[List[int]], num_seeds: Optional[int]) -> List[int]:
+    """The explicit seed list (deduplicated) or num_seeds random ones. Raises ValueError."""
+    if seeds:
+        seeds = list(dict.fromkeys(seeds))
+    elif num_seeds and num_seeds > 0:
+        if num_seeds > MAX_TOURNAMENT_SEEDS:
+            raise ValueError(f"At most {MAX_TOURNAMENT_SEEDS} seeds.")
+        seeds = random.sample(range(2 ** 31), num_seeds)
+    else:
+        raise ValueError("Provide either 'seeds' or 'num_seeds'.")
+    if len(seeds) > MAX_TOURNAMENT_SEEDS:
+        raise ValueError(f"At most {MAX_TOURNAMENT_SEEDS} seeds.")
+    return seeds
+
+
+def entry_hash(bot_code: str, params: Optional[dict] = None) -> str:
+    """Cache key of a bot: its code hash, combined with the params if any."""
+    if params is None:
+        return code_hash(bot_code)
+    return code_hash(bot_code + "\0" + json.dumps(params, sort_keys=True))
+
+
+def _spread(values: List[float]) -> dict:
+    return {
+        "games": len(values),
+        "mean": round(statistics.fmean(values), 2) if values else None,
+        "stddev": round(statistics.stdev(values), 2) if len(values) > 1 else None,
+    }
+
+
+def _oracle_pct(played: Dict[int, float], oracle: Dict[int, dict]) -> Optional[float]:
+    """A bot's total over the seeds with an oracle result, as a percentage of the oracle's."""
+    seeds = [s for s in played if s in oracle]
+    best = sum(oracle[s]["score"] for s in seeds)
+    if not best:
+        return None
+    return round(100 * sum(played[s] for s in seeds) / best, 1)
+
+
+class Tournament:
+    def __init__(self, seeds: List[int], kind: str = "tournament"):
+        self.tournament_id = str(uuid.uuid4())[:8]
+        self.kind = kind   # tournament | sweep
+        self.seeds = seeds
+        self.created_at = datetime.now(timezone.utc)
+        # {"id", "bot_name", "code_hash", "job_id", "params"} in the order added;
+        # id is the job id in tournaments and the point ("p1", ...) in sweeps
+        self.bots = []
+        self.scores = {}   # code hash -> {seed: final score}
+        self.errors = {}   # code hash -> error message of a failed batch
+        self.oracle = {}   # seed -> engine/oracle.py result
+        self.pending = 0   # batches queued or running
+        self.version = 0   # bumped on every change, see wait()
+        self._changed = asyncio.Event()
+
+    @property
+    def status(self) -> str:
+        return "running" if self.pending else "complete"
+
+    def record(self, digest: str, seed: int, score: float):
+        self.scores.setdefault(digest, {})[seed] = score
+        self.touch()
+
+    def touch(self):
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, version: int):
+        """Return once the tournament has changed since `version`."""
+        while self.version == version:
+            await self._changed.wait()
+
+    def to_dict(self) -> dict:
+        """Status with standings over the games finished so far."""
+        standings = []
+        for bot in self.bots:
+            played = self.scores.get(bot["code_hash"], {})
+            standings.append({
+                "id": bot["id"],
+                "job_id": bot["job_id"],
+                "bot_name": bot["bot_name"],
+                "params": bot["params"],
+                **_spread([played[s] for s in self.seeds if s in played]),
+                "oracle_pct": _oracle_pct(played, self.oracle),
+                "error": self.errors.get(bot["code_hash"]),
+            })
+        standings.sort(key=lambda e: (e["mean"] is None, -(e["mean"] or 0)))
+        for rank, entry in enumerate(standings, start=1):
+            entry["rank"] = rank
+
+        per_seed = []
+        for seed in self.seeds:
+            values = [self.scores[b["code_hash"]][seed] for b in self.bots
+                      if seed in self.scores.get(b["code_hash"], {})]
+            oracle = self.oracle.get(seed, {})
+            per_seed.append({"seed": seed, **_spread(values),
+                             "oracle": oracle.get("score"), "upper_bound": oracle.get("upper_bound")})
+
+        return {
+            "tournament_id": self.tournament_id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "seeds": self.seeds,
+            "games_total": len(self.bots) * len(self.seeds),
+            "games_done": sum(e["games"] for e in standings),
+            "standings": standings,
+            "seed_stats": per_seed,
+            "scores": {
+                b["id"]: {str(s): v for s, v in self.scores.get(b["code_hash"], {}).items()}
+                for b in self.bots
+            },
+        }
+
+
+class TournamentBatch:
+    """One queue item: a bot's code (and params) and the seeds to play with it."""
+
+    def __init__(self, tournament: Tournament, digest: str, bot_code: str, seeds: List[int],
+                 params: Optional[dict] = None):
+        self.tournament = tournament
+        self.code_hash = digest
+        self.bot_code = bot_code
+        self.seeds = seeds
+        self.params = params
+        self.status = "pending"
+        self.error: Optional[str] = None
+
+
+class TournamentStore:
+    def __init__(self):
+        self._tournaments: Dict[str, Tournament] = {}
+        self.scores: ScoreCache = None
+        self.oracles: OracleCache = None
+        self._oracle_pool = None
+        self._solving: Dict[int, asyncio.Task] = {}  # seed -> oracle run in progress
+
+    def init(self):
+        """Open the caches and start the oracle pool; called from the API's lifespan."""
+        self.scores = ScoreCache.from_env()
+        self.oracles = OracleCache.from_env()
+        workers = int(os.environ.get("BIGAS_ORACLE_WORKERS", "1"))
+        if workers > 0:
+            # Spawned, not forked: by now the API process has an event loop
+            # and executor threads, and forking a threaded process can leave
+            # the child deadlocked on a lock some other thread held
+            self._oracle_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self):
+        """Stop the oracle pool; called when the API shuts down."""
+        for task in list(self._solving.values()):
+            task.cancel()
+        if self._oracle_pool is not None:
+            self._oracle_pool.shutdown(wait=False, cancel_futures=True)
+            self._oracle_pool = None
+
+    def get(self, tournament_id: str) -> Optional[Tournament]:
+        return self._tournaments.get(tournament_id)
+
+    def create(self, seeds: List[int], kind: str = "tournament") -> Tournament:
+        tournament = Tournament(seeds, kind)
+        self._tournaments[tournament.tournament_id] = tournament
+        self._add_oracle(tournament)
+        return tournament
+
+    def _add_oracle(self, tournament: Tournament) -> None:
+        """Cached oracle results now; the rest once solved in the background (if enabled)."""
+        for seed in tournament.seeds:
+            result = self.oracles.get(seed)
+            if result is not None:
+                tournament.oracle[seed] = result
+                continue
+            task = self._solving.get(seed)
+            if task is None:
+                if self._oracle_pool is None:
+                    continue  # no solver: later seeds may still be cached
+                task = self._solving[seed] = asyncio.ensure_future(self._solve_oracle(seed))
+            task.add_done_callback(lambda t, seed=seed: self._oracle_done(tournament, seed, t))
+
+    async def _solve_oracle(self, seed: int) -> Optional[dict]:
+        loop = asyncio.get_event_loop()
+        try:
+            result = await loop.run_in_executor(self._oracle_pool, solve_oracle, seed, None, ORACLE_TIME_LIMIT)
+        except Exception as e:
+            logger.error("Oracle failed for seed %d: %s", seed, e)
+            return None
+        finally:
+            self._solving.pop(seed, None)
+        self.oracles.put(result)
+        return result
+
+    @staticmethod
+    def _oracle_done(tournament: Tournament, seed: int, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.result() is not None:
+            tournament.oracle[seed] = task.result()
+            tournament.touch()
+
+    def add_bot(self, tournament: Tournament, job, enqueue) -> None:
+        """Add a submitted bot (api.jobs.Job), see add_entry."""
+        self.add_entry(tournament, job.job_id, job.bot_name, job.bot_code, enqueue, job_id=job.job_id)
+
+    def add_entry(self, tournament: Tournament, entry_id: str, bot_name: str, bot_code: str, enqueue,
+                  job_id: Optional[str] = None, params: Optional[dict] = None) -> None:
+        """
+        Add an entry. Cached scores are filled in at once; the remaining
+        seeds are passed to enqueue() in batches. An entry whose code and
+        params are already in the tournament shares their games.
+        """
+        if any(b["id"] == entry_id for b in tournament.bots):
+            return
+        digest = entry_hash(bot_code, params)
+        known = any(b["code_hash"] == digest for b in tournament.bots)
+        tournament.bots.append({"id": entry_id, "bot_name": bot_name, "code_hash": digest,
+                                "job_id": job_id, "params": params})
+        if not known:
+            played = tournament.scores.setdefault(digest, {})
+            missing = []
+            for seed in tournament.seeds:
+                score = self.scores.get(digest, seed)
+                if score is None:
+                    missing.append(seed)
+                else:
+                    played[seed] = score
+            for i in range(0, len(missing), TOURNAMENT_BATCH_SIZE):
+                tournament.pending += 1
+                enqueue(TournamentBatch(tournament, digest, bot_code, missing[i:i + TOURNAMENT_BATCH_SIZE], params))
+        tournament.touch()
+
+    async def run_batch(self, batch: TournamentBatch, runner) -> None:
+        """Play a batch with runner.run_series, recording each score as its game ends."""
+        tournament = batch.tournament
+        batch.status = "running"
+
+        def on_game(log):
+            self.scores.put(batch.code_hash, log["seed"], log["final_score"])
+            tournament.record(batch.code_hash, log["seed"], log["final_score"])
+
+        try:
+            await runner.run_series(batch.bot_code, batch.seeds, on_game=on_game, params=batch.params)
+            batch.status = "complete"
+        except Exception as e:
+            batch.status = "error"
+            batch.error = str(e)
+            tournament.errors[batch.code_hash] = str(e)
+            logger.error("Tournament %s batch failed: %s", tournament.tournament_id, e)
+        finally:
+            tournament.pending -= 1
+            tournament.touch()
+
+
+tournament_store = TournamentStore()
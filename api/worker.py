@@ -0,0 +1,129 @@
+"""
+Standalone game worker for the durable queue (api/task_queue.py).
+
+Claims tasks put there by an API running with BIGAS_RUNNER=queue and runs
+them with a local runner backend, so runner capacity is added by starting
+more workers rather than scaling the API. While a task runs the worker
+heartbeats its lease; if the lease is lost (the API dropped the task, or the
+worker stalled long enough for another to take over) the run is cancelled.
+
+Usage (from the project root):
+    BIGAS_QUEUE_PATH=/var/lib/bigas/queue.db BIGAS_RUNNER=docker \\
+        python -m api.worker --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from api.docker_runner import get_backend
+from api.task_queue import TaskQueue
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 30.0   # heartbeats every third of this
+IDLE_POLL = 0.5        # seconds between claim attempts when the queue is empty
+
+# Progress events are written off the event loop, in order, by one thread:
+# a write waiting on another process's lock must not stall the heartbeats
+_event_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bigas-events")
+
+
+async def _execute(task, runner, queue: TaskQueue):
+    """Run one claimed task with the local backend; returns its JSON-able result."""
+    payload = task["payload"]
+    loop = asyncio.get_event_loop()
+    pending = []
+
+    def add_event(data):
+        # Tagged with the attempt, so the API can tell a retry's events apart
+        data = {**data, "attempt": task["attempts"]}
+        pending.append(loop.run_in_executor(_event_writer, queue.add_event, task["id"], data))
+
+    try:
+        if task["kind"] == "run":
+            return await runner.run(
+                payload["bot_code"],
+                on_cycle=lambda cycle, score: add_event({"cycle": cycle, "score": score}),
+            )
+        if task["kind"] == "series":
+            return await runner.run_series(
+                payload["bot_code"], payload["seeds"], params=payload.get("params"),
+                on_game=lambda log: add_event({"game": log}),
+            )
+        raise RuntimeError(f"Unknown task kind: {task['kind']}")
+    finally:
+        # Events land before the task is finished, as when they were written inline
+        for outcome in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.warning("Task %s: progress event not written: %s", task["id"][:8], outcome)
+
+
+async def _heartbeat(task_id: str, worker_id: str, queue: TaskQueue, lease: float, run: asyncio.Task,
+                     lost: list):
+    loop = asyncio.get_event_loop()
+    while not run.done():
+        await asyncio.sleep(lease / 3)
+        if not await loop.run_in_executor(None, queue.heartbeat, task_id, worker_id, lease):
+            logger.warning("Lost the lease on task %s, cancelling it", task_id[:8])
+            lost.append(task_id)
+            run.cancel()
+            return
+
+
+async def work(worker_id: str, runner, queue: TaskQueue, lease: float = LEASE_SECONDS):
+    """One claim-run-report loop; a worker process runs --concurrency of them."""
+    loop = asyncio.get_event_loop()
+    while True:
+        task = await loop.run_in_executor(None, queue.claim, worker_id, lease)
+        if task is None:
+            await asyncio.sleep(IDLE_POLL)
+            continue
+        logger.info("Task %s (%s, attempt %d) claimed", task["id"][:8], task["kind"], task["attempts"])
+        run = asyncio.ensure_future(_execute(task, runner, queue))
+        lost = []
+        beat = asyncio.ensure_future(_heartbeat(task["id"], worker_id, queue, lease, run, lost))
+        try:
+            result, error = await run, None
+        except asyncio.CancelledError:
+            if not lost:
+                raise  # the worker itself is shutting down
+            continue
+        except Exception as e:
+            result, error = None, str(e)
+        finally:
+            beat.cancel()
+        if not await loop.run_in_executor(None, queue.finish, task["id"], worker_id, result, error):
+            logger.warning("Task %s finished after its lease was lost; result dropped", task["id"][:8])
+
+
+async def main_async(concurrency: int, queue_path: str = None, lease: float = LEASE_SECONDS):
+    runner = get_backend()
+    if runner.name == "queue":
+        raise SystemExit("A worker needs a local runner backend: set BIGAS_RUNNER to docker, sandbox, ...")
+    queue = TaskQueue(queue_path) if queue_path else TaskQueue.from_env()
+    runner.prepare()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    logger.info("Worker %s: %d slots, %s backend, queue %s", worker_id, concurrency, runner.name, queue.path)
+    await asyncio.gather(*(work(worker_id, runner, queue, lease) for _ in range(concurrency)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run bigas games from the shared task queue")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("BIGAS_WORKERS", "4")),
+                        help="Games run at once (default BIGAS_WORKERS or 4)")
+    parser.add_argument("--queue", default=None, help="SQLite queue file (default BIGAS_QUEUE_PATH)")
+    parser.add_argument("--lease", type=float, default=LEASE_SECONDS,
+                        help=f"Seconds a claimed task stays ours without a heartbeat (default {LEASE_SECONDS:g})")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main_async(args.concurrency, args.queue, args.lease))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
 from bigas.game import Game
+from bigas.tuning import load_params
 
-__all__ = ["Game"]
+# Sweep parameters for this run, see bigas/tuning.py
+params = load_params()
+
+__all__ = ["Game", "params"]
@@ -25,3 +25,12 @@ class Action:
     def deposit():
         """Deposit all rice at shed. Shed must be adjacent. Cost: 1 AP per rice item."""
         return {"action": "deposit"}
+
+    @staticmethod
+    def plan(actions, abort_on=("failed", "ripe")):
+        """
+        Queue several actions, executed one per tick without a round trip.
+        The plan is cut short when a planned action fails or a crop ripens
+        (see abort_on). Cost: the sum of the queued actions.
+        """
+        return {"action": "plan", "actions": list(actions), "abort_on": list(abort_on)}
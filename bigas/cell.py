@@ -34,3 +34,27 @@ class Cell:
 
     def __repr__(self):
         return f"Cell({self.x},{self.y} type={self.type} soil={self.soil})"
+
+
+class SharedCell(Cell):
+    """
+    Cell backed by a shared grid (bigas.shared_grid): type and growth_ticks
+    are read live from the engine's buffer instead of patched from diffs.
+    The buffer is looked up through the FarmMap on every read, so a cell
+    kept from an earlier game of a series reads the current game's grid.
+    """
+
+    def __init__(self, x, y, soil, farm_map, index):
+        self.x = x
+        self.y = y
+        self.soil = soil
+        self._map = farm_map
+        self._index = index
+
+    @property
+    def type(self):
+        return self._map.shared_view.cell_type(self._index)
+
+    @property
+    def growth_ticks(self):
+        return self._map.shared_view.growth[self._index]
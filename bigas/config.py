@@ -0,0 +1,56 @@
+from bigas.constants import (
+    GRID_WIDTH, GRID_HEIGHT, NUM_ROCKS,
+    SHED_SEEDS_PER_CYCLE, AP_PER_CYCLE,
+)
+
+MAX_GRID_SIDE = 4096
+
+
+class GameConfig:
+    """
+    Per-game settings, sent to the bot in the init message.
+    Defaults are the classic 64×64 game from bigas.constants.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, num_rocks=NUM_ROCKS,
+                 seeds_per_cycle=SHED_SEEDS_PER_CYCLE, ap_per_cycle=AP_PER_CYCLE):
+        self.width = int(width)
+        self.height = int(height)
+        self.num_rocks = int(num_rocks)
+        self.seeds_per_cycle = int(seeds_per_cycle)
+        self.ap_per_cycle = int(ap_per_cycle)
+
+        if not (2 <= self.width <= MAX_GRID_SIDE and 1 <= self.height <= MAX_GRID_SIDE):
+            raise ValueError(f"Grid must be between 2x1 and {MAX_GRID_SIDE}x{MAX_GRID_SIDE}")
+        # Shed and farmer spawn cells can never hold a rock
+        if not (0 <= self.num_rocks <= self.width * self.height - 2):
+            raise ValueError("Too many rocks for the grid size")
+        if self.seeds_per_cycle < 0 or self.ap_per_cycle < 1:
+            raise ValueError("seeds_per_cycle must be >= 0 and ap_per_cycle >= 1")
+
+    @property
+    def is_classic(self):
+        """True for the default 64×64 layout rules."""
+        return (self.width, self.height, self.num_rocks) == (GRID_WIDTH, GRID_HEIGHT, NUM_ROCKS)
+
+    def to_dict(self):
+        return {
+            "width": self.width,
+            "height": self.height,
+            "num_rocks": self.num_rocks,
+            "seeds_per_cycle": self.seeds_per_cycle,
+            "ap_per_cycle": self.ap_per_cycle,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**{k: d[k] for k in cls().to_dict() if k in d})
+
+    def __eq__(self, other):
+        return isinstance(other, GameConfig) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(tuple(self.to_dict().values()))
+
+    def __repr__(self):
+        return f"GameConfig({self.width}x{self.height} rocks={self.num_rocks} seeds={self.seeds_per_cycle} ap={self.ap_per_cycle})"
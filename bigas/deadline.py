@@ -0,0 +1,124 @@
+"""
+Per-tick reply deadlines on the bot side.
+
+Every tick message carries the engine's allowance for the reply
+(engine/budget.py): "deadline": {"wall_ms": ...}, plus "cpu_ms" in CPU budget
+mode. Both count from the bot's previous reply, which is when the engine
+starts timing the next one, so TickClock measures from the SDK's last write
+to stdout: wall time with time.monotonic() and CPU time with
+time.process_time(), the same process CPU clock the engine reads.
+
+Watchdog answers a tick with a fallback action FALLBACK_RESERVE_MS before
+the deadline if the bot has not answered by then. The SDK reads stdin on a
+background thread and arms the watchdog the moment each tick message
+arrives, so ticks that come in while the bot is still busy with an older
+one are covered too, however long it stalls. Ticks are numbered in arrival
+order and a reply carries the number of the tick the bot was working on;
+one for a tick that was already answered is dropped, so the engine gets
+exactly one reply per tick and never a stale action. Like any Python thread
+the watchdog only runs between bytecodes, so a single C call that holds the
+GIL past the deadline can still make the bot miss it.
+"""
+import json
+import threading
+import time
+
+DEFAULT_DEADLINE = {"wall_ms": 150}  # engines that send none: engine/runner.py's timeout
+FALLBACK_RESERVE_MS = 10             # the fallback goes out this long before the deadline
+
+
+class TickClock:
+    """The current tick's allowance and the time used against it."""
+
+    def __init__(self):
+        self.deadline = DEFAULT_DEADLINE
+        self.mark()
+
+    def mark(self):
+        """Start counting: called whenever the bot writes a reply."""
+        self._wall = time.monotonic()
+        self._cpu = time.process_time()
+
+    def time_left(self):
+        """Milliseconds until the tightest of the wall and CPU allowances runs out."""
+        left = self.deadline["wall_ms"] - (time.monotonic() - self._wall) * 1000
+        if "cpu_ms" in self.deadline:
+            left = min(left, self.deadline["cpu_ms"] - (time.process_time() - self._cpu) * 1000)
+        return left
+
+
+class Watchdog:
+    """
+    Serializes writes to the engine and sends the fallback for ticks the
+    bot is about to miss. write(line) must put one line on stdout.
+    """
+
+    def __init__(self, clock, write, reserve_ms=FALLBACK_RESERVE_MS):
+        self._clock = clock
+        self._write = write
+        self.reserve_ms = reserve_ms
+        self._cond = threading.Condition()
+        self._ticks = 0      # tick messages received; the latest is tick number _ticks
+        self._answered = 0   # ticks up to this number are answered (or given up on)
+        self._fallback = None
+        self._thread = None
+        self.missed = 0      # ticks answered by the fallback
+
+    def arm(self, fallback, deadline=DEFAULT_DEADLINE):
+        """
+        A tick message with this deadline arrived; fallback is sent if the bot
+        misses it (None: never). Returns the tick's number.
+        """
+        with self._cond:
+            # The engine only moves on once it has a reply or has stopped
+            # waiting for one, so an earlier unanswered tick is given up on
+            self._ticks += 1
+            self._answered = self._ticks - 1
+            self._clock.deadline = deadline
+            self._fallback = fallback
+            if fallback is not None and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bigas-watchdog", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return self._ticks
+
+    def is_open(self, tick):
+        """True if tick is the latest tick and still unanswered."""
+        with self._cond:
+            return tick == self._ticks and self._answered < tick
+
+    def set_fallback(self, action, tick):
+        with self._cond:
+            if tick == self._ticks and self._answered < tick:
+                self._fallback = action
+
+    def reply(self, line, tick):
+        """Send the bot's reply to tick; False if that tick was already answered."""
+        with self._cond:
+            if tick != self._ticks or self._answered == tick:
+                return False
+            self._answered = tick
+            self._write(line)
+            self._cond.notify()
+            return True
+
+    def write(self, line):
+        """Send a line that answers no tick (the bot's name)."""
+        with self._cond:
+            self._write(line)
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if self._answered == self._ticks or self._fallback is None:
+                    self._cond.wait()
+                    continue
+                # In CPU mode CPU time cannot outrun wall time for a
+                # single-threaded bot, so sleeping on the wall clock is safe
+                left = self._clock.time_left() - self.reserve_ms
+                if left > 0:
+                    self._cond.wait(left / 1000)
+                    continue
+                self._answered = self._ticks
+                self.missed += 1
+                self._write(json.dumps(self._fallback))
@@ -0,0 +1,47 @@
+"""
+Compact grid encoding shared by the engine and the SDK.
+
+A grid is packed row-major starting at (0, 0) with two bytes per cell:
+a cell-type code followed by a soil code. The byte string is base64-encoded
+so it can travel inside the JSON init message and the replay.
+"""
+import base64
+
+from bigas.constants import (
+    CELL_EMPTY, CELL_SHED, CELL_ROCK,
+    CELL_PLANTED, CELL_GROWING, CELL_RIPE,
+)
+
+GRID_ENCODING = "b64-type-soil"
+
+# Index in these tuples is the byte value written for each cell.
+CELL_TYPE_CODES = (CELL_EMPTY, CELL_SHED, CELL_ROCK, CELL_PLANTED, CELL_GROWING, CELL_RIPE)
+SOIL_CODES = (None, "good", "great", "best")
+
+_TYPE_TO_CODE = {t: i for i, t in enumerate(CELL_TYPE_CODES)}
+_SOIL_TO_CODE = {s: i for i, s in enumerate(SOIL_CODES)}
+
+
+def encode_cells(cells):
+    """Pack an iterable of (type, soil) pairs, in row-major order, into base64."""
+    buf = bytearray()
+    for cell_type, soil in cells:
+        buf.append(_TYPE_TO_CODE[cell_type])
+        buf.append(_SOIL_TO_CODE[soil])
+    return encode_raw(buf)
+
+
+def encode_raw(raw):
+    """Base64-encode an already packed two-bytes-per-cell buffer."""
+    return base64.b64encode(bytes(raw)).decode("ascii")
+
+
+def decode_grid(data):
+    """Decode a base64 grid string back into its raw two-bytes-per-cell form."""
+    return base64.b64decode(data)
+
+
+def cell_at(raw, width, x, y):
+    """Return the (type, soil) pair stored for (x, y) in a decoded grid."""
+    i = 2 * (y * width + x)
+    return CELL_TYPE_CODES[raw[i]], SOIL_CODES[raw[i + 1]]
@@ -1,26 +1,144 @@
+from bigas.cell import Cell, SharedCell
+from bigas.constants import GRID_WIDTH, GRID_HEIGHT, CELL_PLANTED, CELL_GROWING, CELL_RIPE
+from bigas.encoding import cell_at
+from bigas.regions import RegionIndex
+
+_PLANTED_TYPES = (CELL_PLANTED, CELL_GROWING, CELL_RIPE)
+
+
 class FarmMap:
-    def __init__(self, cells):
-        # cells is a 2D list: self._grid[y][x]
-        self._grid = cells
+    def __init__(self, data, width=GRID_WIDTH, height=GRID_HEIGHT, shared=None):
+        # data is the decoded compact grid (see bigas.encoding). Cell objects
+        # are built on first access and kept in a sparse dict, so memory
+        # grows with the cells a bot looks at, not with the grid size.
+        # With `shared` (a bigas.shared_grid.SharedGridView) cells read their
+        # live state from the engine's buffer instead.
+        self._shared = None
+        self.reset(data, width, height, shared)
+
+    def reset(self, data, width=GRID_WIDTH, height=GRID_HEIGHT, shared=None):
+        """Replace the map's contents with a new initial grid (series mode)."""
+        if self._shared is not None:
+            self._shared.close()
+        self.width = width
+        self.height = height
+        self._data = data
+        self._shared = shared
+        self._cells = {}  # y * width + x -> Cell
+        self._layers = None
+        self._regions = None   # RegionIndex, built on the first region query
+        self._occupied = set()  # indices of planted cells, kept by set_cell (not shared)
+        self._indexed = None   # shared sequence _regions' occupied set reflects
+
+    @property
+    def is_shared(self):
+        return self._shared is not None
+
+    @property
+    def shared_view(self):
+        """The bigas.shared_grid.SharedGridView in shared-grid mode, else None."""
+        return self._shared
 
     def __getitem__(self, position):
         """Get cell by (x, y) tuple: farm_map[(x, y)]"""
         x, y = position
-        return self._grid[y][x]
+        return self.get(x, y)
 
     def get(self, x, y):
         """Get cell by x, y coordinates."""
-        return self._grid[y][x]
+        i = y * self.width + x
+        cell = self._cells.get(i)
+        if cell is None:
+            cell_type, soil = cell_at(self._data, self.width, x, y)
+            if self._shared is not None:
+                cell = SharedCell(x, y, soil, self, i)
+            else:
+                cell = Cell(x, y, cell_type, soil)
+            self._cells[i] = cell
+        return cell
+
+    def set_cell(self, x, y, cell_type, growth_ticks=0):
+        """Apply one engine cell change; region queries see it from then on."""
+        cell = self.get(x, y)
+        cell.type = cell_type
+        cell.growth_ticks = growth_ticks
+        if cell_type in _PLANTED_TYPES:
+            self._occupied.add(y * self.width + x)
+        else:
+            self._occupied.discard(y * self.width + x)
+
+    def planted_cells(self):
+        """(index, growth ticks) of every planted, growing or ripe cell."""
+        if self._shared is not None:
+            return self._shared.planted()
+        # Untouched cells still match the init grid, which has no crops
+        return [
+            (i, cell.growth_ticks) for i, cell in self._cells.items()
+            if cell.type in _PLANTED_TYPES
+        ]
+
+    def static_layers(self):
+        """(type codes, soil codes) of the initial grid as bytes, one per cell."""
+        if self._layers is None:
+            self._layers = (self._data[0::2], self._data[1::2])
+        return self._layers
+
+    def _region_index(self):
+        if self._regions is None:
+            types, soils = self.static_layers()
+            self._regions = RegionIndex(types, soils, self.width, self.height, self._occupied)
+        if self._shared is not None:
+            # No set_cell calls in shared mode: rescan the planted cells (in C)
+            # whenever the engine has written since the last query
+            sequence = self._shared.sequence
+            if sequence != self._indexed:
+                self._regions.occupied = {i for i, _ in self._shared.planted()}
+                self._indexed = sequence
+        return self._regions
+
+    def region_yield(self, x0, y0, x1, y1, empty_only=False):
+        """
+        Total soil yield of the cells in the inclusive rectangle (x0, y0)-(x1, y1),
+        clipped to the map; with empty_only, of the cells that are empty right now.
+        O(1) per query once the first one has built the summed-area tables;
+        with empty_only, O(planted cells) (see bigas/regions.py).
+        """
+        return self._region_index().sum("empty_yield" if empty_only else "yield", x0, y0, x1, y1)
+
+    def region_count(self, cell_type, x0, y0, x1, y1):
+        """
+        Number of CELL_EMPTY, CELL_ROCK or CELL_SHED cells in the rectangle:
+        O(1) for rocks and the shed, O(planted cells) for empty cells.
+        """
+        index = self._region_index()
+        if cell_type not in index.tables:
+            raise ValueError(f"region_count supports empty, rock and shed cells, not {cell_type!r}")
+        return index.sum(cell_type, x0, y0, x1, y1)
+
+    def best_window(self, w, h, within=None, empty_only=True):
+        """
+        Best w x h window by soil yield (of empty cells, by default) as
+        (x, y, total) with (x, y) its lowest corner; ties go to the lowest y,
+        then x. within=(x0, y0, x1, y1) keeps the window inside that inclusive
+        rectangle. None if no window fits.
+        """
+        index = self._region_index()
+        rect = index.clip(*(within or (0, 0, self.width - 1, self.height - 1)))
+        if rect is None or w < 1 or h < 1:
+            return None
+        return index.best_window("empty_yield" if empty_only else "yield", w, h, *rect)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
 
     def adjacent_cells(self, x, y):
         """Returns list of valid adjacent Cell objects around (x, y)."""
-        from bigas.constants import GRID_WIDTH, GRID_HEIGHT
         cells = []
         for dx in [-1, 0, 1]:
             for dy in [-1, 0, 1]:
                 if dx == 0 and dy == 0:
                     continue
                 nx, ny = x + dx, y + dy
-                if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                    cells.append(self._grid[ny][nx])
+                if 0 <= nx < self.width and 0 <= ny < self.height:
+                    cells.append(self.get(nx, ny))
         return cells
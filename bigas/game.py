@@ -1,10 +1,18 @@
 import sys
 import json
-from bigas.cell import Cell
+import time
+import queue
+import threading
+from bigas.config import GameConfig
 from bigas.farm_map import FarmMap
 from bigas.farmer import Farmer
 from bigas.shed import Shed
-from bigas.constants import GRID_WIDTH, GRID_HEIGHT
+from bigas.actions import Action
+from bigas.encoding import decode_grid, encode_cells
+from bigas.shared_grid import SharedGridView
+from bigas.deadline import TickClock, Watchdog, DEFAULT_DEADLINE
+
+ANYTIME_RESERVE_MS = 20  # anytime() stops this long before the deadline
 
 
 class Game:
@@ -19,10 +27,40 @@ class Game:
         self.farmer = None
         self.farm_map = None
         self.shed = None
+        self.config = None  # GameConfig: grid size, rocks, seed supply, AP
         self.score_this_cycle = 0
+        self.plan_aborted = None  # "failed" / "ripe" when the last plan was cut short
+        self.opponents = []  # other players' Farmer objects in a match
+        self.num_players = 1
+        self.game_number = 0  # increases when a series moves on to its next seed
         self._player_id = "bot"
-        self._cells = None  # 2D list maintained locally, patched each tick
+        self._bot_name = None
+        # When a tick is about to be missed the SDK replies with the fallback
+        # action instead (see bigas/deadline.py); set to False to opt out
+        self.auto_fallback = True
+        self._clock = TickClock()
+        self._watchdog = Watchdog(self._clock, self._write)
+        self._tick = None  # number of the tick the bot is answering (see Watchdog)
         self._read_initial_state()
+        # Later messages are read as they arrive, so the watchdog is armed
+        # for every tick even while the bot is still busy with an older one
+        self._inbox = queue.Queue()
+        threading.Thread(target=self._read_messages, name="bigas-reader", daemon=True).start()
+
+    def _write(self, line):
+        print(line, flush=True)
+        self._clock.mark()
+
+    def _read_messages(self):
+        """Reader thread: queue (tick number or None, message) pairs; (None, None) at EOF."""
+        for line in sys.stdin:
+            msg = json.loads(line)
+            tick = None
+            if msg["type"] == "tick":
+                tick = self._watchdog.arm(Action.WAIT if self.auto_fallback else None,
+                                          msg.get("deadline", DEFAULT_DEADLINE))
+            self._inbox.put((tick, msg))
+        self._inbox.put((None, None))
 
     def _readline(self):
         line = sys.stdin.readline()
@@ -35,57 +73,169 @@ class Game:
         raw = self._readline()
         msg = json.loads(raw)
         assert msg["type"] == "init"
+        self._apply_init(msg)
 
-        # Build the local cell grid from the initial state
-        grid_data = msg["grid"]
-        self._cells = [[None] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
-        for c in grid_data["cells"]:
-            cell = Cell(c["x"], c["y"], c["type"], c.get("soil"), c.get("growth_ticks", 0))
-            self._cells[c["y"]][c["x"]] = cell
+    def _apply_init(self, msg):
+        self.game_number += 1
+        self.cycle_number = 0
+        self.ap_remaining = 0
+        self.farmer = None
+        self.shed = None
+        self.score_this_cycle = 0
+        self.plan_aborted = None
+        self.opponents = []
+
+        self.config = GameConfig.from_dict(msg.get("config", {}))
+        if "player" in msg:
+            # Match mode: several farmers share the grid (engine/match.py)
+            self._player_id = msg["player"]
+            self.num_players = msg["num_players"]
 
-        self.farm_map = FarmMap(self._cells)
+        # Build the local cell grid from the initial state; cells are decoded
+        # lazily by FarmMap and patched from each tick's cell_changes.
+        grid_data = msg["grid"]
+        if "data" in grid_data:
+            data = grid_data["data"]
+        else:
+            # Legacy engines send one dict per cell
+            cells = sorted(grid_data["cells"], key=lambda c: (c["y"], c["x"]))
+            data = encode_cells((c["type"], c.get("soil")) for c in cells)
+        # Shared-grid mode: live cell state is read from the engine's buffer
+        shared = SharedGridView(grid_data["shared"]["path"]) if "shared" in grid_data else None
+        if self.farm_map is None:
+            self.farm_map = FarmMap(decode_grid(data), self.config.width, self.config.height, shared)
+        else:
+            # Series mode: same object, so references bots kept stay valid
+            self.farm_map.reset(decode_grid(data), self.config.width, self.config.height, shared)
 
     def ready(self, bot_name="MyFarmerBot"):
         """Signal to engine that bot is initialized and ready."""
-        print(bot_name, flush=True)
+        self._bot_name = bot_name
+        self._watchdog.write(bot_name)
 
     def update_cycle(self):
         """
         Read the next tick state from the engine.
         Patches the local FarmMap with changed cells.
         Raises SystemExit if the engine sends an 'end' message.
+        Ticks already answered with the fallback while the bot was busy are
+        applied to the local state and skipped: this returns on the first
+        tick the bot can still answer.
         """
-        raw = self._readline()
-        msg = json.loads(raw)
-
-        if msg["type"] == "end":
-            sys.exit(0)
-
-        assert msg["type"] == "tick"
-
+        while True:
+            tick, msg = self._inbox.get()
+            if msg is None or msg["type"] == "end":
+                sys.exit(0)
+            if msg["type"] == "init":
+                # Series mode: instead of "end", the engine starts the next game
+                # (new seed) in this same process. Module-level state and lookup
+                # tables survive; game_number tells the games apart.
+                self._apply_init(msg)
+                if self._bot_name is not None:
+                    self.ready(self._bot_name)
+                continue
+            assert msg["type"] == "tick"
+            self._apply_tick(msg)
+            if self._watchdog.is_open(tick):
+                self._tick = tick
+                return
+
+    def _apply_tick(self, msg):
         self.cycle_number = msg["cycle"]
-        self.ap_remaining = msg["ap_remaining"]
-        self.score_this_cycle = msg.get("score_this_cycle", 0)
-
-        f = msg["farmer"]
-        self.farmer = Farmer(f["x"], f["y"])
-        self.farmer.seeds = f["seeds"]
-        self.farmer.rice = f["rice"]
-        self.farmer.rice_grams = f["rice_grams"]
+        self.plan_aborted = msg.get("plan_aborted")
+
+        if "farmers" in msg:
+            # Match tick: one message for all players, indexed by player id
+            me = self._player_id
+            self.ap_remaining = msg["ap_remaining"][me]
+            self.score_this_cycle = msg["score_this_cycle"][me]
+            self.farmer = _farmer_from_dict(msg["farmers"][me])
+            self.opponents = [
+                _farmer_from_dict(f) for i, f in enumerate(msg["farmers"]) if i != me
+            ]
+        else:
+            self.ap_remaining = msg["ap_remaining"]
+            self.score_this_cycle = msg.get("score_this_cycle", 0)
+            self.farmer = _farmer_from_dict(msg["farmer"])
 
         s = msg["shed"]
         self.shed = Shed(0, 0, s["seeds_available"])
 
-        # Apply cell diffs
+        # Apply cell diffs (none are sent in shared-grid mode)
         for c in msg.get("cell_changes", []):
-            cell = self._cells[c["y"]][c["x"]]
-            cell.type = c["type"]
-            cell.growth_ticks = c.get("growth_ticks", 0)
+            self.farm_map.set_cell(c["x"], c["y"], c["type"], c.get("growth_ticks", 0))
 
     def end_turn(self, command):
-        """Send one action to the engine and end this tick."""
-        print(json.dumps(command), flush=True)
+        """
+        Send one action to the engine and end this tick. Ignored if the tick
+        was already answered with the fallback action (missed_deadlines).
+        """
+        self._watchdog.reply(json.dumps(command), self._tick)
+
+    def time_left(self):
+        """
+        Milliseconds left to answer the current tick: the engine's wall-clock
+        allowance and, in CPU budget mode, the CPU one, counted from the
+        previous reply. Negative once the deadline has passed.
+        """
+        return self._clock.time_left()
+
+    def set_fallback(self, action):
+        """Action sent for this tick if the bot misses its deadline (default: wait)."""
+        self._watchdog.set_fallback(action, self._tick)
+
+    @property
+    def missed_deadlines(self):
+        """Ticks answered with the fallback action because the bot was too slow."""
+        return self._watchdog.missed
+
+    def anytime(self, search_fn, reserve_ms=ANYTIME_RESERVE_MS):
+        """
+        Run an improving search until the tick's deadline and return its best
+        answer. search_fn is a generator function (or an iterable) yielding
+        successively better answers, e.g. one per deepening iteration. A new
+        step starts only if more than reserve_ms would still be left after
+        one as long as the previous step; returns the last answer, or None if
+        there was none. Answers that are actions also become the tick's
+        fallback, so a late reply still plays the best one found.
+        """
+        steps = iter(search_fn() if callable(search_fn) else search_fn)
+        best, last_step = None, 0.0
+        try:
+            while self.time_left() - reserve_ms > last_step:
+                started = time.monotonic()
+                try:
+                    answer = next(steps)
+                except StopIteration:
+                    break
+                last_step = (time.monotonic() - started) * 1000
+                best = answer
+                if isinstance(answer, dict) and "action" in answer:
+                    self.set_fallback(answer)
+        finally:
+            close = getattr(steps, "close", None)
+            if close:
+                close()
+        return best
+
+    def end_turn_plan(self, commands, abort_on=("failed", "ripe")):
+        """
+        Send an ordered list of actions. The engine plays them one per tick
+        and only messages the bot again once the plan is finished or aborted.
+        Single-player games only: matches need a reply every tick.
+        """
+        if self.num_players > 1:
+            raise RuntimeError("Action plans are not supported in matches; use end_turn()")
+        self.end_turn(Action.plan(commands, abort_on))
 
     @property
     def my_id(self):
         return self._player_id
+
+
+def _farmer_from_dict(f):
+    farmer = Farmer(f["x"], f["y"])
+    farmer.seeds = f["seeds"]
+    farmer.rice = f["rice"]
+    farmer.rice_grams = f["rice_grams"]
+    return farmer
@@ -0,0 +1,120 @@
+"""
+Summed-area tables for O(1) rectangle queries on a FarmMap.
+
+All tables come from the initial grid and never change: soil yield, rocks,
+the shed, which cells are empty, and the yield of the empty ones. Only
+planting turns an empty cell into something else, so the live empty layers
+are the initial ones minus the currently planted cells, which FarmMap keeps
+in `occupied` as crops come and go. A planted cell costs O(1) to track; an
+empty-layer sum costs O(1) plus O(planted cells), and best_window adds
+O(planted cells × window area), which stays small because the shed only
+hands out so many seeds per cycle.
+
+Tables are flattened (width + 1) × (height + 1) lists with a zero first row
+and column, so table[(y + 1) * (width + 1) + (x + 1)] is the sum over every
+cell (x', y') with x' <= x and y' <= y.
+"""
+from itertools import accumulate, product
+
+from bigas.constants import SOIL_YIELD, CELL_EMPTY, CELL_SHED, CELL_ROCK
+from bigas.encoding import CELL_TYPE_CODES, SOIL_CODES
+
+_EMPTY = CELL_TYPE_CODES.index(CELL_EMPTY)
+_SHED = CELL_TYPE_CODES.index(CELL_SHED)
+_ROCK = CELL_TYPE_CODES.index(CELL_ROCK)
+_SOIL_CODE_YIELD = [SOIL_YIELD.get(s, 0) if s else 0 for s in SOIL_CODES]
+
+
+def _fill(table, values, width, height):
+    """Compute table rows from a row-major list of cell values."""
+    stride = width + 1
+    for y in range(height):
+        above = table[y * stride:(y + 1) * stride]
+        row = accumulate(values[y * width:(y + 1) * width], initial=0)
+        table[(y + 1) * stride:(y + 2) * stride] = [a + b for a, b in zip(above, row)]
+
+
+def _table(values, width, height):
+    table = [0] * ((width + 1) * (height + 1))
+    _fill(table, values, width, height)
+    return table
+
+
+class RegionIndex:
+    """Built by FarmMap on its first region query; see FarmMap.region_yield."""
+
+    def __init__(self, types, soils, width, height, occupied=()):
+        """
+        types, soils: type and soil codes of every cell of the initial grid
+        (bigas.encoding), row-major. occupied: indices of the cells planted
+        right now; FarmMap updates the collection in place.
+        """
+        self.width = width
+        self.height = height
+        self.occupied = occupied
+        self._yields = [_SOIL_CODE_YIELD[s] for s in soils]
+        empty = [t == _EMPTY for t in types]
+        self.tables = {
+            "yield": _table(self._yields, width, height),
+            CELL_ROCK: _table([t == _ROCK for t in types], width, height),
+            CELL_SHED: _table([t == _SHED for t in types], width, height),
+            CELL_EMPTY: _table(empty, width, height),
+            "empty_yield": _table([e * y for e, y in zip(empty, self._yields)], width, height),
+        }
+
+    def _planted_value(self, layer, i):
+        """What planted cell i takes off `layer`'s initial sum (0 for static layers)."""
+        if layer == CELL_EMPTY:
+            return 1
+        if layer == "empty_yield":
+            return self._yields[i]
+        return 0
+
+    def clip(self, x0, y0, x1, y1):
+        """The inclusive rectangle clipped to the map, or None if nothing is left."""
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+        if x0 > x1 or y0 > y1:
+            return None
+        return x0, y0, x1, y1
+
+    def sum(self, layer, x0, y0, x1, y1):
+        """Sum of a layer over the inclusive rectangle (x0, y0)–(x1, y1), clipped to the map."""
+        rect = self.clip(x0, y0, x1, y1)
+        if rect is None:
+            return 0
+        x0, y0, x1, y1 = rect
+        t, s = self.tables[layer], self.width + 1
+        total = t[(y1 + 1) * s + x1 + 1] - t[y0 * s + x1 + 1] - t[(y1 + 1) * s + x0] + t[y0 * s + x0]
+        if layer in (CELL_EMPTY, "empty_yield"):
+            w = self.width
+            for i in self.occupied:
+                if x0 <= i % w <= x1 and y0 <= i // w <= y1:
+                    total -= self._planted_value(layer, i)
+        return total
+
+    def best_window(self, layer, w, h, x0, y0, x1, y1):
+        """
+        (x, y, total) of the w×h window inside the rectangle with the largest
+        layer sum; ties go to the lowest y, then the lowest x. None if none fits.
+        """
+        t, s = self.tables[layer], self.width + 1
+        # What planted cells take off each window origin they fall in
+        penalty = {}
+        if layer in (CELL_EMPTY, "empty_yield"):
+            for i in self.occupied:
+                cx, cy = i % self.width, i // self.width
+                v = self._planted_value(layer, i)
+                for wy, wx in product(range(max(y0, cy - h + 1), min(cy, y1 - h + 1) + 1),
+                                      range(max(x0, cx - w + 1), min(cx, x1 - w + 1) + 1)):
+                    penalty[wy * s + wx] = penalty.get(wy * s + wx, 0) + v
+        best = None
+        for y in range(y0, y1 - h + 2):
+            top, bottom = (y + h) * s, y * s
+            for x in range(x0, x1 - w + 2):
+                total = t[top + x + w] - t[bottom + x + w] - t[top + x] + t[bottom + x]
+                if penalty:
+                    total -= penalty.get(bottom + x, 0)
+                if best is None or total > best[2]:
+                    best = (x, y, total)
+        return best
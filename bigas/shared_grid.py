@@ -0,0 +1,140 @@
+"""
+Shared-memory grid view between the engine and a bot.
+
+In shared-grid mode the engine keeps the live grid in a file under /dev/shm
+(or the temp dir) and sends its path in the init message; the SDK maps it
+read-only and bigas.FarmMap reads cells straight from it, so tick messages
+carry no cell_changes at all.
+
+Layout (little-endian, n = width * height, cells row-major from (0, 0)):
+
+    offset  size  field
+    0       4     magic b"BGSG"
+    4       2     layout version (SHARED_GRID_VERSION)
+    6       2     width
+    8       2     height
+    10      2     reserved (0)
+    12      4     sequence: odd while the engine is writing, see below
+    16      n     cell type codes (index into bigas.encoding.CELL_TYPE_CODES)
+    16+n    n     soil codes (index into bigas.encoding.SOIL_CODES), fixed per game
+    16+2n   n     growth ticks, saturating at 255
+
+The engine only writes once it has the bot's reply (or has stopped waiting
+for it), so while the bot replies within its deadline, its reads between
+update_cycle() and end_turn() see a consistent grid. A bot still reading
+after its deadline may overlap the next tick's write.
+The sequence is bumped to an odd value before each write and to the next
+even value after it, so such a bot checks its reads like a seqlock:
+
+    seq = view.sequence
+    ...read cells...
+    if not view.unchanged_since(seq):
+        ...the grid changed meanwhile (or was mid-write): read again...
+"""
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+from bigas.encoding import CELL_TYPE_CODES
+from bigas.constants import CELL_PLANTED, CELL_GROWING, CELL_RIPE
+
+SHARED_GRID_MAGIC = b"BGSG"
+SHARED_GRID_VERSION = 2
+HEADER = struct.Struct("<4sHHHHI")
+HEADER_SIZE = HEADER.size  # 16
+_SEQUENCE_OFFSET = 12
+
+_TYPE_TO_CODE = {t: i for i, t in enumerate(CELL_TYPE_CODES)}
+# Bytes of the planted, growing and ripe codes, for scanning the type plane
+_PLANTED_RE = re.compile(b"[" + bytes(
+    _TYPE_TO_CODE[t] for t in (CELL_PLANTED, CELL_GROWING, CELL_RIPE)
+) + b"]")
+
+
+def layout_size(width, height):
+    return HEADER_SIZE + 3 * width * height
+
+
+class SharedGridView:
+    """Read-only mapping of a shared grid file (SDK side)."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, _, _ = HEADER.unpack_from(self._mm)
+        if magic != SHARED_GRID_MAGIC or version != SHARED_GRID_VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a version {SHARED_GRID_VERSION} shared grid: {path}")
+        n = self.width * self.height
+        view = memoryview(self._mm)
+        self.types = view[HEADER_SIZE:HEADER_SIZE + n]
+        self.soil = view[HEADER_SIZE + n:HEADER_SIZE + 2 * n]
+        self.growth = view[HEADER_SIZE + 2 * n:HEADER_SIZE + 3 * n]
+        self._view = view
+
+    @property
+    def sequence(self):
+        return struct.unpack_from("<I", self._mm, _SEQUENCE_OFFSET)[0]
+
+    def unchanged_since(self, sequence):
+        """True if no write was under way at `sequence` or has happened since."""
+        return sequence % 2 == 0 and self.sequence == sequence
+
+    def cell_type(self, i):
+        return CELL_TYPE_CODES[self.types[i]]
+
+    def planted(self):
+        """(index, growth ticks) of every planted, growing or ripe cell."""
+        types = self._mm[HEADER_SIZE:HEADER_SIZE + self.width * self.height]
+        return [(m.start(), self.growth[m.start()]) for m in _PLANTED_RE.finditer(types)]
+
+    def close(self):
+        for v in (self.types, self.soil, self.growth, self._view):
+            v.release()
+        self._mm.close()
+
+
+class SharedGridWriter:
+    """Engine side: owns the shared grid file and applies cell changes to it."""
+
+    def __init__(self, raw, width, height):
+        """raw: the game's initial grid in the compact two-bytes-per-cell form."""
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        fd, self.path = tempfile.mkstemp(prefix="bigas-grid-", dir=shm_dir)
+        n = width * height
+        self.width = width
+        try:
+            os.ftruncate(fd, layout_size(width, height))
+            self._mm = mmap.mmap(fd, layout_size(width, height))
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self._mm, 0, SHARED_GRID_MAGIC, SHARED_GRID_VERSION, width, height, 0, 0)
+        self._mm[HEADER_SIZE:HEADER_SIZE + n] = raw[0::2]
+        self._mm[HEADER_SIZE + n:HEADER_SIZE + 2 * n] = raw[1::2]
+        self._growth = HEADER_SIZE + 2 * n
+        self._sequence = 0
+
+    def apply(self, changes):
+        """Write a list of engine cell dicts ({"x", "y", "type", "growth_ticks"})."""
+        if not changes:
+            return
+        mm = self._mm
+        self._bump()  # odd: write in progress
+        for c in changes:
+            i = c["y"] * self.width + c["x"]
+            mm[HEADER_SIZE + i] = _TYPE_TO_CODE[c["type"]]
+            mm[self._growth + i] = min(255, c.get("growth_ticks", 0))
+        self._bump()  # even: consistent again
+
+    def _bump(self):
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        struct.pack_into("<I", self._mm, _SEQUENCE_OFFSET, self._sequence)
+
+    def close(self):
+        self._mm.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,231 @@
+"""
+Forward model of the game rules for lookahead bots.
+
+Sim mirrors engine/farmer.py, engine/shed.py and the growth rules in
+engine/grid.py for a single cycle, on compact array state:
+
+    sim = Sim.from_game(game)          # once per tick (or once per cycle)
+    for plan in candidates:
+        s = sim.clone()
+        for action in plan:
+            s.step(action)
+        ...                            # compare s.score
+
+Static cell types and soils are shared read-only bytes; crops live in a
+small dict, so clone() costs the same on a 64×64 or a 2048×2048 map.
+
+Each step() corresponds to one engine tick: the action is applied, AP is
+charged (at least 1), then passive growth advances. undo() reverts the
+last step in O(1), so depth-first search can also run on a single Sim.
+"""
+from bigas.config import GameConfig
+from bigas.constants import (
+    MAX_CARRY, SEED_GROWTH_TICKS, SHED_POSITION, FARMER_SPAWN,
+    SOIL_YIELD, CELL_EMPTY, CELL_ROCK, CELL_PLANTED, CELL_GROWING, CELL_RIPE,
+)
+from bigas.encoding import CELL_TYPE_CODES
+
+_EMPTY = CELL_TYPE_CODES.index(CELL_EMPTY)
+_ROCK = CELL_TYPE_CODES.index(CELL_ROCK)
+_YIELD = (0, SOIL_YIELD["good"], SOIL_YIELD["great"], SOIL_YIELD["best"])  # by soil code
+
+
+class Sim:
+    """Single-cycle game state with cheap clone(), step() and undo()."""
+
+    __slots__ = (
+        "width", "height", "_base", "_soil", "_planted_at",
+        "x", "y", "seeds", "rice", "rice_grams",
+        "shed_seeds", "ap", "score", "tick", "_history",
+    )
+
+    def __init__(self, base, soil, config=None):
+        """
+        base: bytes of cell-type codes (empty/shed/rock) per cell, row-major.
+        soil: bytes of soil codes per cell, row-major.
+        Both use the codes from bigas.encoding and are shared between clones.
+        The state starts at the first tick of a fresh cycle.
+        """
+        config = config or GameConfig()
+        self.width = config.width
+        self.height = config.height
+        self._base = base
+        self._soil = soil
+        # Cell index -> tick at which it was planted; growth is derived from it
+        self._planted_at = {}
+        self.x, self.y = FARMER_SPAWN
+        self.seeds = 0
+        self.rice = 0
+        self.rice_grams = 0
+        self.shed_seeds = config.seeds_per_cycle
+        self.ap = config.ap_per_cycle
+        self.score = 0
+        self.tick = 1
+        self._history = []
+
+    @classmethod
+    def from_game(cls, game):
+        """Build a Sim from the SDK's current view (call after update_cycle)."""
+        fm = game.farm_map
+        base, soil = fm.static_layers()
+        sim = cls(base, soil, game.config)
+        for i, growth_ticks in fm.planted_cells():
+            sim._planted_at[i] = sim.tick - growth_ticks
+        f = game.farmer
+        sim.x, sim.y = f.x, f.y
+        sim.seeds, sim.rice, sim.rice_grams = f.seeds, f.rice, f.rice_grams
+        sim.shed_seeds = game.shed.seeds_available
+        sim.ap = game.ap_remaining
+        sim.score = game.score_this_cycle
+        return sim
+
+    def clone(self):
+        """Independent copy of the state. The undo history is not copied."""
+        other = Sim.__new__(Sim)
+        other.width, other.height = self.width, self.height
+        other._base, other._soil = self._base, self._soil
+        other._planted_at = self._planted_at.copy()
+        other.x, other.y = self.x, self.y
+        other.seeds, other.rice, other.rice_grams = self.seeds, self.rice, self.rice_grams
+        other.shed_seeds, other.ap = self.shed_seeds, self.ap
+        other.score, other.tick = self.score, self.tick
+        other._history = []
+        return other
+
+    # ------------------------------------------------------------------
+    @property
+    def is_done(self):
+        return self.ap <= 0
+
+    @property
+    def inventory_count(self):
+        return self.seeds + self.rice
+
+    def cell_type(self, x, y):
+        """Cell type string as the engine would report it at the current tick."""
+        i = y * self.width + x
+        planted_at = self._planted_at.get(i)
+        if planted_at is None:
+            return CELL_TYPE_CODES[self._base[i]]
+        growth = self.tick - planted_at
+        if growth >= SEED_GROWTH_TICKS:
+            return CELL_RIPE
+        return CELL_GROWING if growth >= 1 else CELL_PLANTED
+
+    def growth_ticks(self, x, y):
+        planted_at = self._planted_at.get(y * self.width + x)
+        if planted_at is None:
+            return 0
+        # Ripe crops stop growing, as in Grid.tick_growth
+        return min(self.tick - planted_at, SEED_GROWTH_TICKS)
+
+    def rice_yield(self, x, y):
+        return _YIELD[self._soil[y * self.width + x]]
+
+    def _is_ripe(self, i):
+        planted_at = self._planted_at.get(i)
+        return planted_at is not None and self.tick - planted_at >= SEED_GROWTH_TICKS
+
+    def _adjacent(self, x, y):
+        return abs(self.x - x) <= 1 and abs(self.y - y) <= 1 and (self.x, self.y) != (x, y)
+
+    # ------------------------------------------------------------------
+    def step(self, action):
+        """
+        Apply one action dict (see bigas.actions.Action) and advance one tick.
+        Returns the AP charged. Invalid actions cost 1 AP, like the engine.
+        """
+        self._history.append((
+            self.x, self.y, self.seeds, self.rice, self.rice_grams,
+            self.shed_seeds, self.ap, self.score, self.tick, -1, None,
+        ))
+        cost = self._apply(action)
+        cost = max(1, cost)
+        self.ap -= cost
+        self.tick += 1
+        return cost
+
+    def undo(self):
+        """Revert the most recent step()."""
+        (self.x, self.y, self.seeds, self.rice, self.rice_grams,
+         self.shed_seeds, self.ap, self.score, self.tick, i, planted_at) = self._history.pop()
+        if i >= 0:
+            if planted_at is None:
+                del self._planted_at[i]
+            else:
+                self._planted_at[i] = planted_at
+
+    def _set_planted_at(self, i, value):
+        # Record the cell's previous value in the entry pushed by step()
+        self._history[-1] = self._history[-1][:9] + (i, self._planted_at.get(i))
+        if value is None:
+            del self._planted_at[i]
+        else:
+            self._planted_at[i] = value
+
+    def _apply(self, action):
+        name = action.get("action", "wait")
+
+        if name == "move":
+            dx = action.get("dx", 0)
+            dy = action.get("dy", 0)
+            if dx not in (-1, 0, 1) or dy not in (-1, 0, 1) or (dx == 0 and dy == 0):
+                return 1
+            nx, ny = self.x + dx, self.y + dy
+            if not (0 <= nx < self.width and 0 <= ny < self.height):
+                return 1
+            if self._base[ny * self.width + nx] == _ROCK:
+                return 1
+            self.x, self.y = nx, ny
+            return 1
+
+        if name == "get_seeds":
+            if not self._adjacent(*SHED_POSITION):
+                return 1
+            n = max(1, int(action.get("n", 1)))
+            space = MAX_CARRY - self.inventory_count
+            if space <= 0:
+                return 1
+            taken = min(n, space, self.shed_seeds)
+            self.shed_seeds -= taken
+            self.seeds += taken
+            return taken
+
+        if name == "plant":
+            tx, ty = self.x + action.get("dx", 0), self.y + action.get("dy", 0)
+            if not self._adjacent(tx, ty) or self.seeds <= 0:
+                return 1
+            if not (0 <= tx < self.width and 0 <= ty < self.height):
+                return 1
+            i = ty * self.width + tx
+            if self._base[i] != _EMPTY or i in self._planted_at:
+                return 1
+            self._set_planted_at(i, self.tick)
+            self.seeds -= 1
+            return 1
+
+        if name == "harvest":
+            tx, ty = self.x + action.get("dx", 0), self.y + action.get("dy", 0)
+            if not self._adjacent(tx, ty) or self.inventory_count >= MAX_CARRY:
+                return 1
+            if not (0 <= tx < self.width and 0 <= ty < self.height):
+                return 1
+            i = ty * self.width + tx
+            if not self._is_ripe(i):
+                return 1
+            self.rice += 1
+            self.rice_grams += _YIELD[self._soil[i]]
+            self._set_planted_at(i, None)
+            return 1
+
+        if name == "deposit":
+            if not self._adjacent(*SHED_POSITION) or self.rice <= 0:
+                return 1
+            count = self.rice
+            self.score += self.rice_grams
+            self.rice = 0
+            self.rice_grams = 0
+            return count
+
+        # wait and unknown actions
+        return 1
@@ -0,0 +1,23 @@
+"""
+Tunable parameters injected by the runner.
+
+A parameter sweep (POST /sweeps) runs the same bot source with different
+values; the runner passes each point as JSON in the BIGAS_PARAMS environment
+variable and the SDK exposes it as the `bigas.params` dict. Read values with
+a default so the bot also runs on its own:
+
+    AP_SAFE_RETURN = bigas.params.get("AP_SAFE_RETURN", 18)
+"""
+import json
+import os
+
+PARAMS_ENV = "BIGAS_PARAMS"
+
+
+def load_params():
+    """The parameter dict from BIGAS_PARAMS ({} when unset or not a JSON object)."""
+    try:
+        params = json.loads(os.environ.get(PARAMS_ENV) or "{}")
+    except ValueError:
+        return {}
+    return params if isinstance(params, dict) else {}
@@ -44,13 +44,18 @@ Action.deposit()
 Action.WAIT
     Do nothing this tick. Cost: 1 AP.
 
+game.end_turn_plan([action, action, ...], abort_on=("failed", "ripe"))
+    Queue several actions; the engine plays one per tick without asking
+    the bot. The plan stops early if a planned action fails or a crop
+    ripens; game.plan_aborted then says why on the next update_cycle().
+
 ============================================================
 USEFUL CONSTANTS
 ============================================================
 
-constants.GRID_WIDTH            # 64
-constants.GRID_HEIGHT           # 64
-constants.AP_PER_CYCLE          # 100
+constants.GRID_WIDTH            # 64  (default; see game.config)
+constants.GRID_HEIGHT           # 64  (default; see game.config)
+constants.AP_PER_CYCLE          # 100 (default; see game.config)
 constants.MAX_CARRY             # 10
 constants.SHED_SEEDS_PER_CYCLE  # 50
 constants.SEED_GROWTH_TICKS     # 5
@@ -62,7 +67,13 @@ constants.SOIL_YIELD            # {"good": 250, "great": 500, "best": 1000}
 GAME STATE  (available after game.update_cycle())
 ============================================================
 
+game.config.width, game.config.height   # Grid size for this game
+game.config.num_rocks           # Rocks on the grid
+game.config.seeds_per_cycle     # Shed seed supply per cycle
+game.config.ap_per_cycle        # AP budget per cycle
+
 game.cycle_number               # Current cycle (1 to 5)
+game.game_number                # 1, or the game within a series (one process, many seeds)
 game.ap_remaining               # AP left this cycle
 
 game.farmer.x                   # Farmer x position
@@ -80,6 +91,12 @@ game.shed.seeds_available       # Seeds left in shed this cycle
 game.farm_map.get(x, y)         # Get Cell at (x, y)
 game.farm_map[(x, y)]           # Same as above
 game.farm_map.adjacent_cells(x, y)  # List of adjacent Cell objects
+game.farm_map.in_bounds(x, y)   # True if (x, y) is on the grid
+
+game.time_left()                # Milliseconds left to answer this tick
+game.anytime(search_fn)         # Best answer a generator yields before the deadline
+game.set_fallback(action)       # Sent for you if this tick's deadline is missed (default: wait)
+game.missed_deadlines           # Ticks answered by the fallback so far
 
 ============================================================
 CELL PROPERTIES
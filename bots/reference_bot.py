@@ -29,9 +29,10 @@ from collections import deque
 # ── constants ────────────────────────────────────────────────────────────────
 SHED_X, SHED_Y = constants.SHED_POSITION
 SPAWN_X, SPAWN_Y = constants.FARMER_SPAWN
-AP_SAFE_RETURN = 18    # return to shed if AP drops below this
-SEED_REFILL_AT = 2     # go grab seeds when carrying fewer than this many
-MAX_SEEDS_GRAB = 6     # seeds to pick up per trip (leave room for rice)
+# Tunable via a parameter sweep (bigas.params); the defaults are the tuned values
+AP_SAFE_RETURN = bigas.params.get("AP_SAFE_RETURN", 18)  # return to shed if AP drops below this
+SEED_REFILL_AT = bigas.params.get("SEED_REFILL_AT", 2)   # go grab seeds when carrying fewer than this many
+MAX_SEEDS_GRAB = bigas.params.get("MAX_SEEDS_GRAB", 6)   # seeds to pick up per trip (leave room for rice)
 
 # ── helpers ─────────────────────────────────────────────────────────────────
 
@@ -87,20 +88,13 @@ def find_best_farming_spot(farm_map, farmer):
 
     for cy in range(1, 14):
         for cx in range(1, 14):
-            if not (0 <= cx < constants.GRID_WIDTH and 0 <= cy < constants.GRID_HEIGHT):
+            if not farm_map.in_bounds(cx, cy):
                 continue
             cell = farm_map.get(cx, cy)
             if not cell.is_passable:
                 continue
-            # Score = sum of rice_yield for the 3x3 neighbourhood
-            score = 0
-            for dy in range(-1, 2):
-                for dx in range(-1, 2):
-                    nx, ny = cx + dx, cy + dy
-                    if 0 <= nx < constants.GRID_WIDTH and 0 <= ny < constants.GRID_HEIGHT:
-                        nc = farm_map.get(nx, ny)
-                        if nc.is_empty and nc.soil:
-                            score += nc.rice_yield
+            # Score = sum of rice_yield of the empty cells in the 3x3 neighbourhood
+            score = farm_map.region_yield(cx - 1, cy - 1, cx + 1, cy + 1, empty_only=True)
             if score > best_score:
                 best_score = score
                 best_pos = (cx, cy)
@@ -126,7 +120,7 @@ while True:
     cycle   = game.cycle_number
 
     # Re-scout at the start of each cycle (tick 1 = first tick, ap = 100)
-    if ap == constants.AP_PER_CYCLE:
+    if ap == game.config.ap_per_cycle:
         farm_target_x, farm_target_y = find_best_farming_spot(farm_map, farmer)
 
     dist_to_shed = chebyshev(farmer.x, farmer.y, SHED_X + 1, SHED_Y)
@@ -201,7 +195,7 @@ while True:
                 if abs(dx) != radius and abs(dy) != radius:
                     continue  # only check the ring perimeter
                 nx, ny = farmer.x + dx, farmer.y + dy
-                if not (0 <= nx < constants.GRID_WIDTH and 0 <= ny < constants.GRID_HEIGHT):
+                if not farm_map.in_bounds(nx, ny):
                     continue
                 nc = farm_map.get(nx, ny)
                 if nc.is_empty and nc.soil and nc.rice_yield > best_yield:
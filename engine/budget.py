@@ -0,0 +1,146 @@
+"""
+engine/budget.py
+
+CPU-time tick budgets for bots.
+
+By default engine/runner.py gives the bot BOT_TICK_TIMEOUT seconds of wall
+clock per reply, so a throttled container or a busy host can turn the same
+bot's replies into timeouts. In CPU budget mode (BIGAS_TICK_BUDGET=cpu) the
+bot is instead charged for the CPU time its process actually used since its
+previous reply, read from the kernel's per-process CPU clock:
+
+  - every reply is granted TICK_CPU seconds; what a tick leaves unused goes
+    into a bank (capped at BANK_MAX) that later ticks may draw on
+  - the first reply of each game (the bot's name, after "init") is granted
+    INIT_CPU instead, covering interpreter startup and precomputation
+  - WALL_BACKSTOP seconds of wall clock per reply still end the wait, so a
+    bot blocked on I/O or starved of CPU altogether cannot stall the game
+
+A reply that overruns counts as a timeout exactly as in wall-clock mode, and
+the bank is emptied.
+
+Both budgets describe the next reply's allowance with deadline(), which the
+engine sends in every tick message as "deadline" (see bigas/deadline.py).
+"""
+import os
+import time
+
+TICK_CPU = 0.05        # CPU seconds granted per reply
+BANK_MAX = 1.0         # cap on unused CPU seconds carried over
+INIT_CPU = 2.0         # CPU seconds for the reply to "init"
+WALL_BACKSTOP = 2.0    # wall-clock seconds per reply, whatever the CPU use
+POLL_INTERVAL = 0.002  # seconds between CPU clock reads while waiting
+_CPUCLOCK_SCHED = 2    # see MAKE_PROCESS_CPUCLOCK in the kernel's posix-timers.h
+
+
+def process_cpu_clock(pid):
+    """Clock id of a process's CPU clock (Linux; what clock_getcpuclockid returns)."""
+    return ((~pid) << 3) | _CPUCLOCK_SCHED
+
+
+class CpuBudget:
+    """Per-bot CPU accounting for recv_fn in engine/runner.py."""
+
+    def __init__(self, pid, tick_cpu=TICK_CPU, bank_max=BANK_MAX, init_cpu=INIT_CPU,
+                 wall_backstop=WALL_BACKSTOP):
+        self.tick_cpu = tick_cpu
+        self.bank_max = bank_max
+        self.init_cpu = init_cpu
+        self.wall_backstop = wall_backstop
+        self._clock = process_cpu_clock(pid)
+        self._last_cpu = 0.0
+        self._mark = self.cpu()    # CPU time at the previous reply
+        self._grant = init_cpu     # allowance for the next reply, bank included
+        self._init = True          # the next reply answers an init
+        self.bank = 0.0
+        self.timeouts = 0
+        self.max_reply_cpu = 0.0
+
+    def cpu(self):
+        """The bot's total CPU seconds so far (its last reading once it has exited)."""
+        try:
+            self._last_cpu = time.clock_gettime(self._clock)
+        except OSError:
+            pass
+        return self._last_cpu
+
+    def on_send(self, msg):
+        """Called with every message to the bot; an init starts a new game's budget."""
+        if msg.startswith('{"type": "init"'):
+            self.bank = 0.0
+            self._grant = self.init_cpu
+            self._init = True
+
+    def wait(self, reader):
+        """
+        Wait for the reader thread to get the bot's reply within budget.
+        Returns False on overrun (CPU or wall-clock backstop).
+        """
+        deadline = time.monotonic() + self.wall_backstop
+        while True:
+            reader.join(timeout=POLL_INTERVAL)
+            used = self.cpu() - self._mark
+            if not reader.is_alive():
+                break
+            if used > self._grant or time.monotonic() > deadline:
+                self.timeouts += 1
+                self._settle(used, overrun=True)
+                return False
+        self._settle(used, overrun=False)
+        return True
+
+    def _settle(self, used, overrun):
+        self.max_reply_cpu = max(self.max_reply_cpu, used)
+        self._mark += used
+        # Unused init time is not banked
+        if overrun or self._init:
+            self.bank = 0.0
+        else:
+            self.bank = min(self.bank_max, max(0.0, self._grant - used))
+        self._init = False
+        self._grant = self.tick_cpu + self.bank
+
+    def deadline(self):
+        """The next reply's allowance, in milliseconds since the previous reply."""
+        return {"wall_ms": round(self.wall_backstop * 1000), "cpu_ms": round(self._grant * 1000, 1)}
+
+    def stats(self):
+        return {
+            "mode": "cpu",
+            "timeouts": self.timeouts,
+            "max_reply_cpu": round(self.max_reply_cpu, 4),
+        }
+
+
+class WallBudget:
+    """The default: a fixed wall-clock timeout per reply, with the same interface."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.timeouts = 0
+
+    def on_send(self, msg):
+        pass
+
+    def wait(self, reader):
+        reader.join(timeout=self.timeout)
+        if reader.is_alive():
+            self.timeouts += 1
+            return False
+        return True
+
+    def deadline(self):
+        return {"wall_ms": round(self.timeout * 1000)}
+
+    def stats(self):
+        return {"mode": "wall", "timeouts": self.timeouts}
+
+
+def make_budget(pid, wall_timeout, mode=None):
+    """
+    The reply budget for a bot process. mode "cpu" gives a CpuBudget,
+    anything else a WallBudget; the default comes from BIGAS_TICK_BUDGET.
+    """
+    if (mode or os.environ.get("BIGAS_TICK_BUDGET", "wall")) == "cpu":
+        return CpuBudget(pid)
+    return WallBudget(wall_timeout)
@@ -0,0 +1,69 @@
+"""
+engine/deadline_check.py
+
+Check of the SDK's deadline watchdog (bigas/deadline.py) against the engine.
+
+Plays a game against a bot that stalls past several tick deadlines at a
+time and fails if the engine ever timed out waiting for a reply: every
+missed tick must be answered by the SDK's fallback action instead.
+
+Usage:
+    python -m engine.deadline_check --stall-ms 450 --every 10
+"""
+import sys
+import os
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from engine.game import GameEngine
+from engine.runner import start_bot, reap_bot
+
+STALL_BOT = """
+import time
+from bigas.game import Game
+from bigas.actions import Action
+
+game = Game()
+game.ready("Staller")
+ticks = 0
+while True:
+    game.update_cycle()
+    ticks += 1
+    if ticks % {every} == 0:
+        time.sleep({stall_ms} / 1000)
+    game.end_turn(Action.WAIT)
+"""
+
+
+def check_stalls(stall_ms, every, seed=0, budget=None):
+    """Play one game against the stalling bot. Returns the reply budget's stats."""
+    with tempfile.TemporaryDirectory(prefix="bigas-") as workdir:
+        bot_script = os.path.join(workdir, "bot.py")
+        with open(bot_script, "w") as f:
+            f.write(STALL_BOT.format(stall_ms=stall_ms, every=every))
+        proc, send_fn, recv_fn = start_bot(bot_script, budget=budget)
+        try:
+            GameEngine(send_fn=send_fn, recv_fn=recv_fn, grid_seed=seed,
+                       deadline_fn=proc.budget.deadline).run()
+        finally:
+            reap_bot(proc)
+    return proc.budget.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that stalling bots never make the engine time out.")
+    parser.add_argument("--stall-ms", type=int, default=450, help="How long the bot stalls")
+    parser.add_argument("--every", type=int, default=10, help="Stall on every Nth tick the bot answers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", choices=("wall", "cpu"), default="wall")
+    args = parser.parse_args()
+
+    stats = check_stalls(args.stall_ms, args.every, args.seed, args.budget)
+    print(f"Engine-side reply timeouts ({stats['mode']} budget): {stats['timeouts']}")
+    sys.exit(1 if stats["timeouts"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,15 @@ from bigas.constants import (
 
 
 class Farmer:
-    def __init__(self):
-        self.x, self.y = FARMER_SPAWN
+    def __init__(self, spawn=FARMER_SPAWN):
+        self.spawn = spawn
+        self.x, self.y = spawn
         self.seeds = 0
         self.rice = 0
         self.rice_grams = 0
 
     def reset(self):
-        self.x, self.y = FARMER_SPAWN
+        self.x, self.y = self.spawn
         self.seeds = 0
         self.rice = 0
         self.rice_grams = 0
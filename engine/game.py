@@ -1,9 +1,23 @@
 import json
-from bigas.constants import CYCLES_PER_RUN, AP_PER_CYCLE
+import random
+from bigas.constants import CYCLES_PER_RUN, CELL_RIPE
+from bigas.config import GameConfig
+from bigas.encoding import GRID_ENCODING, decode_grid
+from bigas.shared_grid import SharedGridWriter, SHARED_GRID_VERSION
 from engine.grid import Grid
 from engine.farmer import Farmer
 from engine.shed import Shed
 
+# Bumped whenever a rule change would make old action logs replay differently.
+ENGINE_VERSION = "1"
+
+# A plan stops early when a planned action has no effect ("failed") or when
+# a crop ripens ("ripe"); the bot is then messaged with "plan_aborted".
+DEFAULT_PLAN_ABORT = ["failed", "ripe"]
+
+# Ticks between grid keyframes in expanded replays (see engine/replay.py)
+KEYFRAME_INTERVAL = 20
+
 
 class GameEngine:
     """
@@ -12,43 +26,88 @@ class GameEngine:
     via send/receive callables, and records a full replay.
     """
 
-    def __init__(self, send_fn, recv_fn, grid_seed=None):
+    def __init__(self, send_fn, recv_fn, grid_seed=None, config=None, series=None,
+                 shared_grid=False, keyframe_interval=None, deadline_fn=None):
         """
         send_fn(msg_str): write a line to bot stdin
         recv_fn() -> str: read a line from bot stdout (may return None on timeout/error)
+        config: GameConfig for grid size, rocks, seed supply and AP (default: classic game)
+        series: {"game": i, "games": n} when this game is part of a series (see run_series)
+        shared_grid: expose the live grid through bigas.shared_grid instead of
+                     sending cell_changes in every tick message
+        keyframe_interval: record a full-grid keyframe in each cycle entry at
+                     cycle start and after every that many ticks (None: off)
+        deadline_fn() -> dict: the bot's reply allowance, sent in every tick
+                     message as "deadline" (see engine/budget.py)
         """
         self._send = send_fn
         self._recv = recv_fn
-        self.grid = Grid(seed=grid_seed)
+        # Always play on a known seed so the game can be re-simulated later
+        if grid_seed is None:
+            grid_seed = random.randrange(2 ** 31)
+        self.grid_seed = grid_seed
+        self.config = config or GameConfig()
+        self.grid = Grid(seed=grid_seed, config=self.config)
         self.farmer = Farmer()
-        self.shed = Shed()
+        self.shed = Shed(self.config.seeds_per_cycle)
         self.bot_name = "UnknownBot"
+        self.series = series
+        self.shared_grid = shared_grid
+        self._shared = None  # SharedGridWriter while a shared-grid game runs
+        self.keyframe_interval = keyframe_interval
+        self._deadline_fn = deadline_fn
+        # Encoded once and shared by the init message and the replay.
+        self.initial_grid = {
+            "width": self.config.width,
+            "height": self.config.height,
+            "encoding": GRID_ENCODING,
+            "data": self.grid.encode(),
+        }
         self.replay = {
+            "engine_version": ENGINE_VERSION,
+            "seed": grid_seed,
+            "config": self.config.to_dict(),
             "bot_name": "",
             "final_score": 0.0,
             "cycle_scores": [],
-            "initial_grid": {
-                "width": 64,
-                "height": 64,
-                "cells": [],
-            },
+            "initial_grid": self.initial_grid,
             "cycles": [],
         }
 
-    def run(self):
-        """Execute the full game (init + 5 cycles). Returns the replay dict."""
+    def run(self, on_cycle=None, final=True):
+        """
+        Execute the full game (init + 5 cycles). Returns the replay dict.
+        on_cycle(cycle) is called with each cycle's replay entry as it completes.
+        With final=False the bot is not sent "end": the next game of a series
+        follows on the same connection.
+        """
+        if self.shared_grid:
+            self._shared = SharedGridWriter(
+                decode_grid(self.initial_grid["data"]), self.config.width, self.config.height
+            )
+        try:
+            return self._run(on_cycle, final)
+        finally:
+            if self._shared:
+                self._shared.close()
+                self._shared = None
+
+    def _run(self, on_cycle, final):
         self._send_init()
         self.bot_name = self._recv() or "UnknownBot"
         self.bot_name = self.bot_name.strip()[:64]
         self.replay["bot_name"] = self.bot_name
-        self.replay["initial_grid"]["cells"] = self.grid.all_cells_as_dicts()
 
         cycle_scores = []
         for cycle_num in range(1, CYCLES_PER_RUN + 1):
-            score = self._run_cycle(cycle_num)
-            cycle_scores.append(score)
+            cycle = self._run_cycle(cycle_num)
+            self.replay["cycles"].append(cycle)
+            cycle_scores.append(cycle["score"])
+            if on_cycle:
+                on_cycle(cycle)
 
-        self._send(json.dumps({"type": "end"}))
+        if final:
+            self._send(json.dumps({"type": "end"}))
         self.replay["cycle_scores"] = cycle_scores
         self.replay["final_score"] = sum(cycle_scores) / len(cycle_scores)
         return self.replay
@@ -58,78 +117,178 @@ class GameEngine:
     def _send_init(self):
         msg = {
             "type": "init",
-            "grid": {
-                "width": 64,
-                "height": 64,
-                "cells": self.grid.all_cells_as_dicts(),
-            },
+            "config": self.config.to_dict(),
+            "grid": self.initial_grid,
         }
+        if self._shared:
+            msg["grid"] = {
+                **self.initial_grid,
+                "shared": {"path": self._shared.path, "version": SHARED_GRID_VERSION},
+            }
+        if self.series:
+            msg["series"] = self.series
         self._send(json.dumps(msg))
 
-    def _run_cycle(self, cycle_num):
+    def _run_cycle(self, cycle_num, actions=None):
+        """
+        Play one cycle and return its replay entry.
+        When `actions` is given (one action dict per tick, as recorded in a
+        replay), they are played instead of messaging the bot.
+        """
         # reset_cycle returns every cell that changed (planted→empty etc.)
         # so the bot SDK can sync its FarmMap on the very first tick.
         reset_changes = self.grid.reset_cycle()
+        self._sync_shared(reset_changes)
         self.farmer.reset()
         self.shed.restock()
 
-        ap = AP_PER_CYCLE
+        ap = self.config.ap_per_cycle
         score_this_cycle = 0
         ticks = []
         # Seed pending changes with the cycle-reset diffs so the bot sees a
         # clean slate on the first tick of every cycle.
         pending_cell_changes = reset_changes
+        # Remaining actions of a bot-submitted plan. While non-empty, ticks run
+        # without messaging the bot and cell changes accumulate until it is.
+        plan = []
+        abort_on = ()
+        plan_aborted = None
+        keyframes = []
+        if self.keyframe_interval:
+            keyframes.append(self._keyframe(0))
 
         while ap > 0:
             # 1. Apply passive growth
             growth_changes = self.grid.tick_growth()
+            self._sync_shared(growth_changes)
+            if plan and "ripe" in abort_on and any(c["type"] == CELL_RIPE for c in growth_changes):
+                plan, plan_aborted = [], "ripe"
 
-            # 2. Build and send tick state.
-            #    Include both this tick's growth changes AND the previous tick's
-            #    action changes so the SDK's local FarmMap stays accurate.
-            tick_msg = {
-                "type": "tick",
-                "cycle": cycle_num,
-                "ap_remaining": ap,
-                "farmer": self.farmer.to_dict(),
-                "shed": self.shed.to_dict(),
-                "score_this_cycle": score_this_cycle,
-                "cell_changes": pending_cell_changes + growth_changes,
-            }
-            self._send(json.dumps(tick_msg))
+            if plan:
+                # 2a. Next planned action — no round trip to the bot
+                action = plan.pop(0)
+                from_plan = True
+                pending_cell_changes = pending_cell_changes + growth_changes
+            elif actions is not None:
+                # 2b. Re-simulation from an action log — no bot attached
+                action = actions[len(ticks)] if len(ticks) < len(actions) else {}
+                from_plan = False
+                pending_cell_changes = []
+            else:
+                # 2. Build and send tick state.
+                #    Include both this tick's growth changes AND every change
+                #    since the bot was last messaged so the SDK's local
+                #    FarmMap stays accurate.
+                tick_msg = {
+                    "type": "tick",
+                    "cycle": cycle_num,
+                    "ap_remaining": ap,
+                    "farmer": self.farmer.to_dict(),
+                    "shed": self.shed.to_dict(),
+                    "score_this_cycle": score_this_cycle,
+                }
+                if not self._shared:
+                    tick_msg["cell_changes"] = pending_cell_changes + growth_changes
+                if self._deadline_fn:
+                    tick_msg["deadline"] = self._deadline_fn()
+                if plan_aborted:
+                    tick_msg["plan_aborted"] = plan_aborted
+                    plan_aborted = None
+                self._send(json.dumps(tick_msg))
+                pending_cell_changes = []
 
-            # 3. Receive action from bot
-            raw = self._recv()
-            action = {}
-            if raw:
-                try:
-                    action = json.loads(raw.strip())
-                except (json.JSONDecodeError, ValueError):
-                    action = {"action": "wait"}
+                # 3. Receive action from bot
+                raw = self._recv()
+                action = {}
+                if raw:
+                    try:
+                        action = json.loads(raw.strip())
+                    except (json.JSONDecodeError, ValueError):
+                        action = {"action": "wait"}
+
+                from_plan = action.get("action") == "plan"
+                if from_plan:
+                    plan, abort_on = _unpack_plan(action, self.config.ap_per_cycle)
+                    action = plan.pop(0) if plan else {"action": "wait"}
 
             # 4. Apply action
+            before = self.farmer.to_dict()
             ap_cost, action_changes, score_delta = self.farmer.apply_action(
                 action, self.grid, self.shed
             )
+            self._sync_shared(action_changes)
             score_this_cycle += score_delta
             ap -= max(1, ap_cost)  # always cost at least 1 AP
+            if (from_plan and plan and "failed" in abort_on
+                    and action.get("action") != "wait"
+                    and self.farmer.to_dict() == before):
+                plan, plan_aborted = [], "failed"
 
-            # 5. Carry action cell changes into next tick's message
-            pending_cell_changes = action_changes
+            # 5. Carry action cell changes into the next tick's message
+            pending_cell_changes = pending_cell_changes + action_changes
 
             # 6. Record tick in replay (growth + action changes combined)
             ticks.append({
-                "tick": AP_PER_CYCLE - ap,
+                "tick": self.config.ap_per_cycle - ap,
                 "ap_remaining": ap,
                 "farmer": self.farmer.to_dict(),
                 "action": action,
                 "cell_changes": growth_changes + action_changes,
                 "score_this_cycle": score_this_cycle,
             })
+            if self.keyframe_interval and len(ticks) % self.keyframe_interval == 0:
+                keyframes.append(self._keyframe(len(ticks)))
 
-        self.replay["cycles"].append({
+        cycle = {
             "cycle": cycle_num,
             "score": score_this_cycle,
             "ticks": ticks,
-        })
-        return score_this_cycle
+        }
+        if self.keyframe_interval:
+            cycle["keyframes"] = keyframes
+        return cycle
+
+    def _keyframe(self, after):
+        """Full grid state once `after` ticks of the current cycle have been applied."""
+        return {"after": after, "grid": self.grid.encode(), "crops": self.grid.crops()}
+
+
+    def _sync_shared(self, changes):
+        if self._shared:
+            self._shared.apply(changes)
+
+
+def run_series(send_fn, recv_fn, seeds, config=None, on_cycle=None, shared_grid=False, on_game=None,
+               deadline_fn=None):
+    """
+    Play one game per seed against a single bot connection and return the
+    list of replays. Between games the bot gets the next "init" instead of
+    "end" and the SDK rebuilds its state in place, so the bot process, its
+    imports and any precomputed tables carry over. on_cycle(engine, cycle)
+    is called as cycles complete and on_game(engine, replay) as games do;
+    engine.series["game"] is the 1-based game number.
+    """
+    replays = []
+    for i, seed in enumerate(seeds):
+        engine = GameEngine(
+            send_fn, recv_fn, grid_seed=seed, config=config,
+            series={"game": i + 1, "games": len(seeds)}, shared_grid=shared_grid,
+            deadline_fn=deadline_fn,
+        )
+        callback = (lambda cycle, engine=engine: on_cycle(engine, cycle)) if on_cycle else None
+        replays.append(engine.run(on_cycle=callback, final=i == len(seeds) - 1))
+        if on_game:
+            on_game(engine, replays[-1])
+    return replays
+
+
+def _unpack_plan(msg, max_length):
+    """Validate a plan message. Returns (list of action dicts, abort triggers)."""
+    actions = msg.get("actions")
+    if not isinstance(actions, list):
+        return [], ()
+    actions = [a for a in actions[:max_length] if isinstance(a, dict) and a.get("action") != "plan"]
+    abort_on = msg.get("abort_on", DEFAULT_PLAN_ABORT)
+    if not isinstance(abort_on, list):
+        abort_on = DEFAULT_PLAN_ABORT
+    return actions, tuple(abort_on)
@@ -1,6 +1,16 @@
+import os
+import sys
+import json
 import random
+import argparse
+from collections import OrderedDict
+from bigas.config import GameConfig
+from bigas.encoding import (
+    CELL_TYPE_CODES, SOIL_CODES,
+    encode_raw, decode_grid,
+)
 from bigas.constants import (
-    GRID_WIDTH, GRID_HEIGHT, NUM_ROCKS,
+    GRID_WIDTH, GRID_HEIGHT,
     SHED_POSITION, FARMER_SPAWN,
     CELL_EMPTY, CELL_SHED, CELL_ROCK,
     CELL_PLANTED, CELL_GROWING, CELL_RIPE,
@@ -9,6 +19,15 @@ from bigas.constants import (
 SOIL_TYPES = ["good", "great", "best"]
 PROTECTED = {SHED_POSITION, FARMER_SPAWN}
 
+TEMPLATE_CACHE_SIZE = 256   # layouts kept in the template LRU
+SEED_CORPUS_ENV = "BIGAS_SEED_CORPUS"  # corpus loaded at runner / sandbox worker start-up
+_SHED_CODE = CELL_TYPE_CODES.index(CELL_SHED)
+_ROCK_CODE = CELL_TYPE_CODES.index(CELL_ROCK)
+# Random byte -> soil code (1..3) for large-grid generation. Bytes from
+# _SOIL_BYTE_LIMIT up map to 0 and are redrawn, so all soils are equally likely.
+_SOIL_BYTE_LIMIT = 256 - 256 % len(SOIL_TYPES)
+_SOIL_BYTE_TABLE = bytes(1 + b % len(SOIL_TYPES) if b < _SOIL_BYTE_LIMIT else 0 for b in range(256))
+
 
 class GridCell:
     __slots__ = ("x", "y", "type", "soil", "growth_ticks")
@@ -30,50 +49,188 @@ class GridCell:
         }
 
 
-class Grid:
-    def __init__(self, seed=None):
+class GridTemplate:
+    """
+    Immutable starting layout for one seed and grid shape.
+    `raw` is the compact two-bytes-per-cell form from bigas.encoding.
+    """
+    __slots__ = ("seed", "width", "height", "raw", "types", "encoded")
+
+    def __init__(self, seed, raw, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.raw = raw
+        self.types = raw[0::2]
+        self.encoded = None
+
+    @classmethod
+    def generate(cls, seed, config=None):
+        config = config or GameConfig()
+        width, height = config.width, config.height
+        n = width * height
         rng = random.Random(seed)
-        self._cells = [[None] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
-
-        # Place shed
-        sx, sy = SHED_POSITION
-        self._cells[sy][sx] = GridCell(sx, sy, CELL_SHED, soil=None)
-
-        # Place rocks (not on protected cells)
-        available = [
-            (x, y)
-            for y in range(GRID_HEIGHT)
-            for x in range(GRID_WIDTH)
-            if (x, y) not in PROTECTED
-        ]
-        rock_positions = set(map(tuple, rng.sample(available, NUM_ROCKS)))
-
-        # Fill all other cells with empty + random soil
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                if self._cells[y][x] is not None:
-                    continue
-                if (x, y) in rock_positions:
-                    self._cells[y][x] = GridCell(x, y, CELL_ROCK, soil=None)
-                else:
-                    soil = rng.choice(SOIL_TYPES)
-                    self._cells[y][x] = GridCell(x, y, CELL_EMPTY, soil=soil)
+
+        # Place rocks (not on protected cells). Sampling indices of the
+        # non-protected cells picks the same cells as sampling the cells.
+        protected = sorted(y * width + x for x, y in PROTECTED)
+        rocks = []
+        for j in rng.sample(range(n - len(protected)), config.num_rocks):
+            for p in protected:
+                if j >= p:
+                    j += 1
+            rocks.append(j)
+
+        shed = SHED_POSITION[1] * width + SHED_POSITION[0]
+        types = bytearray(n)  # all CELL_EMPTY
+        types[shed] = _SHED_CODE
+        for i in rocks:
+            types[i] = _ROCK_CODE
+
+        if config.is_classic:
+            # One rng.choice per soil cell, row-major, as the 64×64 game always has
+            soils = bytearray(n)
+            for i in range(n):
+                if types[i] == 0:
+                    soils[i] = SOIL_CODES.index(rng.choice(SOIL_TYPES))
+        else:
+            # Large grids: draw every soil at once in C
+            soils = bytearray(rng.randbytes(n).translate(_SOIL_BYTE_TABLE))
+            i = soils.find(0)
+            while i != -1:
+                soils[i] = 1 + rng.randrange(len(SOIL_TYPES))
+                i = soils.find(0, i + 1)
+            soils[shed] = 0
+            for i in rocks:
+                soils[i] = 0
+
+        raw = bytearray(2 * n)
+        raw[0::2] = types
+        raw[1::2] = soils
+        return cls(seed, bytes(raw), width, height)
+
+    def encode(self):
+        if self.encoded is None:
+            self.encoded = encode_raw(self.raw)
+        return self.encoded
+
+
+_template_cache = OrderedDict()
+_corpus = {}  # layout key -> encoded layout from a loaded seed corpus; never evicted
+
+
+def _layout_key(seed, config):
+    return (seed, config.width, config.height, config.num_rocks)
+
+
+def get_template(seed, config=None):
+    """
+    Return the GridTemplate for `seed` and the grid shape in `config`,
+    decoding it from a loaded seed corpus or generating it on a cache miss.
+    Seeded templates are kept in a bounded LRU; seed=None is never cached.
+    """
+    config = config or GameConfig()
+    if seed is None:
+        return GridTemplate.generate(None, config)
+    key = _layout_key(seed, config)
+    template = _template_cache.get(key)
+    if template is not None:
+        _template_cache.move_to_end(key)
+        return template
+    encoded = _corpus.get(key)
+    if encoded is not None:
+        template = GridTemplate(seed, decode_grid(encoded), config.width, config.height)
+        template.encoded = encoded
+    else:
+        template = GridTemplate.generate(seed, config)
+    _remember(key, template)
+    return template
+
+
+def _remember(key, template):
+    _template_cache[key] = template
+    _template_cache.move_to_end(key)
+    while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+        _template_cache.popitem(last=False)
+
+
+def save_seed_corpus(path, seeds, config=None):
+    """Pre-generate templates for `seeds` and write them to a JSON file."""
+    config = config or GameConfig()
+    corpus = {str(seed): get_template(seed, config).encode() for seed in seeds}
+    with open(path, "w") as f:
+        json.dump({"config": config.to_dict(), "seeds": corpus}, f)
+
+
+def load_seed_corpus(path):
+    """
+    Load a corpus written by save_seed_corpus for get_template.
+    Returns (config, list of seeds loaded). Corpus layouts are kept for the
+    life of the process beside the LRU, so none is evicted however large the
+    corpus; each is decoded on first use.
+    """
+    with open(path) as f:
+        corpus = json.load(f)
+    config = GameConfig.from_dict(corpus["config"])
+    seeds = [int(key) for key in corpus["seeds"]]
+    for seed, encoded in zip(seeds, corpus["seeds"].values()):
+        _corpus[_layout_key(seed, config)] = encoded
+    return config, seeds
+
+
+def load_env_corpus():
+    """
+    Load the corpus at BIGAS_SEED_CORPUS, if set (runner and sandbox worker
+    start-up). Returns the seeds loaded; a corpus that cannot be read is
+    reported on stderr and skipped, as layouts can always be generated.
+    """
+    path = os.environ.get(SEED_CORPUS_ENV)
+    if not path:
+        return []
+    try:
+        return load_seed_corpus(path)[1]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Seed corpus {path} not loaded: {e}", file=sys.stderr)
+        return []
+
+
+class Grid:
+    """
+    Mutable game grid backed by a shared GridTemplate.
+    Cells are copied out of the template the first time they are fetched
+    (copy-on-write), so building a Grid for a known seed costs almost nothing,
+    and per-tick work only visits those cells, whatever the grid size.
+    """
+
+    def __init__(self, seed=None, template=None, config=None):
+        self._template = template or get_template(seed, config)
+        self.width = self._template.width
+        self.height = self._template.height
+        self._cells = {}  # y * width + x -> GridCell, materialized cells only
 
     def get(self, x, y) -> GridCell:
-        return self._cells[y][x]
+        i = y * self.width + x
+        cell = self._cells.get(i)
+        if cell is None:
+            raw = self._template.raw
+            cell = GridCell(x, y, CELL_TYPE_CODES[raw[2 * i]], SOIL_CODES[raw[2 * i + 1]])
+            self._cells[i] = cell
+        return cell
+
+    def _touched(self):
+        """Materialized cells in row-major order (untouched cells are pristine)."""
+        return [self._cells[i] for i in sorted(self._cells)]
 
     def reset_cycle(self):
         """Reset all planted/growing/ripe cells to empty. Called at cycle start.
         Returns a list of cell dicts for all cells that changed, so the bot SDK
         can sync its FarmMap."""
         changed = []
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                cell = self._cells[y][x]
-                if cell.type in (CELL_PLANTED, CELL_GROWING, CELL_RIPE):
-                    cell.type = CELL_EMPTY
-                    cell.growth_ticks = 0
-                    changed.append(cell.to_dict())
+        for cell in self._touched():
+            if cell.type in (CELL_PLANTED, CELL_GROWING, CELL_RIPE):
+                cell.type = CELL_EMPTY
+                cell.growth_ticks = 0
+                changed.append(cell.to_dict())
         return changed
 
     def tick_growth(self):
@@ -82,31 +239,64 @@ class Grid:
         Returns list of cell dicts that changed state.
         """
         changed = []
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                cell = self._cells[y][x]
-                if cell.type in (CELL_PLANTED, CELL_GROWING):
-                    cell.growth_ticks += 1
-                    if cell.growth_ticks >= 5:
-                        cell.type = CELL_RIPE
-                    elif cell.growth_ticks >= 1:
-                        cell.type = CELL_GROWING
-                    changed.append(cell.to_dict())
+        for cell in self._touched():
+            if cell.type in (CELL_PLANTED, CELL_GROWING):
+                cell.growth_ticks += 1
+                if cell.growth_ticks >= 5:
+                    cell.type = CELL_RIPE
+                elif cell.growth_ticks >= 1:
+                    cell.type = CELL_GROWING
+                changed.append(cell.to_dict())
         return changed
 
+    def crops(self):
+        """[x, y, growth_ticks] of every planted, growing or ripe cell."""
+        return [
+            [cell.x, cell.y, cell.growth_ticks] for cell in self._touched()
+            if cell.type in (CELL_PLANTED, CELL_GROWING, CELL_RIPE)
+        ]
+
     def all_cells_as_dicts(self):
-        """Serialize the full grid for the init message."""
+        """Serialize the full grid as a list of cell dicts."""
         result = []
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                result.append(self._cells[y][x].to_dict())
+        for y in range(self.height):
+            for x in range(self.width):
+                result.append(self.get(x, y).to_dict())
         return result
 
+    def encode(self):
+        """Serialize cell types and soils in the compact base64 encoding."""
+        if not self._cells:
+            return self._template.encode()
+        raw = bytearray(self._template.raw)
+        for i, cell in self._cells.items():
+            raw[2 * i] = CELL_TYPE_CODES.index(cell.type)
+        return encode_raw(raw)
+
     def is_in_bounds(self, x, y):
-        return 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT
+        return 0 <= x < self.width and 0 <= y < self.height
 
     def is_passable(self, x, y):
         if not self.is_in_bounds(x, y):
             return False
-        # Farmers can walk through crops; only rocks block movement
-        return self._cells[y][x].type not in (CELL_ROCK,)
+        # Farmers can walk through crops; only rocks block movement.
+        # Rocks never change, so the template answers this directly.
+        return self._template.types[y * self.width + x] != _ROCK_CODE
+
+
+def main():
+    from engine.oracle import parse_seeds
+    parser = argparse.ArgumentParser(description="Pre-generate a seed corpus for BIGAS_SEED_CORPUS.")
+    parser.add_argument("out", help="Corpus JSON file to write")
+    parser.add_argument("--seeds", required=True, help='Seeds to include, e.g. "0-255,1000"')
+    parser.add_argument("--width", type=int, default=GameConfig().width)
+    parser.add_argument("--height", type=int, default=GameConfig().height)
+    parser.add_argument("--rocks", type=int, default=GameConfig().num_rocks)
+    args = parser.parse_args()
+    seeds = parse_seeds(args.seeds)
+    save_seed_corpus(args.out, seeds, GameConfig(width=args.width, height=args.height, num_rocks=args.rocks))
+    print(f"{len(seeds)} layouts saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+engine/match.py
+
+Head-to-head matches: N farmers, each driven by its own bot, share one
+Grid and one Shed.
+
+Every tick the engine serializes a single state message and writes it to
+all bots, then reads every bot's reply concurrently under one shared
+deadline (PipeMultiplexer), so a tick costs as long as the slowest bot.
+Actions are applied one player at a time in an order that rotates every
+tick — the first mover wins a contested cell or the last shed seeds.
+Each farmer has its own AP budget; a player out of AP keeps receiving
+state but its replies are ignored until the next cycle. Multi-tick plans
+(the "plan" action) are single-player only: in a match the engine plays a
+plan as a wait, and the SDK's end_turn_plan() raises instead of sending one.
+A reply that misses its tick's deadline is discarded when it arrives, never
+played on a later tick.
+
+Usage:
+    python -m engine.match bots/reference_bot.py bots/sample_bot.py --seed 42
+"""
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import selectors
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bigas.config import GameConfig
+from bigas.constants import CYCLES_PER_RUN, SHED_POSITION
+from bigas.encoding import GRID_ENCODING
+from engine.game import ENGINE_VERSION
+from engine.grid import Grid
+from engine.farmer import Farmer
+from engine.shed import Shed
+
+MATCH_TICK_TIMEOUT = 0.15
+MAX_PLAYERS = 8
+
+
+class MatchEngine:
+    """
+    Multi-farmer counterpart of GameEngine.
+    Records a replay with per-player farmers, actions and scores per tick.
+    """
+
+    def __init__(self, send_fn, gather_fn, num_players, grid_seed=None, config=None, deadline=None):
+        """
+        send_fn(i, msg_str): write a line to bot i's stdin
+        gather_fn() -> list: one line (or None on timeout) per bot, read concurrently
+        deadline: reply allowance sent in every tick message, e.g. {"wall_ms": 150}
+        """
+        if not 1 <= num_players <= MAX_PLAYERS:
+            raise ValueError(f"A match needs 1 to {MAX_PLAYERS} players")
+        self._send = send_fn
+        self._gather = gather_fn
+        self._deadline = deadline
+        self.num_players = num_players
+        if grid_seed is None:
+            grid_seed = random.randrange(2 ** 31)
+        self.config = config or GameConfig()
+        self.grid = Grid(seed=grid_seed, config=self.config)
+        self.farmers = [Farmer(spawn) for spawn in self._spawn_points()]
+        self.shed = Shed(self.config.seeds_per_cycle)
+        self.initial_grid = {
+            "width": self.config.width,
+            "height": self.config.height,
+            "encoding": GRID_ENCODING,
+            "data": self.grid.encode(),
+        }
+        self.replay = {
+            "engine_version": ENGINE_VERSION,
+            "mode": "match",
+            "seed": grid_seed,
+            "config": self.config.to_dict(),
+            "bot_names": [],
+            "final_scores": [],
+            "cycle_scores": [],
+            "initial_grid": self.initial_grid,
+            "cycles": [],
+        }
+
+    def _spawn_points(self):
+        """Passable cells nearest the shed, in a fixed order: one per player."""
+        sx, sy = SHED_POSITION
+        points = []
+        radius = 1
+        while len(points) < self.num_players:
+            ring = [
+                (x, y)
+                for y in range(sy, sy + radius + 1)
+                for x in range(sx, sx + radius + 1)
+                if max(x - sx, y - sy) == radius
+            ]
+            # Spawn order within a ring: along the bottom row first, as in single play
+            ring.sort(key=lambda p: (p[1], p[0]))
+            points += [p for p in ring if self.grid.is_passable(*p)]
+            radius += 1
+            if radius > max(self.config.width, self.config.height):
+                raise ValueError("Not enough free cells to spawn every player")
+        return points[:self.num_players]
+
+    def run(self):
+        """Execute the full match. Returns the replay dict."""
+        for i in range(self.num_players):
+            self._send(i, json.dumps({
+                "type": "init",
+                "player": i,
+                "num_players": self.num_players,
+                "config": self.config.to_dict(),
+                "grid": self.initial_grid,
+            }))
+        names = self._gather()
+        self.replay["bot_names"] = [
+            (name or "UnknownBot").strip()[:64] for name in names
+        ]
+
+        totals = [0] * self.num_players
+        for cycle_num in range(1, CYCLES_PER_RUN + 1):
+            cycle = self._run_cycle(cycle_num)
+            self.replay["cycles"].append(cycle)
+            self.replay["cycle_scores"].append(cycle["scores"])
+            totals = [t + s for t, s in zip(totals, cycle["scores"])]
+
+        self._broadcast({"type": "end"})
+        self.replay["final_scores"] = [t / CYCLES_PER_RUN for t in totals]
+        return self.replay
+
+    # ------------------------------------------------------------------
+
+    def _broadcast(self, msg):
+        line = json.dumps(msg)  # serialized once for every bot
+        for i in range(self.num_players):
+            self._send(i, line)
+
+    def _run_cycle(self, cycle_num):
+        reset_changes = self.grid.reset_cycle()
+        for farmer in self.farmers:
+            farmer.reset()
+        self.shed.restock()
+
+        n = self.num_players
+        ap = [self.config.ap_per_cycle] * n
+        scores = [0] * n
+        ticks = []
+        pending_cell_changes = reset_changes
+
+        while any(a > 0 for a in ap):
+            growth_changes = self.grid.tick_growth()
+            tick_msg = {
+                "type": "tick",
+                "cycle": cycle_num,
+                "ap_remaining": ap,
+                "farmers": [f.to_dict() for f in self.farmers],
+                "shed": self.shed.to_dict(),
+                "score_this_cycle": scores,
+                "cell_changes": pending_cell_changes + growth_changes,
+            }
+            if self._deadline:
+                tick_msg["deadline"] = self._deadline
+            self._broadcast(tick_msg)
+
+            actions = [None] * n
+            for i, raw in enumerate(self._gather()):
+                if ap[i] <= 0:
+                    continue  # out of AP: state only, reply ignored
+                actions[i] = {}
+                if raw:
+                    try:
+                        actions[i] = json.loads(raw.strip())
+                    except (json.JSONDecodeError, ValueError):
+                        actions[i] = {"action": "wait"}
+                if isinstance(actions[i], dict) and actions[i].get("action") == "plan":
+                    actions[i] = {"action": "wait"}
+
+            # Rotate who moves first so no seat is favoured on contested cells
+            action_changes = []
+            for k in range(n):
+                i = (len(ticks) + k) % n
+                if actions[i] is None:
+                    continue
+                cost, changes, delta = self.farmers[i].apply_action(
+                    actions[i], self.grid, self.shed
+                )
+                scores[i] += delta
+                ap[i] -= max(1, cost)
+                action_changes += changes
+            pending_cell_changes = action_changes
+
+            ticks.append({
+                "tick": len(ticks) + 1,
+                "ap_remaining": list(ap),
+                "farmers": [f.to_dict() for f in self.farmers],
+                "actions": actions,
+                "cell_changes": growth_changes + action_changes,
+                "score_this_cycle": list(scores),
+            })
+
+        return {
+            "cycle": cycle_num,
+            "scores": scores,
+            "ticks": ticks,
+        }
+
+
+class PipeMultiplexer:
+    """
+    Line I/O with several bot subprocesses over one selector.
+    gather() waits for one line from every bot against a single deadline.
+    Bots answer every message with exactly one line, so each missed
+    deadline is counted and that many late lines are dropped as they
+    arrive; a late reply is never taken as the answer to a later message.
+    """
+
+    def __init__(self, procs, timeout=MATCH_TICK_TIMEOUT):
+        self._procs = procs
+        self._timeout = timeout
+        self._buffers = [b""] * len(procs)
+        self._late = [0] * len(procs)  # replies still owed for missed deadlines
+        self._selector = selectors.DefaultSelector()
+        for i, proc in enumerate(procs):
+            fd = proc.stdout.fileno()
+            os.set_blocking(fd, False)
+            self._selector.register(fd, selectors.EVENT_READ, i)
+
+    def send(self, i, msg):
+        try:
+            self._procs[i].stdin.write(msg.encode("utf-8") + b"\n")
+            self._procs[i].stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    def _take_line(self, i):
+        buf = self._buffers[i]
+        nl = buf.find(b"\n")
+        if nl < 0:
+            return None
+        self._buffers[i] = buf[nl + 1:]
+        return buf[:nl].decode("utf-8", errors="replace")
+
+    def _next_reply(self, i):
+        """The next buffered line that answers the current message, if any."""
+        while True:
+            line = self._take_line(i)
+            if line is None or not self._late[i]:
+                return line
+            self._late[i] -= 1
+
+    def gather(self):
+        deadline = time.monotonic() + self._timeout
+        lines = [self._next_reply(i) for i in range(len(self._procs))]
+        waiting = {i for i, line in enumerate(lines) if line is None}
+        while waiting and self._selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in self._selector.select(remaining):
+                i = key.data
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    # Bot exited; it will time out on every tick from now on
+                    self._selector.unregister(key.fd)
+                    waiting.discard(i)
+                    continue
+                self._buffers[i] += chunk
+                if i in waiting:
+                    lines[i] = self._next_reply(i)
+                    if lines[i] is not None:
+                        waiting.discard(i)
+        for i in waiting:
+            self._late[i] += 1
+        return lines
+
+    def close(self):
+        self._selector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a head-to-head Bigas match locally.")
+    parser.add_argument("bots", nargs="+", help="Paths to the bot .py files")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for the grid")
+    parser.add_argument("--out", default=None, help="Write replay JSON to this file")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": root}
+    procs = [
+        subprocess.Popen(
+            [sys.executable, path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=sys.stderr,
+            env=env,
+        )
+        for path in args.bots
+    ]
+    mux = PipeMultiplexer(procs)
+    engine = MatchEngine(mux.send, mux.gather, len(procs), grid_seed=args.seed,
+                         deadline={"wall_ms": round(MATCH_TICK_TIMEOUT * 1000)})
+    try:
+        replay = engine.run()
+    finally:
+        mux.close()
+        for proc in procs:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+
+    for name, score in zip(replay["bot_names"], replay["final_scores"]):
+        print(f"{name}: {score:.1f} grams")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(replay, f)
+        print(f"Replay saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""
+engine/oracle.py
+
+Offline score oracle for benchmarking bots against a seed's grid.
+
+Cycles are independent (grid, farmer and shed reset at every cycle start),
+so a game's best final score is the best score of a single cycle. For each
+seed the oracle computes:
+
+  - upper_bound: no bot can score more. Every rice unit costs 4 AP (seed,
+    plant, harvest, deposit); only the last deposit may overdraw, by up to
+    MAX_CARRY - 1. Units from cells away from the shed also pay round trips
+    shared by at most MAX_CARRY units, and a cell ripens at most once every
+    SEED_GROWTH_TICKS + 1 ticks. The bound is the best fractional choice of
+    units under these limits, and is never below the true optimum.
+  - score: the best schedule found by an anytime beam search over the real
+    rules, widening the beam until the time limit. The schedule is replayed
+    through GameEngine, so the score is one a bot can actually reach.
+
+Results are cached per (engine version, config, seed) in a JSON-lines file
+(BIGAS_ORACLE_CACHE), so a corpus is solved once and reused by tournaments
+and sweeps (api/tournaments.py).
+
+Usage:
+    python -m engine.oracle --seeds 1-1000 --time-limit 1 --jobs 8
+"""
+import sys
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bigas.config import GameConfig
+from bigas.constants import (
+    MAX_CARRY, SEED_GROWTH_TICKS, SHED_POSITION, FARMER_SPAWN, SOIL_YIELD, CELL_EMPTY, CELL_ROCK,
+)
+from bigas.encoding import CELL_TYPE_CODES
+from engine.game import GameEngine, ENGINE_VERSION
+from engine.grid import get_template
+
+logger = logging.getLogger(__name__)
+
+TIME_LIMIT = 1.0        # seconds of search per seed
+SEARCH_RADIUS = 8       # the farmer stays within this Chebyshev distance of the shed
+FIRST_BEAM = 16         # beam widths double from here until the time limit
+PER_POSITION = 0.1      # share of the beam one farmer position may fill
+LAMBDA_SCALES = (1.0, 0.85)  # AP valuations tried at each beam width
+
+_EMPTY = CELL_TYPE_CODES.index(CELL_EMPTY)
+_ROCK = CELL_TYPE_CODES.index(CELL_ROCK)
+_YIELD = (0, SOIL_YIELD["good"], SOIL_YIELD["great"], SOIL_YIELD["best"])  # by soil code
+_DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def _cheb(x0, y0, x1, y1):
+    return max(abs(x0 - x1), abs(y0 - y1))
+
+
+def upper_bound(template, config=None):
+    """Upper bound on one cycle's score (hence the final score) on a grid."""
+    config = config or GameConfig()
+    ap, sx, sy = config.ap_per_cycle, *SHED_POSITION
+    period = SEED_GROWTH_TICKS + 1
+    # AP for all units, the final deposit excepted (it only needs 1 AP left)
+    budget = ap - 1 + MAX_CARRY
+    max_units = min(config.seeds_per_cycle, budget // 4)
+
+    items = []  # (yield per AP, yield, AP per unit, units at most)
+    soils = template.raw[1::2]
+    for i, t in enumerate(template.types):
+        y = _YIELD[soils[i]]
+        if t != _EMPTY or not y:
+            continue
+        # Moves from next to the shed to next to the cell, each way
+        trip = max(0, _cheb(i % template.width, i // template.width, sx, sy) - 2)
+        # Seeds at tick 1 at the earliest, harvest in time to walk back and deposit
+        first, last = 2 + trip + SEED_GROWTH_TICKS, ap - 1 - trip
+        if last < first:
+            continue
+        cost = 4 + 2 * trip / MAX_CARRY
+        items.append((y / cost, y, cost, (last - first) // period + 1))
+    items.sort(reverse=True)
+
+    # Fractional knapsack on AP, and separately the best max_units units
+    bound, left = 0.0, budget
+    for _, y, cost, count in items:
+        take = min(count, left / cost)
+        bound += take * y
+        left -= take * cost
+        if left <= 0:
+            break
+    best_units, left = 0, max_units
+    for y, count in sorted(((y, c) for _, y, _, c in items), reverse=True):
+        take = min(count, left)
+        best_units += take * y
+        left -= take
+        if not left:
+            break
+    return float(min(bound, best_units))
+
+
+class _Layout:
+    """Per-position neighbourhoods of the search area, precomputed once per grid."""
+
+    def __init__(self, template, radius):
+        width, height = template.width, template.height
+        types, soils = template.types, template.raw[1::2]
+        sx, sy = SHED_POSITION
+        self.width = width
+        self.positions = {}  # index -> (moves, soil neighbours by yield, next to shed, moves home)
+        for y in range(min(height, sy + radius + 1)):
+            for x in range(min(width, sx + radius + 1)):
+                if types[y * width + x] == _ROCK or _cheb(x, y, sx, sy) > radius:
+                    continue
+                moves, plots = [], []
+                for dx, dy in _DIRECTIONS:
+                    nx, ny = x + dx, y + dy
+                    if not (0 <= nx < width and 0 <= ny < height):
+                        continue
+                    j = ny * width + nx
+                    if types[j] != _ROCK and _cheb(nx, ny, sx, sy) <= radius:
+                        moves.append((dx, dy, j))
+                    if types[j] == _EMPTY and soils[j]:
+                        plots.append((_YIELD[soils[j]], -j, dx, dy, j))
+                plots.sort(reverse=True)
+                self.positions[y * width + x] = (
+                    moves,
+                    [(dx, dy, j, yld) for yld, _, dx, dy, j in plots],
+                    _cheb(x, y, sx, sy) == 1,
+                    max(0, _cheb(x, y, sx, sy) - 1),
+                )
+        self.yields = [_YIELD[s] for s in soils]
+
+
+class _Search:
+    """
+    Beam search over single-tick actions. A state is
+    (position, seeds, rice, grams carried, shed seeds, AP, score, crops),
+    crops a sorted tuple of (cell, tick planted); all states of a layer are
+    at the same tick. States are ranked by score plus a potential that
+    credits each unit with the AP already invested in it, valued at lam
+    grams per AP, so that planting a cell gains its yield minus 4 * lam
+    and moves and waits lose lam.
+    """
+
+    def __init__(self, layout, config, lam):
+        self.layout = layout
+        self.config = config
+        self.lam = lam
+        self.best_score = -1
+        self.best_node = None
+
+    def value(self, state, tick):
+        pos, seeds, rice, grams, _, ap, score, crops = state
+        lam, home = self.lam, self.layout.positions[pos][3]
+        v = score + lam * ap
+        if rice and home < ap:
+            v += grams - lam * rice
+        if crops:
+            deadline = tick + ap - home - 3
+            yields = self.layout.yields
+            for i, planted in crops:
+                if max(tick, planted + SEED_GROWTH_TICKS) <= deadline:
+                    v += yields[i] - 2 * lam
+        if seeds and ap >= SEED_GROWTH_TICKS + 3 + home:
+            v += lam * seeds
+        if rice or crops or seeds:
+            v -= lam * home
+        return v
+
+    def children(self, state, tick):
+        """(action, cost, next state) for the actions worth trying."""
+        pos, seeds, rice, grams, shed, ap, score, crops = state
+        moves, plots, by_shed, _ = self.layout.positions[pos]
+        inventory = seeds + rice
+        planted = dict(crops)
+        out = []
+        if inventory < MAX_CARRY:
+            for dx, dy, i, yld in plots:
+                if i in planted and tick - planted[i] >= SEED_GROWTH_TICKS:
+                    rest = tuple(c for c in crops if c[0] != i)
+                    out.append((("harvest", dx, dy), 1,
+                                (pos, seeds, rice + 1, grams + yld, shed, ap - 1, score, rest)))
+                    break
+        if seeds:
+            tried = 0
+            for dx, dy, i, _ in plots:
+                if i not in planted:
+                    grown = tuple(sorted(crops + ((i, tick),)))
+                    out.append((("plant", dx, dy), 1,
+                                (pos, seeds - 1, rice, grams, shed, ap - 1, score, grown)))
+                    tried += 1
+                    if tried == 2:
+                        break
+        if by_shed:
+            space = min(MAX_CARRY - inventory, shed)
+            if space > 0:
+                for n in sorted({1, space}):
+                    out.append((("get_seeds", n), n,
+                                (pos, seeds + n, rice, grams, shed - n, ap - n, score, crops)))
+            if rice:
+                out.append((("deposit",), rice,
+                            (pos, seeds, 0, 0, shed, ap - rice, score + grams, crops)))
+        for dx, dy, j in moves:
+            out.append((("move", dx, dy), 1, (j, seeds, rice, grams, shed, ap - 1, score, crops)))
+        out.append((("wait",), 1, (pos, seeds, rice, grams, shed, ap - 1, score, crops)))
+        return out
+
+    def run(self, width, deadline):
+        """Search with one beam width; False if the deadline cut it short."""
+        sx, sy = FARMER_SPAWN
+        start = (sy * self.layout.width + sx, 0, 0, 0, self.config.seeds_per_cycle,
+                 self.config.ap_per_cycle, 0, ())
+        beam = [(start, None)]
+        per_position = max(1, int(width * PER_POSITION))
+        tick = 1
+        while beam:
+            if time.monotonic() > deadline:
+                return False
+            layer = {}
+            for node in beam:
+                for action, cost, child in self.children(node[0], tick):
+                    if child[5] <= 0:
+                        # Out of AP: the cycle ends with this action
+                        if child[6] > self.best_score:
+                            self.best_score, self.best_node = child[6], (child, (action, node))
+                    elif child not in layer:
+                        layer[child] = (action, node)
+            tick += 1
+            ranked = sorted(layer, key=lambda s: self.value(s, tick), reverse=True)
+            beam, counts = [], {}
+            for state in ranked:
+                if counts.get(state[0], 0) < per_position:
+                    counts[state[0]] = counts.get(state[0], 0) + 1
+                    beam.append((state, layer[state]))
+                    if len(beam) == width:
+                        break
+        return True
+
+    def actions(self):
+        """The best schedule found, as engine action dicts."""
+        out = []
+        node = self.best_node
+        while node is not None and node[1] is not None:
+            action, node = node[1]
+            out.append(action)
+        return [_action_dict(a) for a in reversed(out)]
+
+
+def _action_dict(action):
+    name = action[0]
+    if name in ("move", "plant", "harvest"):
+        return {"action": name, "dx": action[1], "dy": action[2]}
+    if name == "get_seeds":
+        return {"action": name, "n": action[1]}
+    return {"action": name}
+
+
+def replay_score(seed, actions, config=None):
+    """Score of one cycle played with `actions`, as the engine computes it."""
+    engine = GameEngine(send_fn=None, recv_fn=None, grid_seed=seed, config=config)
+    return engine._run_cycle(1, actions=actions)["score"]
+
+
+def solve(seed, config=None, time_limit=TIME_LIMIT, radius=SEARCH_RADIUS):
+    """
+    Oracle result for a seed: {"seed", "upper_bound", "score", "actions",
+    "time_limit"}. The search stops widening its beam after time_limit
+    seconds; the first (narrowest) pass always completes.
+    """
+    config = config or GameConfig()
+    template = get_template(seed, config)
+    bound = upper_bound(template, config)
+    layout = _Layout(template, radius)
+    # Grams per AP if the bound were reached
+    lam = bound / (config.ap_per_cycle - 1 + MAX_CARRY)
+    deadline = time.monotonic() + time_limit
+    best, width = None, FIRST_BEAM
+    while True:
+        for scale in LAMBDA_SCALES:
+            search = _Search(layout, config, lam * scale)
+            finished = search.run(width, deadline if best else float("inf"))
+            if not finished:
+                break
+            if best is None or search.best_score > best.best_score:
+                best = search
+        if not finished or time.monotonic() > deadline:
+            break
+        width *= 2
+
+    actions = best.actions()
+    score = replay_score(seed, actions, config)
+    return {"seed": seed, "upper_bound": round(bound, 1), "score": float(score), "actions": actions,
+            "time_limit": time_limit}
+
+
+class OracleCache:
+    """Oracle results by (config, seed) for the current engine version, persisted as JSON lines."""
+
+    def __init__(self, path):
+        self.path = path
+        self._results = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("engine_version") == ENGINE_VERSION:
+                        self._keep(entry)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def from_env(cls):
+        """BIGAS_ORACLE_CACHE: path of the cache file (default: in the temp dir)."""
+        return cls(os.environ.get("BIGAS_ORACLE_CACHE", os.path.join(tempfile.gettempdir(), "bigas-oracle.jsonl")))
+
+    @staticmethod
+    def _key(config, seed):
+        return (tuple(config.to_dict().values()), seed)
+
+    def _keep(self, entry):
+        # Several runs of one seed: keep the best schedule
+        key = (tuple(entry["config"].values()), entry["seed"])
+        old = self._results.get(key)
+        if old is None or entry["score"] > old["score"]:
+            self._results[key] = entry
+
+    def get(self, seed, config=None):
+        return self._results.get(self._key(config or GameConfig(), seed))
+
+    def put(self, result, config=None):
+        entry = {"engine_version": ENGINE_VERSION, "config": (config or GameConfig()).to_dict(), **result}
+        self._keep(entry)
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning("Could not persist oracle result for seed %d: %s", result["seed"], e)
+
+    def __len__(self):
+        return len(self._results)
+
+
+def solve_all(seeds, config=None, time_limit=TIME_LIMIT, jobs=1, cache=None, on_result=None):
+    """
+    Oracle results for every seed, from the cache where possible; the rest
+    are solved on `jobs` processes and added to it. on_result(result) is
+    called as each one is known. Returns {seed: result}.
+    """
+    config = config or GameConfig()
+    results, missing = {}, []
+    for seed in seeds:
+        cached = cache.get(seed, config) if cache is not None else None
+        if cached is not None:
+            results[seed] = cached
+            if on_result:
+                on_result(cached)
+        else:
+            missing.append(seed)
+
+    def done(result):
+        results[result["seed"]] = result
+        if cache is not None:
+            cache.put(result, config)
+        if on_result:
+            on_result(result)
+
+    if jobs > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for result in pool.map(solve, missing, [config] * len(missing), [time_limit] * len(missing)):
+                done(result)
+    else:
+        for seed in missing:
+            done(solve(seed, config, time_limit))
+    return results
+
+
+def parse_seeds(text):
+    """"1-100,250,300-310" -> [1, ..., 100, 250, 300, ..., 310]"""
+    seeds = []
+    for part in text.split(","):
+        lo, _, hi = part.strip().partition("-")
+        seeds.extend(range(int(lo), int(hi or lo) + 1))
+    return seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upper bound and best found schedule per seed")
+    parser.add_argument("--seeds", required=True, help="Seeds, e.g. 42 or 1-1000 or 1,5,9-12")
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT,
+                        help=f"Search seconds per seed (default {TIME_LIMIT:g})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Seeds solved in parallel")
+    parser.add_argument("--cache", default=None, help="Cache file (default BIGAS_ORACLE_CACHE)")
+    parser.add_argument("--no-cache", action="store_true", help="Solve every seed again, store nothing")
+    parser.add_argument("--schedule", action="store_true", help="Print each seed's actions as JSON")
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = OracleCache(args.cache) if args.cache else OracleCache.from_env()
+
+    def report(result):
+        bound, score = result["upper_bound"], result["score"]
+        print(f"seed {result['seed']}: {score:.0f} / bound {bound:.0f} "
+              f"({100 * score / bound if bound else 100:.1f}%)")
+        if args.schedule:
+            print(json.dumps(result["actions"]))
+
+    started = time.monotonic()
+    results = solve_all(parse_seeds(args.seeds), time_limit=args.time_limit, jobs=args.jobs,
+                        cache=cache, on_result=report)
+    scores = [r["score"] for r in results.values()]
+    bounds = [r["upper_bound"] for r in results.values()]
+    print(f"{len(results)} seeds in {time.monotonic() - started:.1f}s: "
+          f"mean oracle {sum(scores) / len(scores):.0f}, mean bound {sum(bounds) / len(bounds):.0f}, "
+          f"oracle at {100 * sum(scores) / sum(bounds):.1f}% of bound")
+
+
+if __name__ == "__main__":
+    main()
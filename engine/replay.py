@@ -0,0 +1,185 @@
+"""
+engine/replay.py
+
+Compact action-log replays.
+
+A game is fully determined by its grid seed and the action the engine
+applied on every tick, so that is all a stored replay needs:
+
+    {
+        "format": "bigas-action-log",
+        "engine_version": "1",
+        "seed": 123456,
+        "config": {"width": 64, ...},     # bigas.config.GameConfig
+        "bot_name": "MyBot",
+        "final_score": 4200.0,
+        "cycle_scores": [...],
+        "actions": [[{...}, ...], ...],   # one list of tick actions per cycle
+        "usage": {"bot": {...}, ...},     # optional, added by engine/runner.py
+    }
+
+expand() re-simulates the log into the full tick-by-tick replay that the
+frontend renders; iter_cycles() does the same one cycle at a time.
+
+engine/runner.py streams the log while the game is played, one JSON line
+per record, so the API can follow progress without waiting for the exit:
+
+    {"record": "header", "format": ..., "engine_version": ..., "seed": ...,
+     "config": {...}, "bot_name": ...}
+    {"record": "cycle", "cycle": 1, "score": 1500, "actions": [{...}, ...]}
+    ...                                    # one per cycle
+    {"record": "trailer", "final_score": ..., "cycle_scores": [...], "usage": {...}}
+
+or {"record": "error", "error": "..."} if the game crashed.
+
+Expanded replays carry keyframes in every cycle entry, at cycle start and
+every KEYFRAME_INTERVAL ticks:
+
+    {"after": 20,                 # ticks of this cycle already applied
+     "grid": "...",               # compact b64-type-soil grid at that point
+     "crops": [[x, y, growth_ticks], ...]}
+
+so state_at() rebuilds any (cycle, tick) from at most KEYFRAME_INTERVAL
+ticks of cell_changes, however deep into the game it is.
+"""
+from bigas.config import GameConfig
+from bigas.constants import CELL_PLANTED, CELL_GROWING, CELL_RIPE
+from bigas.encoding import decode_grid, encode_raw, CELL_TYPE_CODES
+from engine.game import GameEngine, ENGINE_VERSION, KEYFRAME_INTERVAL
+
+LOG_FORMAT = "bigas-action-log"
+
+
+def action_log(replay):
+    """Reduce a full replay dict (from GameEngine.run) to its action log."""
+    return {
+        "format": LOG_FORMAT,
+        "engine_version": replay["engine_version"],
+        "seed": replay["seed"],
+        "config": replay["config"],
+        "bot_name": replay["bot_name"],
+        "final_score": replay["final_score"],
+        "cycle_scores": replay["cycle_scores"],
+        "actions": [[t["action"] for t in c["ticks"]] for c in replay["cycles"]],
+    }
+
+
+def header_record(replay):
+    """First streamed record: everything about the game known before cycle 1."""
+    return {
+        "record": "header",
+        "format": LOG_FORMAT,
+        "engine_version": replay["engine_version"],
+        "seed": replay["seed"],
+        "config": replay["config"],
+        "bot_name": replay["bot_name"],
+    }
+
+
+def cycle_record(cycle):
+    """Streamed record for one completed cycle replay entry."""
+    return {
+        "record": "cycle",
+        "cycle": cycle["cycle"],
+        "score": cycle["score"],
+        "actions": [t["action"] for t in cycle["ticks"]],
+    }
+
+
+def trailer_record(log):
+    """Last streamed record, from the finished action log."""
+    trailer = {
+        "record": "trailer",
+        "final_score": log["final_score"],
+        "cycle_scores": log["cycle_scores"],
+    }
+    if "usage" in log:
+        trailer["usage"] = log["usage"]
+    return trailer
+
+
+def is_action_log(record):
+    return isinstance(record, dict) and record.get("format") == LOG_FORMAT
+
+
+def _engine_for(record):
+    if record["engine_version"] != ENGINE_VERSION:
+        raise ValueError(
+            f"Action log was recorded by engine version {record['engine_version']}, "
+            f"this is version {ENGINE_VERSION}"
+        )
+    config = GameConfig.from_dict(record.get("config", {}))
+    return GameEngine(
+        send_fn=None, recv_fn=None, grid_seed=record["seed"], config=config,
+        keyframe_interval=KEYFRAME_INTERVAL,
+    )
+
+
+def iter_cycles(record):
+    """Re-simulate an action log, yielding each cycle's replay entry in turn."""
+    engine = _engine_for(record)
+    for cycle_num, actions in enumerate(record["actions"], start=1):
+        yield engine._run_cycle(cycle_num, actions=actions)
+
+
+def expand(record):
+    """Re-simulate an action log into a full replay dict."""
+    engine = _engine_for(record)
+    replay = engine.replay
+    replay["bot_name"] = record["bot_name"]
+    for cycle_num, actions in enumerate(record["actions"], start=1):
+        replay["cycles"].append(engine._run_cycle(cycle_num, actions=actions))
+    replay["cycle_scores"] = [c["score"] for c in replay["cycles"]]
+    replay["final_score"] = record["final_score"]
+    return replay
+
+
+def state_at(replay, cycle, tick):
+    """
+    Grid, crops, farmer and score of an expanded replay after tick index
+    `tick` (0-based, as in cycle["ticks"]) of cycle number `cycle`.
+    Starts from the nearest keyframe. Raises IndexError for positions
+    outside the replay.
+    """
+    if not 1 <= cycle <= len(replay["cycles"]):
+        raise IndexError(f"No cycle {cycle}")
+    entry = replay["cycles"][cycle - 1]
+    ticks = entry["ticks"]
+    if not 0 <= tick < len(ticks):
+        raise IndexError(f"Cycle {cycle} has no tick {tick}")
+
+    width = replay["initial_grid"]["width"]
+    keyframe = max(
+        (k for k in entry.get("keyframes", []) if k["after"] <= tick + 1),
+        key=lambda k: k["after"],
+        default=None,
+    )
+    if keyframe is not None:
+        raw = bytearray(decode_grid(keyframe["grid"]))
+        crops = {(x, y): g for x, y, g in keyframe["crops"]}
+        start = keyframe["after"]
+    else:
+        # No keyframes: every cycle starts from the crop-free initial grid
+        raw = bytearray(decode_grid(replay["initial_grid"]["data"]))
+        crops = {}
+        start = 0
+
+    for t in ticks[start:tick + 1]:
+        for c in t["cell_changes"]:
+            i = 2 * (c["y"] * width + c["x"])
+            raw[i] = CELL_TYPE_CODES.index(c["type"])
+            if c["type"] in (CELL_PLANTED, CELL_GROWING, CELL_RIPE):
+                crops[(c["x"], c["y"])] = c.get("growth_ticks", 0)
+            else:
+                crops.pop((c["x"], c["y"]), None)
+
+    t = ticks[tick]
+    return {
+        "cycle": cycle,
+        "tick": tick,
+        "grid": {**replay["initial_grid"], "data": encode_raw(raw)},
+        "crops": [[x, y, g] for (x, y), g in crops.items()],
+        "farmer": t["farmer"],
+        "ap_remaining": t["ap_remaining"],
+        "score_this_cycle": t["score_this_cycle"],
+    }
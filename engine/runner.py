@@ -3,73 +3,231 @@ engine/runner.py
 
 Entrypoint executed inside the Docker container.
 
-Bot code is passed via the BIGAS_BOT_CODE environment variable (base64-encoded).
-This avoids Docker volume mount issues when the API runs inside a container.
+Bot code arrives in one of three ways:
+  - a file path in sys.argv[1] — the API copies /bot/bot.py (plus a compiled
+    /bot/bot.pyc, see api/bytecode.py) into the container before starting
+    it, which avoids Docker volume mount issues when the API itself runs
+    in a container
+  - "-" as sys.argv[1]: the source is read from stdin
+  - the BIGAS_BOT_CODE environment variable (base64-encoded; legacy)
 
-Fallback: if BIGAS_BOT_CODE is not set, reads the bot path from sys.argv[1]
-(used by main.py CLI runner on the host).
+The action log is written to stdout as framed JSON-line records while the
+game runs (header, one per cycle, trailer — see engine/replay.py).
+With --seeds 1,2,3 one bot process plays every seed in turn (series mode)
+and the records of each game follow one another. Seed layouts come from the
+corpus at BIGAS_SEED_CORPUS when it has them (engine/grid.py).
 """
 import sys
 import os
 import json
 import base64
+import argparse
+import importlib.util
 import subprocess
 import threading
 import tempfile
+import time
 
-sys.path.insert(0, "/app")
+# Project root: /app inside the container, the checkout when run on a host
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_ROOT)
 
-from engine.game import GameEngine
+from engine.game import GameEngine, run_series
+from engine.grid import load_env_corpus
+from engine.replay import action_log, header_record, cycle_record, trailer_record
+from engine.zygote import ZygoteChild, usage_from_rusage
+from engine.budget import make_budget
+from bigas.tuning import PARAMS_ENV
 
 BOT_TICK_TIMEOUT = 0.15
+BOT_EXIT_GRACE = 2.0
+
+# cgroup v2 paths first, then v1; read inside the runner container only
+CGROUP_CPU_STAT = ("/sys/fs/cgroup/cpu.stat", "/sys/fs/cgroup/cpu/cpu.stat")
+CGROUP_MEMORY_PEAK = ("/sys/fs/cgroup/memory.peak", "/sys/fs/cgroup/memory/memory.max_usage_in_bytes")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run one bigas game (or a seed series) against a bot")
+    parser.add_argument("bot", nargs="?", help='Bot script path, or "-" to read the source from stdin')
+    parser.add_argument("--seeds", default=None,
+                        help="Comma-separated seeds: play them all with one bot process (series mode)")
+    parser.add_argument("--params", default=None,
+                        help="JSON object exposed to the bot as bigas.params")
+    args = parser.parse_args()
+
     bot_script = None
     tmp_file = None
 
     # --- resolve bot script path ---
+    bot_code = None
     bot_code_b64 = os.environ.get("BIGAS_BOT_CODE")
-    if bot_code_b64:
-        # Decode and write to a temp file
+    if args.bot == "-":
+        bot_code = sys.stdin.read()
+    elif bot_code_b64:
         try:
             bot_code = base64.b64decode(bot_code_b64).decode("utf-8")
         except Exception as e:
-            print(json.dumps({"error": f"Failed to decode bot code: {e}"}), flush=True)
+            print(json.dumps({"record": "error", "error": f"Failed to decode bot code: {e}"}), flush=True)
             sys.exit(1)
+
+    if bot_code is not None:
+        # Write to a temp file
         tmp = tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False)
         tmp.write(bot_code)
         tmp.close()
         bot_script = tmp.name
         tmp_file = tmp.name
-    elif len(sys.argv) >= 2:
-        bot_script = sys.argv[1]
+    elif args.bot:
+        bot_script = args.bot
     else:
-        print(json.dumps({"error": "No bot code provided"}), flush=True)
+        print(json.dumps({"record": "error", "error": "No bot code provided"}), flush=True)
         sys.exit(1)
 
     if not os.path.isfile(bot_script):
-        print(json.dumps({"error": f"Bot script not found: {bot_script}"}), flush=True)
+        print(json.dumps({"record": "error", "error": f"Bot script not found: {bot_script}"}), flush=True)
+        sys.exit(1)
+
+    def emit(record):
+        if record["record"] == "trailer" and "usage" in record and os.environ.get("BIGAS_CGROUP_STATS"):
+            record.setdefault("usage", {})["container"] = cgroup_stats()
+        print(json.dumps(record), flush=True)
+
+    load_env_corpus()
+    shared_grid = bool(os.environ.get("BIGAS_SHARED_GRID"))
+    params = json.loads(args.params) if args.params else None
+    try:
+        if args.seeds:
+            seeds = [int(s) for s in args.seeds.split(",")]
+            play_series(bot_script, seeds, on_record=emit, shared_grid=shared_grid, params=params)
+        else:
+            play(bot_script, on_record=emit, shared_grid=shared_grid, params=params)
+    except RuntimeError as e:
+        print(json.dumps({"record": "error", "error": str(e)}), flush=True)
         sys.exit(1)
+    finally:
+        if tmp_file:
+            try:
+                os.unlink(tmp_file)
+            except Exception:
+                pass
+
+
+def play(bot_script, bot_env=None, preexec_fn=None, cwd=None, on_record=None, zygote=None,
+         shared_grid=False, params=None):
+    """
+    Play one game against the bot at bot_script and return its action log
+    (or {"error": ...} if the game crashed), with the bot's resource usage
+    under "usage" (see reap_bot). Raises RuntimeError if the bot
+    cannot be started. bot_env, preexec_fn and cwd are passed to the bot's
+    Popen, so callers can sandbox it (see api/sandbox_runner.py).
+    on_record(record) receives the streamed log records (engine/replay.py)
+    as the game is played.
+    With a zygote (engine/zygote.py) the bot is forked from it instead of
+    started cold; preexec_fn is then ignored in favour of the zygote's limits.
+    shared_grid switches the game to bigas.shared_grid state sync.
+    params is exposed to the bot as bigas.params (see bigas/tuning.py).
+    """
+    proc, send_fn, recv_fn = start_bot(bot_script, bot_env, preexec_fn, cwd, zygote, params)
+    engine = GameEngine(send_fn=send_fn, recv_fn=recv_fn, shared_grid=shared_grid,
+                        deadline_fn=proc.budget.deadline)
+
+    def on_cycle(cycle):
+        if on_record is None:
+            return
+        if cycle["cycle"] == 1:
+            on_record(header_record(engine.replay))
+        on_record(cycle_record(cycle))
+
+    try:
+        # Only the action log leaves the container; the API re-simulates
+        # the full replay on demand (engine/replay.py).
+        result = action_log(engine.run(on_cycle=on_cycle))
+    except Exception as e:
+        result = {"error": str(e)}
+    result["usage"] = bot_usage(proc)
+    if on_record:
+        if "error" in result:
+            on_record({"record": "error", "error": result["error"]})
+        else:
+            on_record(trailer_record(result))
+    return result
+
+
+def play_series(bot_script, seeds, config=None, bot_env=None, preexec_fn=None, cwd=None, zygote=None,
+                shared_grid=False, on_record=None, params=None):
+    """
+    Play one game per seed with a single bot process (series mode, see
+    engine.game.run_series). Returns {"games": [action log, ...], "usage": {...}}
+    or {"error": ...}; usage covers the whole series.
+    on_record(record) receives each game's header, cycle and trailer records
+    in turn; the last trailer carries the series usage.
+    """
+    proc, send_fn, recv_fn = start_bot(bot_script, bot_env, preexec_fn, cwd, zygote, params)
+    last = len(seeds)
 
+    def on_cycle(engine, cycle):
+        if cycle["cycle"] == 1:
+            on_record(header_record(engine.replay))
+        on_record(cycle_record(cycle))
+
+    def on_game(engine, replay):
+        if engine.series["game"] < last:
+            on_record(trailer_record(action_log(replay)))
+
+    try:
+        result = {"games": [action_log(r) for r in run_series(
+            send_fn, recv_fn, seeds, config, shared_grid=shared_grid,
+            on_cycle=on_cycle if on_record else None, on_game=on_game if on_record else None,
+            deadline_fn=proc.budget.deadline,
+        )]}
+    except Exception as e:
+        result = {"error": str(e)}
+    result["usage"] = bot_usage(proc)
+    if on_record:
+        if "error" in result:
+            on_record({"record": "error", "error": result["error"]})
+        else:
+            on_record(trailer_record({**result["games"][-1], "usage": result["usage"]}))
+    return result
+
+
+def start_bot(bot_script, bot_env=None, preexec_fn=None, cwd=None, zygote=None, params=None,
+              budget=None):
+    """
+    Start the bot and return (proc, send_fn, recv_fn) for the engine.
+    Raises RuntimeError if it cannot be started. Replies are timed by
+    proc.budget (engine/budget.py): BOT_TICK_TIMEOUT of wall clock, or with
+    budget="cpu" the bot's own CPU time; the default follows BIGAS_TICK_BUDGET.
+    """
     # --- spawn bot subprocess ---
     # Pass PYTHONPATH=/app so the bot can `import bigas` (the SDK lives at /app/bigas/).
-    bot_env = {**os.environ, "PYTHONPATH": "/app"}
+    if bot_env is None:
+        bot_env = {**os.environ, "PYTHONPATH": APP_ROOT}
+    if params is not None:
+        bot_env = {**bot_env, PARAMS_ENV: json.dumps(params)}
     try:
-        proc = subprocess.Popen(
-            [sys.executable, bot_script],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            env=bot_env,
-        )
+        if zygote is not None:
+            proc = zygote.spawn(bot_entry(bot_script), cwd=cwd, env=bot_env)
+        else:
+            proc = subprocess.Popen(
+                [sys.executable, bot_entry(bot_script)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env=bot_env,
+                preexec_fn=preexec_fn,
+                cwd=cwd,
+            )
     except Exception as e:
-        print(json.dumps({"error": f"Failed to start bot: {e}"}), flush=True)
-        sys.exit(1)
+        raise RuntimeError(f"Failed to start bot: {e}") from e
+
+    proc.budget = make_budget(proc.pid, BOT_TICK_TIMEOUT, budget)
 
     def send_fn(msg):
+        proc.budget.on_send(msg)
         try:
             proc.stdin.write(msg + "\n")
             proc.stdin.flush()
@@ -87,30 +245,95 @@ def main():
 
         t = threading.Thread(target=_read, daemon=True)
         t.start()
-        t.join(timeout=BOT_TICK_TIMEOUT)
-        if t.is_alive():
+        if not proc.budget.wait(t):
             return None
         return result[0]
 
-    engine = GameEngine(send_fn=send_fn, recv_fn=recv_fn)
+    return proc, send_fn, recv_fn
+
 
+def bot_entry(bot_script):
+    """
+    The file to run for bot_script: its compiled .pyc sibling when one was
+    shipped for this interpreter version and compiled from this very source
+    (the source hash in its header matches, see api/bytecode.py), else the
+    source itself, so an edited bot never runs stale bytecode.
+    """
+    pyc = os.path.splitext(bot_script)[0] + ".pyc"
+    magic = importlib.util.MAGIC_NUMBER
     try:
-        replay = engine.run()
-    except Exception as e:
-        replay = {"error": str(e)}
-    finally:
-        try:
-            proc.terminate()
-            proc.wait(timeout=2)
-        except Exception:
-            proc.kill()
-        if tmp_file:
-            try:
-                os.unlink(tmp_file)
-            except Exception:
-                pass
+        with open(pyc, "rb") as f:
+            header = f.read(len(magic) + 12)
+        with open(bot_script, "rb") as f:
+            source = f.read()
+    except OSError:
+        return bot_script
+    # Header: magic, flags (hash-based), 8-byte source hash (PEP 552)
+    if header[:len(magic)] == magic and header[len(magic) + 4:] == importlib.util.source_hash(source):
+        return pyc
+    return bot_script
+
 
-    print(json.dumps(replay), flush=True)
+def bot_usage(proc):
+    """Reap the bot; its usage dict, with the reply budget's counters."""
+    return {"bot": reap_bot(proc), "budget": proc.budget.stats()}
+
+
+def reap_bot(proc):
+    """
+    Stop the bot and collect it with wait4() so its own rusage is returned:
+    {"cpu_user", "cpu_sys"} in seconds and "peak_rss_kb".
+    Returns None if the process was already collected elsewhere.
+    """
+    if isinstance(proc, ZygoteChild):
+        return proc.reap()
+    try:
+        proc.terminate()
+    except Exception:
+        pass
+    deadline = time.monotonic() + BOT_EXIT_GRACE
+    try:
+        while True:
+            pid, status, ru = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.monotonic() > deadline:
+                proc.kill()
+                pid, status, ru = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.01)
+    except ChildProcessError:
+        return None
+    # Tell Popen the child is gone so it never waits on a recycled pid
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage_from_rusage(ru)
+
+
+def cgroup_stats():
+    """
+    CPU throttling and peak memory of the cgroup the runner is in (the
+    container, under Docker). Missing files — no cgroup, older kernels —
+    just leave their keys out.
+    """
+    stats = {}
+    for path in CGROUP_CPU_STAT:
+        try:
+            with open(path) as f:
+                raw = dict(line.split() for line in f if line.strip())
+        except (OSError, ValueError):
+            continue
+        for key in ("usage_usec", "nr_periods", "nr_throttled", "throttled_usec", "throttled_time"):
+            if key in raw:
+                stats[key] = int(raw[key])
+        break
+    for path in CGROUP_MEMORY_PEAK:
+        try:
+            with open(path) as f:
+                stats["memory_peak_bytes"] = int(f.read().strip())
+            break
+        except (OSError, ValueError):
+            continue
+    return stats
 
 
 if __name__ == "__main__":
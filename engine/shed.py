@@ -2,12 +2,13 @@ from bigas.constants import SHED_SEEDS_PER_CYCLE, SHED_POSITION
 
 
 class Shed:
-    def __init__(self):
+    def __init__(self, seeds_per_cycle=SHED_SEEDS_PER_CYCLE):
         self.x, self.y = SHED_POSITION
-        self.seeds_available = SHED_SEEDS_PER_CYCLE
+        self.seeds_per_cycle = seeds_per_cycle
+        self.seeds_available = seeds_per_cycle
 
     def restock(self):
-        self.seeds_available = SHED_SEEDS_PER_CYCLE
+        self.seeds_available = self.seeds_per_cycle
 
     def take_seeds(self, n):
         """Take up to n seeds. Returns actual amount taken."""
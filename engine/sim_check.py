@@ -0,0 +1,141 @@
+"""
+engine/sim_check.py
+
+Differential check of the bigas.sim forward model against the real engine.
+
+Plays random action sequences through GameEngine in-process and, on every
+tick, compares the engine's tick message with the state predicted by Sim.
+Also checks that step() followed by undo() restores the exact state.
+
+Usage:
+    python -m engine.sim_check --seeds 50
+"""
+import sys
+import os
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bigas.config import GameConfig
+from bigas.encoding import decode_grid
+from bigas.sim import Sim
+from engine.game import GameEngine
+
+DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def random_action(rng, msg):
+    """Loosely sensible random play so every rule gets exercised."""
+    f = msg["farmer"]
+    dx, dy = rng.choice(DIRECTIONS)
+    roll = rng.random()
+    if roll < 0.25 and (f["x"] > 2 or f["y"] > 2):
+        # Drift back towards the shed so deposits and refills happen
+        return {"action": "move", "dx": -1 if f["x"] > 1 else 0, "dy": -1 if f["y"] > 0 else 0}
+    if roll < 0.45:
+        return {"action": "move", "dx": dx, "dy": dy}
+    if roll < 0.55:
+        return {"action": "get_seeds", "n": rng.randint(1, 12)}
+    if roll < 0.75:
+        return {"action": "plant", "dx": dx, "dy": dy}
+    if roll < 0.9:
+        return {"action": "harvest", "dx": dx, "dy": dy}
+    if roll < 0.97:
+        return {"action": "deposit"}
+    return {"action": "wait"}
+
+
+def _snapshot(sim):
+    return (
+        sim.x, sim.y, sim.seeds, sim.rice, sim.rice_grams,
+        sim.shed_seeds, sim.ap, sim.score, sim.tick, dict(sim._planted_at),
+    )
+
+
+class DifferentialBot:
+    """Stands in for the bot process: answers the engine and checks the Sim."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.raw = None
+        self.config = None
+        self.sim = None
+        self.cycle = 0
+        self.last = None
+        self.mismatches = []
+
+    def send(self, line):
+        self.last = json.loads(line)
+        if self.last["type"] == "init":
+            self.raw = decode_grid(self.last["grid"]["data"])
+            self.config = GameConfig.from_dict(self.last["config"])
+        elif self.last["type"] == "tick":
+            self._check(self.last)
+
+    def recv(self):
+        if self.last["type"] == "init":
+            return "DifferentialBot"
+        action = random_action(self.rng, self.last)
+        before = _snapshot(self.sim)
+        probe = self.sim.clone()
+        probe.step(action)
+        probe.undo()
+        if _snapshot(probe) != before:
+            self._fail("undo did not restore state", action)
+        self.sim.step(action)
+        return json.dumps(action)
+
+    def _check(self, msg):
+        if msg["cycle"] != self.cycle:
+            self.cycle = msg["cycle"]
+            self.sim = Sim(self.raw[0::2], self.raw[1::2], self.config)
+
+        sim = self.sim
+        f = msg["farmer"]
+        expected = (f["x"], f["y"], f["seeds"], f["rice"], f["rice_grams"],
+                    msg["shed"]["seeds_available"], msg["ap_remaining"], msg["score_this_cycle"])
+        got = (sim.x, sim.y, sim.seeds, sim.rice, sim.rice_grams,
+               sim.shed_seeds, sim.ap, sim.score)
+        if expected != got:
+            self._fail(f"state {got} != engine {expected}")
+
+        # Later entries win: last tick's action diff precedes this tick's growth
+        latest = {(c["x"], c["y"]): c for c in msg["cell_changes"]}
+        for c in latest.values():
+            if (sim.cell_type(c["x"], c["y"]), sim.growth_ticks(c["x"], c["y"])) != (c["type"], c["growth_ticks"]):
+                self._fail(f"cell ({c['x']},{c['y']}) {sim.cell_type(c['x'], c['y'])} != engine {c['type']}")
+
+    def _fail(self, what, action=None):
+        self.mismatches.append(f"cycle {self.cycle} ap {self.sim.ap}: {what}" + (f" after {action}" if action else ""))
+
+
+def check_seed(seed, config=None):
+    """Run one game on `seed`. Returns (final_score, list of mismatch strings)."""
+    bot = DifferentialBot(seed)
+    engine = GameEngine(send_fn=bot.send, recv_fn=bot.recv, grid_seed=seed, config=config)
+    replay = engine.run()
+    return replay["final_score"], bot.mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check bigas.sim against the engine.")
+    parser.add_argument("--seeds", type=int, default=20, help="Number of seeds to play")
+    parser.add_argument("--width", type=int, default=GameConfig().width)
+    parser.add_argument("--height", type=int, default=GameConfig().height)
+    args = parser.parse_args()
+    config = GameConfig(width=args.width, height=args.height)
+
+    failed = 0
+    for seed in range(args.seeds):
+        score, mismatches = check_seed(seed, config)
+        if mismatches:
+            failed += 1
+            print(f"seed {seed}: {len(mismatches)} mismatches, first: {mismatches[0]}")
+    print(f"{args.seeds - failed}/{args.seeds} seeds match the engine")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
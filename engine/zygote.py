@@ -0,0 +1,260 @@
+"""
+engine/zygote.py
+
+Fork server ("zygote") for fast bot startup.
+
+A cold `python bot.py` pays for interpreter startup and the SDK import
+before it can answer the init message. The zygote is one long-lived
+interpreter that has already imported `bigas` and the stdlib modules bots
+are allowed to use (PRELOAD); for every game it forks a child whose
+stdin/stdout are the engine's pipes and runs the bot script in it.
+
+The engine side talks to the server over a SOCK_SEQPACKET socket pair, one
+JSON message per packet; the bot's pipe ends travel with the spawn request
+as SCM_RIGHTS file descriptors. The server is also the children's parent,
+so it reaps them and reports their rusage back.
+
+Children share the zygote's startup state: the `random` module is reseeded
+in each child, but str hash randomization (PYTHONHASHSEED) is per zygote.
+
+Usage:
+    zygote = Zygote()
+    replay = play("bot.py", zygote=zygote)   # engine/runner.py
+    zygote.close()
+"""
+import os
+import sys
+import copy
+import json
+import time
+import signal
+import socket
+import resource
+import subprocess
+
+PRELOAD = ("bigas", "math", "random", "collections", "heapq", "json", "logging")
+ZYGOTE_SCRIPT = os.path.abspath(__file__)
+ZYGOTE_GRACE = 2.0      # seconds between SIGTERM and SIGKILL when reaping
+_MAX_MESSAGE = 65536
+CLONE_NEWNET = 0x40000000
+
+
+def usage_from_rusage(ru):
+    """The per-run usage dict reported for a bot (see engine/runner.reap_bot)."""
+    return {
+        "cpu_user": round(ru.ru_utime, 3),
+        "cpu_sys": round(ru.ru_stime, 3),
+        "peak_rss_kb": ru.ru_maxrss,  # kilobytes on Linux
+    }
+
+
+class ZygoteChild:
+    """
+    A bot forked by the zygote. Mirrors the parts of Popen that
+    engine/runner.play() uses: pid, stdin, stdout, plus reap().
+    """
+
+    def __init__(self, zygote, pid, stdin, stdout):
+        self._zygote = zygote
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.returncode = None
+
+    def reap(self):
+        """Stop the bot and return its usage dict (None if it was already reaped)."""
+        for f in (self.stdin, self.stdout):
+            try:
+                f.close()
+            except Exception:
+                pass
+        reply = self._zygote._request({"op": "reap", "pid": self.pid})
+        self.returncode = reply.get("exit")
+        return reply.get("usage")
+
+
+class Zygote:
+    """
+    Engine-side handle on a fork server process.
+
+    env:             environment of the server (PYTHONPATH must reach bigas)
+    rlimits:         {"RLIMIT_CPU": n, ...} applied in every child before the bot runs
+    isolate_network: unshare the network namespace in every child, where permitted
+    """
+
+    def __init__(self, env=None, rlimits=None, isolate_network=False):
+        if env is None:
+            from engine.runner import APP_ROOT
+            env = {**os.environ, "PYTHONPATH": APP_ROOT}
+        self._sock, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._proc = subprocess.Popen(
+            [sys.executable, ZYGOTE_SCRIPT, str(theirs.fileno())],
+            pass_fds=(theirs.fileno(),),
+            stdin=subprocess.DEVNULL,
+            env=env,
+        )
+        theirs.close()
+        self._defaults = {"rlimits": rlimits or {}, "isolate_network": isolate_network}
+        # Returns once PRELOAD is imported
+        self._request({"op": "ping"})
+
+    def _request(self, msg, fds=()):
+        data = json.dumps(msg).encode("utf-8")
+        try:
+            socket.send_fds(self._sock, [data], list(fds))
+            reply = self._sock.recv(_MAX_MESSAGE)
+        except OSError as e:
+            raise RuntimeError(f"Zygote unavailable: {e}") from e
+        if not reply:
+            raise RuntimeError("Zygote exited")
+        reply = json.loads(reply)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def with_rlimits(self, **rlimits):
+        """A handle on the same server whose children get these rlimits on top of the defaults."""
+        handle = copy.copy(self)
+        handle._defaults = {**self._defaults, "rlimits": {**self._defaults["rlimits"], **rlimits}}
+        return handle
+
+    def spawn(self, script, cwd=None, env=None):
+        """Fork a child running script; returns a ZygoteChild wired to new pipes."""
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        try:
+            reply = self._request(
+                {"op": "spawn", "script": script, "cwd": cwd, "env": env, **self._defaults},
+                fds=(stdin_r, stdout_w, devnull),
+            )
+        except Exception:
+            os.close(stdin_w)
+            os.close(stdout_r)
+            raise
+        finally:
+            for fd in (stdin_r, stdout_w, devnull):
+                os.close(fd)
+        return ZygoteChild(
+            self,
+            reply["pid"],
+            open(stdin_w, "w", buffering=1),
+            open(stdout_r, "r"),
+        )
+
+    def close(self):
+        self._sock.close()  # the server exits on EOF
+        try:
+            self._proc.wait(timeout=ZYGOTE_GRACE)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+
+
+# ----------------------------------------------------------------------
+# Server side (runs as `python engine/zygote.py FD`)
+# ----------------------------------------------------------------------
+
+def _serve(sock):
+    import importlib
+    for name in PRELOAD:
+        importlib.import_module(name)
+
+    while True:
+        try:
+            data, fds, _, _ = socket.recv_fds(sock, _MAX_MESSAGE, 3)
+        except OSError:
+            return
+        if not data:
+            return
+        msg = json.loads(data)
+        if msg["op"] == "ping":
+            reply = {"ok": True}
+        elif msg["op"] == "spawn":
+            pid = os.fork()
+            if pid == 0:
+                sock.close()
+                _run_child(msg, fds)  # never returns
+            for fd in fds:
+                os.close(fd)
+            reply = {"pid": pid}
+        elif msg["op"] == "reap":
+            reply = _reap(msg["pid"])
+        else:
+            reply = {"error": f"Unknown zygote op: {msg['op']}"}
+        sock.send(json.dumps(reply).encode("utf-8"))
+
+
+def _reap(pid):
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    deadline = time.monotonic() + ZYGOTE_GRACE
+    try:
+        while True:
+            done, status, ru = os.wait4(pid, os.WNOHANG)
+            if done:
+                break
+            if time.monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                done, status, ru = os.wait4(pid, 0)
+                break
+            time.sleep(0.01)
+    except ChildProcessError:
+        return {"usage": None}
+    return {"exit": os.waitstatus_to_exitcode(status), "usage": usage_from_rusage(ru)}
+
+
+def _run_child(msg, fds):
+    """In the forked child: become the bot process and run its script."""
+    code = 1
+    try:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        if msg.get("env") is not None:
+            os.environ.clear()
+            os.environ.update(msg["env"])
+        if "bigas" in sys.modules:
+            # Preloaded before this run's BIGAS_PARAMS was known
+            from bigas.tuning import load_params
+            sys.modules["bigas"].params.clear()
+            sys.modules["bigas"].params.update(load_params())
+        if msg.get("cwd"):
+            os.chdir(msg["cwd"])
+        for name, limit in msg.get("rlimits", {}).items():
+            resource.setrlimit(getattr(resource, name), (limit, limit))
+        if msg.get("isolate_network"):
+            try:
+                import ctypes
+                ctypes.CDLL(None, use_errno=True).unshare(CLONE_NEWNET)
+            except Exception:
+                pass
+
+        import random
+        import runpy
+        random.seed()  # otherwise every child continues the zygote's sequence
+
+        script = msg["script"]
+        sys.argv = [script]
+        sys.path[0] = os.path.dirname(os.path.abspath(script))
+        try:
+            runpy.run_path(script, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+        except Exception:
+            pass
+        os._exit(code)
+
+
+if __name__ == "__main__":
+    _serve(socket.socket(fileno=int(sys.argv[1])))
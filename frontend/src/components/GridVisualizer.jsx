@@ -30,19 +30,52 @@ const TILE = {
 const GRID_LINE = "rgba(0,0,0,0.15)";
 
 // ── grid state builder ───────────────────────────────────────────────────────
+// Byte codes of the compact "b64-type-soil" encoding (see bigas/encoding.py)
+const CELL_TYPE_CODES = ["empty", "shed", "rock", "planted", "growing", "ripe"];
+const SOIL_CODES      = [null, "good", "great", "best"];
+
+function initialCells(initialGrid) {
+  if (initialGrid.cells) return initialGrid.cells;
+  const raw = atob(initialGrid.data);
+  const cells = [];
+  for (let i = 0; i < raw.length; i += 2) {
+    const n = i / 2;
+    cells.push({
+      x: n % initialGrid.width,
+      y: Math.floor(n / initialGrid.width),
+      type: CELL_TYPE_CODES[raw.charCodeAt(i)],
+      soil: SOIL_CODES[raw.charCodeAt(i + 1)],
+      growth_ticks: 0,
+    });
+  }
+  return cells;
+}
+
+// Start from the latest keyframe at or before the tick (see engine/replay.py),
+// so seeking costs at most one keyframe interval of cell_changes.
 function buildGridState(replay, cycleIndex, tickIndex) {
   if (!replay) return null;
+  const cycle = replay.cycles[cycleIndex];
+  let keyframe = null;
+  for (const k of cycle?.keyframes || [])
+    if (k.after <= tickIndex + 1 && (!keyframe || k.after > keyframe.after)) keyframe = k;
+
   const grid = {};
-  for (const cell of replay.initial_grid.cells)
+  const base = keyframe ? { ...replay.initial_grid, data: keyframe.grid } : replay.initial_grid;
+  for (const cell of initialCells(base))
     grid[`${cell.x},${cell.y}`] = { ...cell };
-  const cycle = replay.cycles[cycleIndex];
   if (!cycle) return grid;
-  for (const key in grid) {
-    const c = grid[key];
-    if (["planted","growing","ripe"].includes(c.type))
-      grid[key] = { ...c, type:"empty", growth_ticks:0 };
+  if (keyframe) {
+    for (const [x, y, g] of keyframe.crops)
+      grid[`${x},${y}`].growth_ticks = g;
+  } else {
+    for (const key in grid) {
+      const c = grid[key];
+      if (["planted","growing","ripe"].includes(c.type))
+        grid[key] = { ...c, type:"empty", growth_ticks:0 };
+    }
   }
-  for (let i = 0; i <= tickIndex && i < cycle.ticks.length; i++)
+  for (let i = keyframe ? keyframe.after : 0; i <= tickIndex && i < cycle.ticks.length; i++)
     for (const ch of cycle.ticks[i].cell_changes || []) {
       const key = `${ch.x},${ch.y}`;
       grid[key] = { ...grid[key], ...ch };
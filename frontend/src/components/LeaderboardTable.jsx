@@ -66,6 +66,11 @@ export default function LeaderboardTable({ entries }) {
               </td>
               <td className="px-3 py-2 text-right font-pixel text-xs text-paddy-light">
                 {entry.final_score.toLocaleString()}
+                {entry.ci_low != null && (
+                  <div className="text-rock text-[10px]">
+                    ±{Math.round((entry.ci_high - entry.ci_low) / 2).toLocaleString()} · {entry.seeds} seeds
+                  </div>
+                )}
               </td>
               {entry.cycle_scores.slice(0, 5).map((s, ci) => (
                 <td
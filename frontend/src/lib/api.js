@@ -22,6 +22,12 @@ export async function getJob(jobId) {
   return res.json();
 }
 
+export async function getReplay(jobId) {
+  const res = await fetch(`${API_BASE}/jobs/${jobId}/replay`);
+  if (!res.ok) throw new Error("Replay not available");
+  return res.json();
+}
+
 export async function getLeaderboard() {
   const res = await fetch(`${API_BASE}/leaderboard`);
   if (!res.ok) throw new Error("Failed to load leaderboard");
@@ -3,13 +3,14 @@ import { useParams, Link } from "react-router-dom";
 import GridVisualizer from "../components/GridVisualizer";
 import ReplayControls from "../components/ReplayControls";
 import AdBanner from "../components/AdBanner";
-import { getJob } from "../lib/api";
+import { getJob, getReplay } from "../lib/api";
 
 const POLL_INTERVAL = 1500;
 
 export default function ResultPage() {
   const { jobId } = useParams();
   const [job, setJob] = useState(null);
+  const [replay, setReplay] = useState(null);
   const [error, setError] = useState(null);
 
   // Replay state
@@ -37,8 +38,14 @@ export default function ResultPage() {
     return () => clearTimeout(timer);
   }, [jobId]);
 
+  // The job result only holds scores and usage; the full replay is
+  // re-simulated by the API on request.
+  useEffect(() => {
+    if (job?.status !== "complete") return;
+    getReplay(jobId).then(setReplay).catch((e) => setError(e.message));
+  }, [jobId, job?.status]);
+
   // Auto-play animation
-  const replay = job?.result?.replay ?? job?.result;
   const cycle = replay?.cycles?.[cycleIndex];
   const totalTicks = cycle?.ticks?.length ?? 0;
   const totalCycles = replay?.cycles?.length ?? 0;
@@ -106,6 +113,12 @@ export default function ResultPage() {
           Your bot is {job.status === "pending" ? "waiting in queue" : "farming right now"}.
           This page will update automatically.
         </div>
+        {job.progress?.cycles_done > 0 && (
+          <div className="font-pixel text-xs text-parchment/70">
+            CYCLE {job.progress.cycles_done} DONE · LAST SCORE{" "}
+            {job.progress.cycle_scores[job.progress.cycle_scores.length - 1].toLocaleString()} g
+          </div>
+        )}
       </div>
     );
   }
@@ -124,9 +137,9 @@ export default function ResultPage() {
     );
   }
 
-  const result = job.result?.replay ?? job.result;
-  const finalScore = result?.final_score ?? 0;
-  const cycleScores = result?.cycle_scores ?? [];
+  const result = replay;
+  const finalScore = job.result?.final_score ?? 0;
+  const cycleScores = job.result?.cycle_scores ?? [];
 
   return (
     <div className="max-w-6xl mx-auto px-4 py-6 space-y-6">
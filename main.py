@@ -5,6 +5,7 @@ main.py — CLI entry point for running a bot locally (without Docker/web).
 Usage:
     python main.py bots/sample_bot.py
     python main.py path/to/my_bot.py [--seed 42]
+    python main.py path/to/my_bot.py --games 20   # series: one bot process, 20 seeds
 """
 import sys
 import os
@@ -19,6 +20,17 @@ def main():
     parser.add_argument("bot", help="Path to the bot .py file")
     parser.add_argument("--seed", type=int, default=None, help="Random seed for the grid")
     parser.add_argument("--out", default=None, help="Write replay JSON to this file")
+    parser.add_argument("--width", type=int, default=None, help="Grid width (default 64)")
+    parser.add_argument("--height", type=int, default=None, help="Grid height (default 64)")
+    parser.add_argument("--rocks", type=int, default=None, help="Number of rocks (default 10)")
+    parser.add_argument("--seeds-per-cycle", type=int, default=None, help="Shed seed supply (default 50)")
+    parser.add_argument("--ap", type=int, default=None, help="AP per cycle (default 100)")
+    parser.add_argument("--games", type=int, default=1,
+                        help="Play this many seeds (--seed, --seed+1, ...) in one bot process")
+    parser.add_argument("--shared-grid", action="store_true",
+                        help="Share the live grid with the bot via mmap instead of cell_changes")
+    parser.add_argument("--cpu-budget", action="store_true",
+                        help="Charge the bot for CPU time per reply (with a bank) instead of a wall-clock timeout")
     args = parser.parse_args()
 
     if not os.path.isfile(args.bot):
@@ -27,7 +39,14 @@ def main():
 
     # Import engine here so the script works from the project root
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    from engine.game import GameEngine
+    from engine.game import GameEngine, run_series
+    from bigas.config import GameConfig
+
+    overrides = {
+        "width": args.width, "height": args.height, "num_rocks": args.rocks,
+        "seeds_per_cycle": args.seeds_per_cycle, "ap_per_cycle": args.ap,
+    }
+    config = GameConfig(**{k: v for k, v in overrides.items() if v is not None})
 
     # Spawn the bot as a subprocess
     proc = subprocess.Popen(
@@ -40,8 +59,11 @@ def main():
     )
 
     BOT_TIMEOUT = 0.2
+    from engine.budget import make_budget
+    budget = make_budget(proc.pid, BOT_TIMEOUT, "cpu" if args.cpu_budget else "wall")
 
     def send_fn(msg):
+        budget.on_send(msg)
         try:
             proc.stdin.write(msg + "\n")
             proc.stdin.flush()
@@ -59,10 +81,38 @@ def main():
 
         t = threading.Thread(target=_read, daemon=True)
         t.start()
-        t.join(timeout=BOT_TIMEOUT)
+        if not budget.wait(t):
+            return None
         return result[0]
 
-    engine = GameEngine(send_fn=send_fn, recv_fn=recv_fn, grid_seed=args.seed)
+    if args.games > 1:
+        import random
+        first = args.seed if args.seed is not None else random.randrange(2 ** 31)
+        seeds = [first + i for i in range(args.games)]
+        try:
+            replays = run_series(send_fn, recv_fn, seeds, config, shared_grid=args.shared_grid,
+                                 deadline_fn=budget.deadline)
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+        print(f"\nBot: {replays[0]['bot_name']}")
+        for r in replays:
+            print(f"Seed {r['seed']}: {r['final_score']:.1f} grams")
+        mean = sum(r["final_score"] for r in replays) / len(replays)
+        print(f"Mean over {len(replays)} games: {mean:.1f} grams")
+        if budget.timeouts:
+            print(f"Reply timeouts ({budget.stats()['mode']} budget): {budget.timeouts}")
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(replays, f)
+            print(f"Replays saved to {args.out}")
+        return
+
+    engine = GameEngine(send_fn=send_fn, recv_fn=recv_fn, grid_seed=args.seed, config=config,
+                        shared_grid=args.shared_grid, deadline_fn=budget.deadline)
 
     try:
         replay = engine.run()
@@ -76,6 +126,8 @@ def main():
     print(f"\nBot: {replay['bot_name']}")
     print(f"Cycle scores: {replay['cycle_scores']}")
     print(f"Final average score: {replay['final_score']:.1f} grams")
+    if budget.timeouts:
+        print(f"Reply timeouts ({budget.stats()['mode']} budget): {budget.timeouts}")
 
     if args.out:
         with open(args.out, "w") as f: